@@ -3,8 +3,6 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
-from roman_datamodels import datamodels as rdm
-
 from romancal.datamodels.fileio import open_dataset
 from romancal.stpipe import RomanStep
 
@@ -44,7 +42,7 @@ class DarkCurrentStep(RomanStep):
         log.info("Using DARK reference file: %s", self.dark_name)
 
         # Open dark model
-        with rdm.open(self.dark_name) as dark_model:
+        with self.open_reference_model(self.dark_name) as dark_model:
             # get the dark slope from the reference file & trim ref pixels
             dark_slope = dark_model.dark_slope[4:-4, 4:-4]
 
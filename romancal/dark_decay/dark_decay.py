@@ -1,8 +1,123 @@
+import functools
+
 import numpy as np
 
-from romancal.lib.basic_utils import frame_read_times
+from romancal.lib.basic_utils import FrameReadTimes
+
+__all__ = ["DarkDecayCorrection", "subtract_dark_decay"]
+
+
+class DarkDecayCorrection:
+    """
+    Dark decay signal for a detector and frame time.
 
-__all__ = ["subtract_dark_decay"]
+    The decay signal of a pixel in read :math:`r` is
+
+    .. math:: A \\exp(-(t_0 + (r - r_0) t_f) / \\tau)
+              = A \\exp(-t_0 / \\tau) \\exp(-(r - r_0) t_f / \\tau)
+
+    where :math:`t_0` is the time the pixel is read within a frame and
+    :math:`t_f` the frame time. The first factor is the same frame for every
+    read, so the mean decay signal of a resultant is that frame scaled by the
+    mean of the second factor over the reads of the resultant.
+
+    Parameters
+    ----------
+    amplitude : array-like
+        Decay amplitude for the detector from the reference file.
+    time_constant : array-like
+        Decay time constant for the detector from the reference file.
+    frame_time : float
+        The frame time for the exposure, in seconds.
+    sca : int
+        The number of the WFI detector (1-18).
+    frame_offset : float
+        The number of reads that the decay amplitude corresponds to.
+        Default of 1.5 corresponds to the middle of the first read.
+
+    Notes
+    -----
+    For scalar amplitudes and time constants the decay frame is cached, so
+    the exposures of a detector with the same frame time share it and the
+    ``frame_decay`` array is read-only.
+    """
+
+    def __init__(self, amplitude, time_constant, frame_time, sca, frame_offset=1.5):
+        self.time_constant = time_constant
+        self.frame_time = frame_time
+        self.frame_offset = frame_offset
+        if np.ndim(amplitude) == 0 and np.ndim(time_constant) == 0:
+            self.frame_decay = _cached_frame_decay(
+                float(amplitude), float(time_constant), float(frame_time), int(sca)
+            )
+        else:
+            self.frame_decay = _frame_decay(amplitude, time_constant, frame_time, sca)
+
+    def resultant_scales(self, read_pattern):
+        """
+        Scale of the frame decay signal for each resultant.
+
+        Parameters
+        ----------
+        read_pattern : list of list of int
+            The read pattern for the exposure.
+
+        Returns
+        -------
+        list of array-like
+            The mean of the read decay factors of each resultant.
+        """
+        return [
+            np.mean(
+                [
+                    np.exp(
+                        -(read - self.frame_offset)
+                        * self.frame_time
+                        / self.time_constant
+                    )
+                    for read in reads
+                ],
+                axis=0,
+            )
+            for reads in read_pattern
+        ]
+
+    def subtract(self, data, read_pattern):
+        """
+        Subtract the dark decay signal in place.
+
+        Parameters
+        ----------
+        data : np.ndarray
+            Data array to correct. Updated in place.
+        read_pattern : list of list of int
+            The read pattern for the exposure.
+        """
+        # the scaled decay frame of every resultant goes through one buffer
+        scaled = np.empty(self.frame_decay.shape, dtype=data.dtype)
+        for resultant, scale in zip(
+            data, self.resultant_scales(read_pattern), strict=True
+        ):
+            np.multiply(self.frame_decay, scale, out=scaled, casting="same_kind")
+            np.subtract(resultant, scaled, out=resultant)
+
+
+def _frame_decay(amplitude, time_constant, frame_time, sca):
+    """The decay signal of each pixel at its read time in the first frame"""
+    decay = FrameReadTimes(frame_time, sca).to_array()
+    decay /= -time_constant
+    np.exp(decay, out=decay)
+    decay *= amplitude
+    return decay
+
+
+# Each frame takes 128 MiB, so only the most recently used one is kept
+@functools.lru_cache(maxsize=1)
+def _cached_frame_decay(amplitude, time_constant, frame_time, sca):
+    """Share the decay frame of a detector and frame time between exposures"""
+    decay = _frame_decay(amplitude, time_constant, frame_time, sca)
+    decay.flags.writeable = False
+    return decay
 
 
 def subtract_dark_decay(
@@ -29,11 +144,7 @@ def subtract_dark_decay(
         The number of reads that the decay amplitude corresponds to.
         Default of 1.5 corresponds to the middle of the first read.
     """
-    for i in range(data.shape[0]):  # loop over resultants
-        corrections = list()
-
-        for read in read_pattern[i]:
-            read_times = frame_read_times(frame_time, sca, read - frame_offset)
-            corrections.append(amplitude * np.exp(-read_times / time_constant))
-
-        data[i] -= np.mean(corrections, axis=0)
+    correction = DarkDecayCorrection(
+        amplitude, time_constant, frame_time, sca, frame_offset
+    )
+    correction.subtract(data, read_pattern)
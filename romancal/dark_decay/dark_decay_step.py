@@ -4,8 +4,6 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
-from roman_datamodels import datamodels as rdd
-
 from romancal.dark_decay.dark_decay import subtract_dark_decay
 from romancal.datamodels.fileio import open_dataset
 from romancal.stpipe import RomanStep
@@ -45,7 +43,7 @@ class DarkDecayStep(RomanStep):
         # Get the detector-specific decay table
         detector = input_model.meta.instrument.detector
         sca = int(detector[3:])
-        with rdd.open(reffile) as reference:
+        with self.open_reference_model(reffile) as reference:
             decay_table = getattr(reference.decay_table, detector)
 
         # Get exposure metadata
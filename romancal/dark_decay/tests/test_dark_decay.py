@@ -1,8 +1,9 @@
 import numpy as np
 from roman_datamodels import datamodels
 
-from romancal.dark_decay.dark_decay import subtract_dark_decay
+from romancal.dark_decay.dark_decay import DarkDecayCorrection, subtract_dark_decay
 from romancal.dark_decay.dark_decay_step import DarkDecayStep
+from romancal.lib.basic_utils import frame_read_times
 
 
 def create_ramp_model(nresultants, nrows=4096, ncols=4096):
@@ -107,3 +108,38 @@ def test_dark_decay():
     # frame time of 1 is much smaller than the time constant of 23.
     # amplitude should correspond closely to an average of the first read
     assert np.abs(np.mean(expectation1[0]) + amplitude) < 0.001
+
+
+def test_dark_decay_matches_reads():
+    """The correction matches averaging the decay signal of every read"""
+    amplitude = 3.0
+    time_constant = 23.0
+    frame_time = 3.04
+    read_pattern = [[1], [2, 3], [4, 5, 6]]
+    sca = 3
+
+    expected = np.zeros((len(read_pattern), 4096, 4096), dtype=np.float32)
+    for resultant, reads in zip(expected, read_pattern, strict=True):
+        resultant -= np.mean(
+            [
+                amplitude
+                * np.exp(-frame_read_times(frame_time, sca, read - 1.5) / time_constant)
+                for read in reads
+            ],
+            axis=0,
+        )
+
+    result = np.zeros_like(expected)
+    subtract_dark_decay(result, amplitude, time_constant, frame_time, read_pattern, sca)
+    np.testing.assert_allclose(result, expected, rtol=1e-6)
+
+
+def test_dark_decay_frame_shared():
+    """Exposures of a detector with the same frame time share the decay frame"""
+    correction = DarkDecayCorrection(3.0, 23.0, 3.04, 3)
+
+    assert DarkDecayCorrection(3, 23, 3.04, 3).frame_decay is correction.frame_decay
+    assert not correction.frame_decay.flags.writeable
+
+    other = DarkDecayCorrection(3.0, 23.0, 3.04, 4)
+    assert other.frame_decay is not correction.frame_decay
@@ -4,10 +4,6 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
-import roman_datamodels as rdm
-from roman_datamodels.datamodels import FpsModel, RampModel, ScienceRawModel, TvacModel
-from roman_datamodels.dqflags import pixel
-
 from romancal.datamodels.fileio import open_dataset
 from romancal.dq_init import dq_initialization
 from romancal.stpipe import RomanStep
@@ -51,49 +47,18 @@ class DQInitStep(RomanStep):
         """
         # Open datamodel
         input_model = open_dataset(dataset, update_version=self.update_version)
-        is_tvac = isinstance(input_model, (FpsModel | TvacModel))
-        try:
-            # note that this succeeds even for ScienceRawModels
-            input_model = ScienceRawModel.from_tvac_raw(input_model)
-        except ValueError:
-            pass
 
         # Convert to RampModel
-        output_model = RampModel.from_science_raw(input_model)
-
-        # guide window range information
-        x_start = int(input_model.meta.guide_star.window_xstart)
-        x_stop = int(input_model.meta.guide_star.window_xstop)
-        y_start = int(input_model.meta.guide_star.window_ystart)
-        y_stop = int(input_model.meta.guide_star.window_ystop)
-        # set pixeldq array to GW_AFFECTED_DATA (2**4) for the given range
-        output_model.pixeldq[:, x_start:x_stop] = pixel.GW_AFFECTED_DATA
-        log.info(
-            f"Flagging rows from: {x_start} to {x_stop} as affected by guide window read"
-        )
-        output_model.pixeldq[y_start:y_stop, x_start:x_stop] |= pixel.DO_NOT_USE
+        output_model = dq_initialization.make_ramp(input_model)
 
         # Get reference file path
         reference_file_name = self.get_reference_file(output_model, "mask")
 
-        # the reference read has been subtracted from the science data
-        # in the L1 files.  Add it back into the data.
-        # the TVAC files are special and there the reference read was
-        # already added back in
-        reference_read = getattr(input_model, "reference_read", None)
-        if reference_read is not None and not is_tvac:
-            output_model.data += reference_read
-            del output_model.reference_read
-        reference_amp33 = getattr(input_model, "reference_amp33", None)
-        if reference_amp33 is not None and not is_tvac:
-            output_model.amp33 += reference_amp33
-            del output_model.reference_amp33
-
         # Test for reference file
         if reference_file_name != "N/A" and reference_file_name is not None:
             # If there are mask files, perform dq step
             # Open the relevant reference files as datamodels
-            reference_file_model = rdm.open(reference_file_name)
+            reference_file_model = self.open_reference_model(reference_file_name)
             log.debug(f"Using MASK ref file: {reference_file_name}")
 
             # Apply the DQ step, in place
@@ -103,19 +68,8 @@ class DQInitStep(RomanStep):
             )
 
             # copy original border reference file arrays (data and dq)
-            # to their own attributes. they will also remain attached to
-            # the science data until they are trimmed at ramp_fit
-            # these arrays include the overlap regions in the corners
-
-            output_model.border_ref_pix_right = output_model.data[:, :, -4:].copy()
-            output_model.border_ref_pix_left = output_model.data[:, :, :4].copy()
-            output_model.border_ref_pix_top = output_model.data[:, :4, :].copy()
-            output_model.border_ref_pix_bottom = output_model.data[:, -4:, :].copy()
-
-            output_model.dq_border_ref_pix_right = output_model.pixeldq[:, -4:].copy()
-            output_model.dq_border_ref_pix_left = output_model.pixeldq[:, :4].copy()
-            output_model.dq_border_ref_pix_top = output_model.pixeldq[:4, :].copy()
-            output_model.dq_border_ref_pix_bottom = output_model.pixeldq[-4:, :].copy()
+            # to their own attributes.
+            dq_initialization.copy_border_ref_pix(output_model)
 
         else:
             # Skip DQ step if no mask files
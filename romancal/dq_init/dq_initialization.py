@@ -1,5 +1,8 @@
 import logging
 
+from roman_datamodels.datamodels import FpsModel, RampModel, ScienceRawModel, TvacModel
+from roman_datamodels.dqflags import pixel
+
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
@@ -84,3 +87,82 @@ def apply_dqinit(science, mask):
         science.pixeldq |= mask.dq
 
     return science
+
+
+def make_ramp(input_model):
+    """Convert an uncalibrated exposure into a RampModel.
+
+    The pixels read with the guide window are flagged in the pixeldq
+    array, and the reference read, which has been subtracted from the
+    science data in the L1 files, is added back.
+
+    Parameters
+    ----------
+    input_model : Roman datamodel
+        The uncalibrated exposure.  TVAC and FPS models are converted to
+        science raw models first.
+
+    Returns
+    -------
+    output_model : `~roman_datamodels.datamodels.RampModel`
+        The ramp model for the exposure.
+    """
+    is_tvac = isinstance(input_model, (FpsModel | TvacModel))
+    try:
+        # note that this succeeds even for ScienceRawModels
+        input_model = ScienceRawModel.from_tvac_raw(input_model)
+    except ValueError:
+        pass
+
+    # Convert to RampModel
+    output_model = RampModel.from_science_raw(input_model)
+
+    # guide window range information
+    x_start = int(input_model.meta.guide_star.window_xstart)
+    x_stop = int(input_model.meta.guide_star.window_xstop)
+    y_start = int(input_model.meta.guide_star.window_ystart)
+    y_stop = int(input_model.meta.guide_star.window_ystop)
+    # set pixeldq array to GW_AFFECTED_DATA (2**4) for the given range
+    output_model.pixeldq[:, x_start:x_stop] = pixel.GW_AFFECTED_DATA
+    log.info(
+        f"Flagging rows from: {x_start} to {x_stop} as affected by guide window read"
+    )
+    output_model.pixeldq[y_start:y_stop, x_start:x_stop] |= pixel.DO_NOT_USE
+
+    # the reference read has been subtracted from the science data
+    # in the L1 files.  Add it back into the data.
+    # the TVAC files are special and there the reference read was
+    # already added back in
+    reference_read = getattr(input_model, "reference_read", None)
+    if reference_read is not None and not is_tvac:
+        output_model.data += reference_read
+        del output_model.reference_read
+    reference_amp33 = getattr(input_model, "reference_amp33", None)
+    if reference_amp33 is not None and not is_tvac:
+        output_model.amp33 += reference_amp33
+        del output_model.reference_amp33
+
+    return output_model
+
+
+def copy_border_ref_pix(model):
+    """Copy the border reference pixels to their own attributes.
+
+    The original border reference pixel arrays (data and dq) remain
+    attached to the science data until they are trimmed at ramp_fit.
+    These arrays include the overlap regions in the corners.
+
+    Parameters
+    ----------
+    model : `~roman_datamodels.datamodels.RampModel`
+        The ramp model, updated in place.
+    """
+    model.border_ref_pix_right = model.data[:, :, -4:].copy()
+    model.border_ref_pix_left = model.data[:, :, :4].copy()
+    model.border_ref_pix_top = model.data[:, :4, :].copy()
+    model.border_ref_pix_bottom = model.data[:, -4:, :].copy()
+
+    model.dq_border_ref_pix_right = model.pixeldq[:, -4:].copy()
+    model.dq_border_ref_pix_left = model.pixeldq[:, :4].copy()
+    model.dq_border_ref_pix_top = model.pixeldq[:4, :].copy()
+    model.dq_border_ref_pix_bottom = model.pixeldq[-4:, :].copy()
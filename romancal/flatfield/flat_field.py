@@ -7,6 +7,8 @@ import logging
 import numpy as np
 from roman_datamodels.dqflags import pixel
 
+from romancal.lib.basic_utils import row_bands
+
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
@@ -71,7 +73,7 @@ def do_flat_field(output_model, flat_model, include_var_flat=False):
         output_model.meta.cal_step.flat_field = "COMPLETE"
 
 
-def apply_flat_field(science, flat, include_var_flat=False):
+def apply_flat_field(science, flat, include_var_flat=False, rows_per_band=256):
     """Flat field the data and error arrays.
 
     Extended summary
@@ -81,6 +83,9 @@ def apply_flat_field(science, flat, include_var_flat=False):
     field arrays. Applies portion of flat field corresponding to science
     image subarray.
 
+    The science arrays are updated in place, one band of rows at a time,
+    so the only temporary arrays are the size of a band.
+
     Parameters
     ----------
     science : Roman data model
@@ -91,49 +96,57 @@ def apply_flat_field(science, flat, include_var_flat=False):
 
     include_var_flat : bool
         compute & store the flat vield variance?
+
+    rows_per_band : int or None
+        The number of rows in each band. If None, all rows are processed
+        at once.
     """
-    flat_data = flat.data.copy()
-    flat_dq = flat.dq.copy()
-    flat_err = flat.err.copy()
-    # Find pixels in the flat that have a value of NaN and set
-    # their DQ to NO_FLAT_FIELD
-    flat_nan = np.isnan(flat_data)
-    flat_dq[flat_nan] = np.bitwise_or(flat_dq[flat_nan], pixel.NO_FLAT_FIELD)
-
-    # Find pixels in the flat that have a value of zero, and set
-    # their DQ to NO_FLAT_FIELD
-    flat_zero = np.where(flat_data == 0.0)
-    flat_dq[flat_zero] = np.bitwise_or(flat_dq[flat_zero], pixel.NO_FLAT_FIELD)
-
-    # Find all pixels in the flat that have a DQ value of NO_FLAT_FIELD
-    flat_bad = np.bitwise_and(flat_dq, pixel.NO_FLAT_FIELD)
-
-    # Reset the flat value of all bad pixels to 1.0, so that no
-    # correction is made
-    flat_data[np.where(flat_bad)] = 1.0
-    # Now let's apply the correction to science data and error arrays.  Rely
-    # on array broadcasting to handle the cubes
-    science.data = (science.data / flat_data).astype(science.data.dtype)
-
-    # Update the variances using BASELINE algorithm.  For guider data, it has
-    # not gone through ramp fitting so there is no Poisson noise or readnoise
-    flat_data_squared = flat_data**2
-    science.var_poisson /= flat_data_squared
-    if hasattr(science, "var_rnoise"):
-        science.var_rnoise /= flat_data_squared
-
-    # Scale err by flat (err = sqrt(variance), so divide by flat not flat^2)
-    science.err /= flat_data
+    has_var_rnoise = hasattr(science, "var_rnoise")
+    if include_var_flat:
+        var_flat = np.empty(science.data.shape, dtype=np.float32)
+
+    for band in row_bands(science.data.shape[0], rows_per_band):
+        # Find pixels in the flat that have a value of NaN or zero and
+        # set their DQ to NO_FLAT_FIELD
+        flat_data = flat.data[band].copy()
+        flat_dq = flat.dq[band].copy()
+        flat_dq[np.isnan(flat_data) | (flat_data == 0.0)] |= pixel.NO_FLAT_FIELD
+
+        # Reset the flat value of all pixels with a DQ value of
+        # NO_FLAT_FIELD to 1.0, so that no correction is made
+        flat_data[(flat_dq & pixel.NO_FLAT_FIELD) != 0] = 1.0
+
+        # Now let's apply the correction to science data and error arrays.
+        data = science.data[band]
+        np.divide(data, flat_data, out=data, casting="unsafe")
+
+        # Update the variances using BASELINE algorithm.  For guider data, it
+        # has not gone through ramp fitting so there is no Poisson noise or
+        # readnoise
+        flat_data_squared = flat_data**2
+        science.var_poisson[band] /= flat_data_squared
+        if has_var_rnoise:
+            science.var_rnoise[band] /= flat_data_squared
+
+        # Scale err by flat (err = sqrt(variance), so divide by flat not flat^2)
+        err = science.err[band]
+        err /= flat_data
+
+        if include_var_flat:
+            band_var_flat = var_flat[band]
+            np.square(data, out=band_var_flat)
+            band_var_flat /= flat_data_squared
+            band_var_flat *= flat.err[band] ** 2
+            # Add var_flat contribution to err
+            np.square(err, out=err)
+            err += band_var_flat
+            np.sqrt(err, out=err)
+
+        # Combine the science and flat DQ arrays
+        science.dq[band] |= flat_dq
 
     if include_var_flat:
-        var_flat = science.data**2 / flat_data_squared * flat_err**2
         try:
             science.var_flat = var_flat
         except AttributeError:
-            science["var_flat"] = np.zeros(shape=science.data.shape, dtype=np.float32)
-            science.var_flat = var_flat
-        # Add var_flat contribution to err
-        science.err = np.sqrt(science.err**2 + var_flat)
-
-    # Combine the science and flat DQ arrays
-    science.dq = np.bitwise_or(science.dq, flat_dq)
+            science["var_flat"] = var_flat
@@ -7,8 +7,6 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
-import roman_datamodels as rdm
-
 from romancal.datamodels.fileio import open_dataset
 
 from ..stpipe import RomanStep
@@ -45,7 +43,7 @@ class FlatFieldStep(RomanStep):
             reference_file_name = None
 
         if reference_file_name is not None:
-            reference_file_model = rdm.open(reference_file_name)
+            reference_file_model = self.open_reference_model(reference_file_name)
             log.debug(f"Using FLAT ref file: {reference_file_name}")
         else:
             reference_file_model = None
@@ -2,8 +2,10 @@ import numpy as np
 import pytest
 from astropy.time import Time
 from roman_datamodels.datamodels import FlatRefModel, ImageModel
+from roman_datamodels.dqflags import pixel
 
 from romancal.flatfield import FlatFieldStep
+from romancal.flatfield.flat_field import apply_flat_field
 
 RNG = np.random.default_rng(172)
 
@@ -119,6 +121,55 @@ def test_skip_var_flat(include_var_flat):
     assert hasattr(result, "var_flat") == include_var_flat
 
 
+@pytest.mark.parametrize("include_var_flat", (True, False))
+def test_apply_flat_field(include_var_flat):
+    """Test the flat field of each pixel, in bands of rows"""
+    shape = (50, 40)
+
+    flat = FlatRefModel.create_fake_data(shape=shape)
+    flat.data = RNG.uniform(0.5, 1.5, size=shape).astype(np.float32)
+    flat.data[3, 4] = np.nan
+    flat.data[20, 5] = 0.0
+    flat.dq = np.zeros(shape, dtype=np.uint32)
+    flat.dq[40, 6] = pixel.NO_FLAT_FIELD
+    flat.dq[41, 7] = pixel.DEAD
+    flat.err = RNG.uniform(0, 0.05, size=shape).astype(np.float32)
+    flat.data.flags.writeable = False
+
+    science = ImageModel.create_fake_data(shape=shape)
+    for name in ("data", "err", "var_poisson", "var_rnoise"):
+        science[name] = RNG.uniform(1, 2, size=shape).astype(np.float32)
+    science.dq = np.zeros(shape, dtype=np.uint32)
+    expected = science.copy()
+
+    apply_flat_field(science, flat, include_var_flat, rows_per_band=7)
+
+    bad = np.zeros(shape, dtype=bool)
+    bad[3, 4] = bad[20, 5] = bad[40, 6] = True
+    flat_data = np.where(bad, 1.0, flat.data).astype(np.float32)
+    np.testing.assert_allclose(science.data, expected.data / flat_data, rtol=1e-6)
+    np.testing.assert_allclose(
+        science.var_poisson, expected.var_poisson / flat_data**2, rtol=1e-6
+    )
+    np.testing.assert_allclose(
+        science.var_rnoise, expected.var_rnoise / flat_data**2, rtol=1e-6
+    )
+    if include_var_flat:
+        var_flat = science.data**2 / flat_data**2 * flat.err**2
+        np.testing.assert_allclose(science.var_flat, var_flat, rtol=1e-6)
+        np.testing.assert_allclose(
+            science.err,
+            np.sqrt((expected.err / flat_data) ** 2 + var_flat),
+            rtol=1e-6,
+        )
+    else:
+        assert "var_flat" not in science
+        np.testing.assert_allclose(science.err, expected.err / flat_data, rtol=1e-6)
+    assert np.all(science.dq[bad] & pixel.NO_FLAT_FIELD)
+    assert science.dq[41, 7] == pixel.DEAD
+    assert np.count_nonzero(science.dq) == 4
+
+
 @pytest.mark.parametrize(
     "instrument",
     [
@@ -1,5 +1,7 @@
 """General utility objects"""
 
+import functools
+
 import numpy as np
 from roman_datamodels.dqflags import group, pixel
 
@@ -152,6 +154,159 @@ def parse_visitID(visit_id):
     return visit_id_parts
 
 
+def row_bands(nrows, rows_per_band=None):
+    """
+    Split the rows of an image into contiguous bands.
+
+    Parameters
+    ----------
+    nrows : int
+        The number of rows in the image.
+    rows_per_band : int or None, optional
+        The maximum number of rows in each band.  If None (or 0), a single
+        band covering all the rows is produced.
+
+    Yields
+    ------
+    band : slice
+        Slice selecting the rows of each band, in order.
+    """
+    if not rows_per_band or rows_per_band >= nrows:
+        yield slice(None)
+        return
+
+    for start in range(0, nrows, rows_per_band):
+        yield slice(start, min(start + rows_per_band, nrows))
+
+
+class FrameReadTimes:
+    """
+    Separable representation of the pixel read times for a single frame.
+
+    This is a placeholder model that assumes a uniform read across each
+    channel within the frame time.  A more careful treatment will need to
+    account for time spent reading out the guide window.
+
+    Data shape for the frame is assumed to be 4096 x 4096, with 32 channels
+    along the columns.  Pixels are read in order, row by row within each
+    channel, so the read time of pixel ``(row, column)`` is::
+
+        (row_index[row] + column_index[column]) * pixel_time + offset
+
+    Only these two 4096 element index arrays are stored; use
+    `frame_read_times` for the full array.
+
+    Parameters
+    ----------
+    frame_time : float
+        The frame time for the exposure, in seconds.
+    sca : int
+        The WFI detector number (1-18).
+    frame_number : float, optional
+        The frame number.  Default of zero means that pixels start
+        reading out at t=0.
+    """
+
+    nchannel = 32
+    nrow = 4096
+    ncol = 128
+
+    def __init__(self, frame_time, sca, frame_number=0):
+        self.frame_time = frame_time
+        self.sca = sca
+        self.frame_number = frame_number
+        self.pixel_time = frame_time / (self.nrow * self.ncol)
+        self.offset = frame_number * frame_time
+
+        # Index of the first pixel read in each row of a channel
+        row_index = np.arange(self.nrow) * self.ncol
+
+        # WFI channels alternate readout direction in the +x and -x directions
+        # we implement this by flipping the x direction of every other channel
+        channel_index = np.arange(self.ncol)
+        column_index = np.tile(
+            np.concatenate([channel_index, channel_index[::-1]]), self.nchannel // 2
+        )
+
+        # Apply science -> detector flipping for read order.
+        # Detectors with SCA % 3 == 0 flip columns; others flip rows.
+        if sca % 3 == 0:
+            column_index = column_index[::-1]
+        else:
+            row_index = row_index[::-1]
+
+        self.row_index = row_index
+        self.column_index = column_index
+        self.row_index.flags.writeable = False
+        self.column_index.flags.writeable = False
+
+    @property
+    def shape(self):
+        return (self.row_index.size, self.column_index.size)
+
+    def row_times(self, columns=slice(None)):
+        """
+        Mean read time of each row.
+
+        Parameters
+        ----------
+        columns : slice, optional
+            The columns to average over.
+
+        Returns
+        -------
+        `~numpy.ndarray`
+            The mean read time in seconds for each row.
+        """
+        mean_column = np.mean(self.column_index[columns])
+        return (self.row_index + mean_column) * self.pixel_time + self.offset
+
+    def column_times(self, rows=slice(None)):
+        """
+        Mean read time of each column.
+
+        Parameters
+        ----------
+        rows : slice, optional
+            The rows to average over.
+
+        Returns
+        -------
+        `~numpy.ndarray`
+            The mean read time in seconds for each column.
+        """
+        mean_row = np.mean(self.row_index[rows])
+        return (mean_row + self.column_index) * self.pixel_time + self.offset
+
+    def to_array(self, rows=slice(None)):
+        """
+        Compute the read times for the pixels of some (by default all) rows.
+
+        Parameters
+        ----------
+        rows : slice, optional
+            The rows to compute.
+
+        Returns
+        -------
+        read_times : `~numpy.ndarray`
+            The read time in seconds for each pixel in the rows.
+        """
+        read_times = (
+            self.row_index[rows, np.newaxis] + self.column_index
+        ) * self.pixel_time
+        read_times += self.offset
+        return read_times
+
+
+# Each array takes 128 MiB, so only the most recently used ones are kept
+@functools.lru_cache(maxsize=2)
+def _cached_frame_read_times(frame_time, sca, frame_number):
+    read_times = FrameReadTimes(frame_time, sca, frame_number).to_array()
+    read_times.flags.writeable = False
+    return read_times
+
+
 def frame_read_times(frame_time, sca, frame_number=0):
     """
     Compute the pixel read times for a single frame.
@@ -164,6 +319,10 @@ def frame_read_times(frame_time, sca, frame_number=0):
     Data shape for the frame is assumed to be 4096 x 4096, with
     32 channels along the columns.
 
+    The most recently used read time arrays are cached, so the
+    returned array is read-only.  Use `FrameReadTimes` for row or
+    column averages without computing the full array.
+
     Parameters
     ----------
     frame_time : float
@@ -177,32 +336,10 @@ def frame_read_times(frame_time, sca, frame_number=0):
     Returns
     -------
     read_times : `~numpy.ndarray`
-        A 4096 x 4096 array containing the read time in seconds for each pixel.
+        A read-only 4096 x 4096 array containing the read time in seconds
+        for each pixel.
     """
-    nchannel = 32
-    nrow = 4096
-    ncol = 128
-    one_channel_read_time = np.linspace(
-        0, frame_time, nrow * ncol, endpoint=False
-    ).reshape(nrow, ncol)
-
-    # WFI channels alternate readout direction in the +x and -x directions
-    # we implement this by flipping the x direction of every other channel
-    two_channel_read_times = np.concatenate(
-        [one_channel_read_time, one_channel_read_time[:, ::-1]], axis=1
-    )
-    read_times = np.tile(two_channel_read_times, (1, nchannel // 2))
-
-    # Apply science -> detector flipping for read order.
-    # Detectors with SCA % 3 == 0 flip columns; others flip rows.
-    if sca % 3 == 0:
-        read_times = read_times[:, ::-1]
-    else:
-        read_times = read_times[::-1, :]
-
-    read_times += frame_number * frame_time
-
-    return read_times
+    return _cached_frame_read_times(frame_time, sca, frame_number)
 
 
 def compute_var_rnoise(model):
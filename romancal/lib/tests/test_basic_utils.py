@@ -4,7 +4,14 @@ import numpy as np
 import pytest
 from astropy.table import Table
 
-from romancal.lib.basic_utils import bytes2human, is_association, recarray_to_ndarray
+from romancal.lib.basic_utils import (
+    FrameReadTimes,
+    bytes2human,
+    frame_read_times,
+    is_association,
+    recarray_to_ndarray,
+    row_bands,
+)
 
 test_data = [
     (1000, "1000B"),
@@ -55,3 +62,58 @@ def test_is_association(expected, asn_data):
     """
 
     assert is_association(asn_data) is expected
+
+
+@pytest.mark.parametrize(
+    "rows_per_band, expected",
+    [
+        (None, [slice(None)]),
+        (10, [slice(None)]),
+        (4, [slice(0, 4), slice(4, 8), slice(8, 10)]),
+        (5, [slice(0, 5), slice(5, 10)]),
+    ],
+)
+def test_row_bands(rows_per_band, expected):
+    """
+    Test splitting rows into bands.
+    """
+
+    assert list(row_bands(10, rows_per_band)) == expected
+
+
+@pytest.mark.parametrize("sca", [1, 3])
+def test_frame_read_times(sca):
+    """
+    Test the read times follow the read order of the channels.
+    """
+    frame_time = 3.04
+    read_times = frame_read_times(frame_time, sca, 2)
+
+    assert read_times.shape == (4096, 4096)
+    assert frame_read_times(frame_time, sca, 2) is read_times
+
+    # the cached array is shared, so it cannot be modified
+    assert not read_times.flags.writeable
+    with pytest.raises(ValueError, match="read-only"):
+        read_times[0, 0] = 0
+
+    # every channel reads its pixels once, starting at the frame start
+    channel = np.sort(read_times[:, :128], axis=None)
+    pixel_time = frame_time / channel.size
+    np.testing.assert_allclose(
+        channel, 2 * frame_time + np.arange(channel.size) * pixel_time
+    )
+
+    # adjacent channels read in opposite directions
+    np.testing.assert_array_equal(read_times[:, :128], read_times[:, 255:127:-1])
+
+    # the separable representation matches the full array
+    separable = FrameReadTimes(frame_time, sca, 2)
+    assert separable.shape == read_times.shape
+    np.testing.assert_array_equal(separable.to_array(slice(10, 20)), read_times[10:20])
+    np.testing.assert_allclose(
+        separable.row_times(slice(4, -4)), read_times[:, 4:-4].mean(axis=1)
+    )
+    np.testing.assert_allclose(
+        separable.column_times(slice(4, -4)), read_times[4:-4].mean(axis=0)
+    )
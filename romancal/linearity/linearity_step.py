@@ -4,16 +4,19 @@ Apply linearity correction to a science image
 
 from __future__ import annotations
 
+import functools
 import logging
+import os
 from typing import TYPE_CHECKING
 
 import numpy as np
-from roman_datamodels import datamodels as rdd
 from roman_datamodels.dqflags import group, pixel
 from stcal.linearity.linearity import linearity_correction
 
 from romancal.datamodels.fileio import open_dataset
+from romancal.lib.basic_utils import row_bands
 from romancal.stpipe import RomanStep
+from romancal.stpipe.reference_cache import REFERENCE_CACHE
 
 if TYPE_CHECKING:
     from typing import ClassVar
@@ -23,6 +26,139 @@ __all__ = ["LinearityStep"]
 log = logging.getLogger(__name__)
 
 
+class IntegralNonlinearityCorrection:
+    """
+    Integral nonlinearity (INL) correction for the science channels.
+
+    The per-channel lookup tables are converted once, when the correction
+    is built, into a single table of values and slopes for all channels, so
+    the correction for every channel is evaluated in one batched lookup. The
+    results are identical to interpolating each channel with `numpy.interp`.
+
+    Parameters
+    ----------
+    lookup_values : ndarray
+        The increasing values at which the corrections are tabulated.
+    corrections : ndarray
+        The corrections, one row of the same length as ``lookup_values``
+        per channel.
+    channel_width : int
+        The number of columns in a channel.
+    """
+
+    # Number of values corrected at a time, bounding the size of temporaries
+    block_size = 1 << 20
+
+    def __init__(self, lookup_values, corrections, channel_width=128):
+        self.channel_width = channel_width
+        self.lookup_values = np.asarray(lookup_values, dtype=np.float64)
+        corrections = np.asarray(corrections, dtype=np.float64)
+        self.nchannels, nvalues = corrections.shape
+
+        # Interpolation slopes, with a zero slope past the last value so
+        # that values beyond the table get the last correction
+        slopes = np.zeros_like(corrections)
+        slopes[:, :-1] = np.diff(corrections, axis=1) / np.diff(self.lookup_values)
+
+        # Flatten the tables for all channels, the lookup index of a
+        # column is offset by the position of its channel in the flat table
+        self._corrections = corrections.ravel()
+        self._slopes = slopes.ravel()
+        self._nvalues = nvalues
+
+        # For tables tabulated at consecutive integers the table index
+        # can be computed directly instead of searched for
+        self._unit_spacing = np.array_equal(
+            self.lookup_values, self.lookup_values[0] + np.arange(nvalues)
+        )
+
+    @classmethod
+    def from_model(cls, inl_model, ncols, channel_width=128):
+        """
+        Create the correction from an integral nonlinearity reference model.
+
+        Parameters
+        ----------
+        inl_model : datamodel
+            The integral nonlinearity reference file model.
+        ncols : int
+            Number of columns in the data, used to determine which channels
+            to extract.
+        channel_width : int
+            The number of columns in a channel.
+
+        Returns
+        -------
+        IntegralNonlinearityCorrection
+            The correction.
+        """
+        corrections = [
+            getattr(
+                inl_model.inl_table, f"science_channel_{channel_num:02d}"
+            ).correction
+            for channel_num in range(1, -(-ncols // channel_width) + 1)
+        ]
+        return cls(inl_model.value.astype("f4"), np.array(corrections), channel_width)
+
+    def _table_index(self, values):
+        """Index of the table interval containing each (clipped) value"""
+        if self._unit_spacing:
+            with np.errstate(invalid="ignore"):
+                index = (values - self.lookup_values[0]).astype(np.intp)
+        else:
+            index = np.searchsorted(self.lookup_values, values, side="right") - 1
+        return np.clip(index, 0, self.lookup_values.size - 1, out=index)
+
+    def _block_corrections(self, data):
+        """Yield the index and the correction of each block of rows of the data"""
+        ncols = data.shape[-1]
+        if ncols > self.nchannels * self.channel_width:
+            raise ValueError(
+                f"Data with {ncols} columns has more than the "
+                f"{self.nchannels} channels of the INL correction"
+            )
+        offsets = (np.arange(ncols) // self.channel_width) * self._nvalues
+        step = max(self.block_size // ncols, 1)
+        for plane in np.ndindex(data.shape[:-2]):
+            for start in range(0, data.shape[-2], step):
+                block = (*plane, slice(start, start + step))
+                values = np.clip(
+                    data[block],
+                    self.lookup_values[0],
+                    self.lookup_values[-1],
+                    dtype=np.float64,
+                )
+                index = self._table_index(values)
+                values -= self.lookup_values[index]
+                index += offsets
+                values *= self._slopes[index]
+                values += self._corrections[index]
+                yield block, values
+
+    def apply(self, data):
+        """
+        Add the INL correction to the data, in place.
+
+        Parameters
+        ----------
+        data : ndarray
+            Array of shape (..., nrows, ncols) to correct in place.
+        """
+        for block, values in self._block_corrections(data):
+            data[block] += values.astype(data.dtype)
+
+    def __call__(self, data):
+        """
+        Apply the correction for `~stcal.linearity.linearity.linearity_correction`.
+
+        stcal adds the returned correction to the data. The data is
+        corrected in place instead, so the remaining correction is zero and
+        no correction array the size of the data is allocated.
+        """
+        self.apply(data)
+        return data.dtype.type(0)
+
+
 def make_inl_correction(inl_model, ncols):
     """
     Create a callable for integral nonlinearity correction.
@@ -37,33 +173,67 @@ def make_inl_correction(inl_model, ncols):
 
     Returns
     -------
-    callable
-        A function that takes a 3D array (nreads, nrows, ncols) and returns
-        a correction array of the same shape to be added to the data.
+    IntegralNonlinearityCorrection
+        A callable that takes a 3D array (nreads, nrows, ncols), applies the
+        correction in place and returns the (zero) correction remaining to be
+        added to the data.
     """
-    channel_width = 128
-    lookup_values = inl_model.value.copy().astype("f4")
-    channel_corrections = {}
-    for start_col in range(0, ncols, channel_width):
-        channel_num = start_col // channel_width + 1
-        attr_name = f"science_channel_{channel_num:02d}"
-        channel_corrections[channel_num] = getattr(
-            inl_model.inl_table, attr_name
-        ).correction.copy()
-
-    def inl_correction(data):
-        """Apply INL correction to data array."""
-        result = np.zeros_like(data)
-        for start_col in range(0, data.shape[-1], channel_width):
-            channel_num = start_col // channel_width + 1
-            correction = channel_corrections[channel_num]
-            channel_data = data[..., start_col : start_col + channel_width]
-            result[..., start_col : start_col + channel_width] = np.interp(
-                channel_data, lookup_values, correction
-            )
-        return result
+    return IntegralNonlinearityCorrection.from_model(inl_model, ncols)
+
+
+# The tables of a correction take about 34 MB
+@functools.lru_cache(maxsize=2)
+def load_inl_correction(filename, ncols):
+    """
+    Load the integral nonlinearity correction for a reference file.
+
+    The correction is cached, so exposures from the same detector reuse
+    the correction built for the first one. The reference model is opened
+    through the process-level reference model cache.
+
+    Parameters
+    ----------
+    filename : str
+        The absolute path of the integral nonlinearity reference file.
+    ncols : int
+        Number of columns in the data.
+
+    Returns
+    -------
+    IntegralNonlinearityCorrection
+        The correction.
+    """
+    with REFERENCE_CACHE.open(filename) as inl_model:
+        return make_inl_correction(inl_model, ncols)
 
-    return inl_correction
+
+def flag_implausible_values(data, gdq):
+    """
+    Clip and flag values outside of a remotely plausible range.
+
+    Parameters
+    ----------
+    data : ndarray
+        The linearity corrected data, clipped in place.
+    gdq : ndarray
+        The group DQ array, updated in place.
+
+    Returns
+    -------
+    int
+        The number of flagged values.
+    """
+    # FIXME: force all values in array to be at least vaguely sane.
+    # This should not happen for good linearity corrections and linearity
+    # correction flagging, but current reference files have issues that
+    # cause more problems downstream.
+    # Full well is 65k DN.  After linearity correction we can't be more than
+    # a factor of several away from this.
+    # Any points larger than 1e6 should be flagged.
+    m = np.abs(data) > 1e6
+    data[m] = np.clip(data[m], -1e6, 1e6)
+    gdq[m] |= group.DO_NOT_USE
+    return np.sum(m)
 
 
 class LinearityStep(RomanStep):
@@ -74,6 +244,10 @@ class LinearityStep(RomanStep):
 
     class_alias = "linearity"
 
+    spec = """
+        rows_per_band = integer(default=None, min=1) # Process the ramp in bands of this many rows to limit memory use
+    """
+
     reference_file_types: ClassVar = [
         "linearity",
         "inverselinearity",
@@ -101,53 +275,64 @@ class LinearityStep(RomanStep):
         # INL correction is optional
         inl_correction = None
         if self.inl_name != "N/A":
-            with rdd.open(self.inl_name) as inl_model:
-                inl_correction = make_inl_correction(
-                    inl_model, input_model.data.shape[-1]
+            ncols = input_model.data.shape[-1]
+            if isinstance(self.inl_name, str):
+                inl_correction = load_inl_correction(
+                    os.path.abspath(self.inl_name), ncols
                 )
+            else:
+                with self.open_reference_model(self.inl_name) as inl_model:
+                    inl_correction = make_inl_correction(inl_model, ncols)
 
+        # When processing in bands, memory map the reference files so that only
+        # the rows of each band are read
+        memmap = self.rows_per_band is not None
         with (
-            rdd.LinearityRefModel(self.lin_name, memmap=False) as lin_model,
-            rdd.InverselinearityRefModel(self.ilin_name, memmap=False) as ilin_model,
+            self.open_reference_model(self.lin_name, memmap=memmap) as lin_model,
+            self.open_reference_model(self.ilin_name, memmap=memmap) as ilin_model,
         ):
-            lin_coeffs = lin_model.coeffs
-            lin_dq = lin_model.dq
-            ilin_coeffs = ilin_model.coeffs
             read_pattern = input_model.meta.exposure.read_pattern
+            nrows = input_model.data.shape[-2]
 
-            gdq = input_model.groupdq[np.newaxis, :]
-            pdq = input_model.pixeldq
-            input_model.data = input_model.data[np.newaxis, :]
-
-            # Call linearity correction function in stcal
-            # The third return value is the processed zero frame which
-            # Roman does not use.
-            new_data, new_pdq, _ = linearity_correction(
-                input_model.data,
-                gdq,
-                pdq,
-                lin_coeffs,
-                lin_dq,
-                pixel,
-                ilin_coeffs=ilin_coeffs,
-                additional_correction=inl_correction,
-                read_pattern=read_pattern,
+            # stcal updates the coefficients in place, so (for bands or cached
+            # read-only reference models) read them into memory rather than
+            # modifying the memory map
+            copy = memmap or not (
+                lin_model.coeffs.flags.writeable and ilin_model.coeffs.flags.writeable
             )
+            nbad = 0
+            for band in row_bands(nrows, self.rows_per_band):
+                lin_coeffs = np.array(lin_model.coeffs[:, band], copy=copy)
+                lin_dq = lin_model.dq[band]
+                ilin_coeffs = np.array(ilin_model.coeffs[:, band], copy=copy)
+
+                # The data is corrected in place, this is a view of the band
+                data = input_model.data[np.newaxis, :, band]
+                gdq = input_model.groupdq[np.newaxis, :, band]
+                pdq = input_model.pixeldq[band]
+
+                # Call linearity correction function in stcal
+                # The third return value is the processed zero frame which
+                # Roman does not use.
+                new_data, new_pdq, _ = linearity_correction(
+                    data,
+                    gdq,
+                    pdq,
+                    lin_coeffs,
+                    lin_dq,
+                    pixel,
+                    ilin_coeffs=ilin_coeffs,
+                    additional_correction=inl_correction,
+                    read_pattern=read_pattern,
+                )
+
+                input_model.data[:, band] = new_data[0, :, :, :]
+                input_model.pixeldq[band] = new_pdq
+
+                nbad += flag_implausible_values(
+                    input_model.data[:, band], input_model.groupdq[:, band]
+                )
 
-            input_model.data = new_data[0, :, :, :]
-            input_model.pixeldq = new_pdq
-
-        # FIXME: force all values in array to be at least vaguely sane.
-        # This should not happen for good linearity corrections and linearity
-        # correction flagging, but current reference files have issues that
-        # cause more problems downstream.
-        # Full well is 65k DN.  After linearity correction we can't be more than
-        # a factor of several away from this.
-        # Any points larger than 1e6 should be flagged.
-        m = np.abs(input_model.data) > 1e6
-        input_model.data[m] = np.clip(input_model.data[m], -1e6, 1e6)
-        input_model.groupdq[m] |= group.DO_NOT_USE
-        nbad = np.sum(m)
         log.warning(f"Flagged {nbad} spurious values outside remotely plausible range.")
 
         # Update the step status
@@ -5,6 +5,7 @@ Unit tests for linearity correction
 """
 
 import numpy as np
+import pytest
 from roman_datamodels import dqflags
 from roman_datamodels.datamodels import (
     IntegralnonlinearityRefModel,
@@ -13,6 +14,25 @@ from roman_datamodels.datamodels import (
 )
 
 from romancal.linearity import LinearityStep
+from romancal.linearity.linearity_step import (
+    IntegralNonlinearityCorrection,
+    load_inl_correction,
+    make_inl_correction,
+)
+
+
+def make_inl_model(lookup_values, ncols, rng):
+    """Create an INL reference model with random corrections"""
+    inl_table_data = {}
+    for start_col in range(0, ncols, 128):
+        channel_num = start_col // 128 + 1
+        inl_table_data[f"science_channel_{channel_num:02d}"] = {
+            "instrument_channel": channel_num - 1,
+            "correction": rng.normal(size=lookup_values.size),
+        }
+    return IntegralnonlinearityRefModel.create_fake_data(
+        {"value": lookup_values, "inl_table": inl_table_data}
+    )
 
 
 def test_linearity_coeff(setup_ramp_for_linearity):
@@ -130,3 +150,108 @@ def test_linearity_correction_values(setup_ramp_for_linearity):
     # integral non-linearity corrects 100 -> 101, classical non-linearity
     # doubles to 202.
     np.testing.assert_array_equal(result.data[:, 1, :], 202)
+
+
+def test_linearity_rows_per_band(setup_ramp_for_linearity):
+    """Test that processing the ramp in bands of rows gives the same result."""
+
+    shape = (5, 20, 256)
+    rng = np.random.default_rng(42)
+
+    lin_coeffs = np.zeros(shape, dtype=np.float32)
+    lin_coeffs[1] = 0.85
+    lin_coeffs[2] = 4.62e-06
+    lin_coeffs[0:, 5, 5] = np.nan
+    ilin_coeffs = np.zeros(shape, dtype=np.float32)
+    ilin_coeffs[1] = 1.1
+    ilin_coeffs[2] = -1e-06
+
+    data = np.cumsum(rng.uniform(0, 1000, shape), axis=0).astype(np.float32)
+    data[:, 3, 7] = 1e8
+
+    results = []
+    for rows_per_band in (None, 6):
+        result = setup_ramp_for_linearity(shape)
+        result.data = data.copy()
+        result = LinearityStep.call(
+            result,
+            override_linearity=LinearityRefModel.create_fake_data(
+                {"coeffs": lin_coeffs.copy()}, shape=shape[1:]
+            ),
+            override_inverselinearity=InverselinearityRefModel.create_fake_data(
+                {"coeffs": ilin_coeffs.copy()}, shape=shape[1:]
+            ),
+            override_integralnonlinearity="N/A",
+            rows_per_band=rows_per_band,
+        )
+        assert result.meta.cal_step.linearity == "COMPLETE"
+        results.append(result)
+
+    unbanded, banded = results
+    np.testing.assert_array_equal(banded.data, unbanded.data)
+    np.testing.assert_array_equal(banded.pixeldq, unbanded.pixeldq)
+    np.testing.assert_array_equal(banded.groupdq, unbanded.groupdq)
+    assert banded.pixeldq[5, 5] == dqflags.pixel["NO_LIN_CORR"]
+    assert banded.groupdq[-1, 3, 7] & dqflags.group["DO_NOT_USE"]
+
+
+@pytest.mark.parametrize(
+    "lookup_values",
+    [np.arange(-100, 1000, dtype="f4"), np.geomspace(1, 1000, 300, dtype="f4")],
+    ids=["unit_spacing", "irregular"],
+)
+def test_inl_correction_matches_interp(lookup_values):
+    """The batched INL correction matches interpolating each channel"""
+    rng = np.random.default_rng(42)
+    ncols = 300
+    inl_model = make_inl_model(lookup_values, ncols, rng)
+
+    data = rng.uniform(-200, 1100, size=(3, 7, ncols)).astype("f4")
+    data[0, 0, :3] = [np.nan, lookup_values[0], lookup_values[-1]]
+
+    expected = np.zeros_like(data)
+    for start_col in range(0, ncols, 128):
+        channel_num = start_col // 128 + 1
+        channel = slice(start_col, start_col + 128)
+        correction = getattr(
+            inl_model.inl_table, f"science_channel_{channel_num:02d}"
+        ).correction
+        expected[..., channel] = np.interp(
+            data[..., channel], lookup_values, correction
+        )
+
+    inl_correction = make_inl_correction(inl_model, ncols)
+    # Use small blocks to exercise the blocking
+    inl_correction.block_size = 1000
+    corrected = data.copy()
+    inl_correction.apply(corrected)
+    np.testing.assert_array_equal(corrected, data + expected)
+
+    # Called from stcal the data is corrected in place
+    corrected = data.copy()
+    corrected += inl_correction(corrected)
+    np.testing.assert_array_equal(corrected, data + expected)
+
+
+def test_inl_correction_too_many_columns():
+    """The data cannot have more columns than the INL channels"""
+    inl_correction = IntegralNonlinearityCorrection(
+        np.arange(10), np.zeros((2, 10)), channel_width=4
+    )
+    with pytest.raises(ValueError):
+        inl_correction.apply(np.zeros((2, 3, 9), dtype="f4"))
+
+
+def test_inl_correction_cached(tmp_path):
+    """The correction is built once per reference file"""
+    rng = np.random.default_rng(42)
+    filename = str(tmp_path / "inl.asdf")
+    make_inl_model(np.arange(1000, dtype="u2"), 256, rng).save(filename)
+
+    load_inl_correction.cache_clear()
+    try:
+        inl_correction = load_inl_correction(filename, 256)
+        assert load_inl_correction(filename, 256) is inl_correction
+        assert load_inl_correction(filename, 128) is not inl_correction
+    finally:
+        load_inl_correction.cache_clear()
@@ -1,10 +1,8 @@
 import logging
-import warnings
 
 import numpy as np
-from astropy.convolution import convolve_fft
-from astropy.utils.exceptions import AstropyUserWarning
 from photutils.segmentation import make_2dgaussian_kernel
+from scipy import fft
 
 from romancal.datamodels import ModelLibrary
 from romancal.lib.basic_utils import compute_var_rnoise
@@ -37,44 +35,77 @@ def make_gaussian_kernel(fwhm):
     return kernel.array
 
 
-def make_det_image(library, kernel_fwhm):
+def _kernel_fft(kernel, fft_shape):
     """
-    Make a detection image from a library of models.
+    Real FFT of a kernel centered on the origin of an array of
+    ``fft_shape``, for convolution by multiplication with the FFT of an
+    image zero-padded to the same shape.
+    """
+    ny, nx = kernel.shape
+    padded = np.zeros(fft_shape)
+    padded[:ny, :nx] = kernel
+    padded = np.roll(padded, (-(ny // 2), -(nx // 2)), axis=(0, 1))
+    return fft.rfftn(padded)
 
-    The detection image is the weighted sum of the input models, where
-    the weights are SED weight divided by the read noise variance.
+
+def _convolve(data_fft, mask_fft, kernel_fft, kernel_sum, fft_shape, bad):
+    """
+    Finish the convolution of an image from its FFT.
+
+    Masked pixels of the image were set to zero before its FFT, and the
+    convolved values are renormalized by the convolved coverage, as
+    `~astropy.convolution.convolve_fft` does to interpolate over them
+    (with the default ``boundary="fill"`` and ``fill_value=0``, which
+    count pixels beyond the edges as covered).  Pixels that were masked,
+    or that have no coverage within the kernel, are zero in the output.
+    """
+    ny, nx = bad.shape
+    conv = fft.irfftn(data_fft * kernel_fft, fft_shape)[:ny, :nx]
+    # the kernel is normalized, so the coverage is one minus the
+    # convolved mask
+    wt = 1.0 - fft.irfftn(mask_fft * kernel_fft, fft_shape)[:ny, :nx]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        conv *= kernel_sum / wt
+    conv[(wt < 10 * np.finfo(wt.dtype).eps) | bad] = 0.0
+    return conv
+
+
+def make_det_images(library, kernel_fwhms):
+    """
+    Make detection images for several kernels from a library of models.
+
+    Each detection image is the weighted sum of the input models,
+    smoothed by one of the kernels, divided by its error.  The weights
+    are SED weight divided by the read noise variance.
+
+    The library is read once, and the weighted data and variance of
+    each model are Fourier transformed once and then convolved with
+    every kernel in frequency space.
 
     Parameters
     ----------
     library : `romancal.datamodels.ModelLibrary`
         The input library of models.
 
-    kernel_fwhm : float
+    kernel_fwhms : list of float
         The full-width at half-maximum (FWHM) in pixels of the 2D
-        Gaussian kernel used to smooth the detection image.
+        Gaussian kernels used to smooth the detection images.
 
     Returns
     -------
-    detection_data : 2D `numpy.ndarray`
-        The detection image data.
-
-    detection_error : 2D `numpy.ndarray`
-        The detection image (standard deviation) error.
+    detection_images : list of 2D `numpy.ndarray`
+        The detection image (signal-to-noise) for each kernel.
     """
     if not isinstance(library, ModelLibrary):
         raise TypeError("library input must be a ModelLibrary object")
 
     # TODO: extend to different kernel shapes beyond Gaussian?
     # would require different/additional kernel parameters
-    kernel = make_gaussian_kernel(kernel_fwhm)
+    kernels = [make_gaussian_kernel(kernel_fwhm) for kernel_fwhm in kernel_fwhms]
 
-    log.info(f"Making detection image with kernel FWHM={kernel_fwhm}")
+    log.info(f"Making detection images with kernel FWHMs={list(kernel_fwhms)}")
 
     with library:
-        detection_data = 0.0
-        detection_var = 0.0
-        wht_sum = 0.0
-        all_nan_mask = False
         for i, model in enumerate(library):
             # TODO: SED weights to be defined in the asn file for each
             # input filter image
@@ -88,6 +119,24 @@ def make_det_image(library, kernel_fwhm):
                 f"filter={model.meta.instrument.optical_element}, {sed_weight=}"
             )
 
+            if i == 0:
+                # pad by the largest kernel so the convolutions do not wrap
+                shape = model.data.shape
+                fft_shape = tuple(
+                    fft.next_fast_len(size + max(k.shape[axis] for k in kernels), True)
+                    for axis, size in enumerate(shape)
+                )
+                data_kernels = [
+                    (_kernel_fft(k / k.sum(), fft_shape), k.sum()) for k in kernels
+                ]
+                var_kernels = [
+                    (_kernel_fft(k**2 / (k**2).sum(), fft_shape), (k**2).sum())
+                    for k in kernels
+                ]
+                detection_data = [np.zeros(shape) for _ in kernels]
+                detection_var = [np.zeros(shape) for _ in kernels]
+                wht_sum = 0.0
+
             # Ideally the weights should be the inverse variance of
             # all sources of noise except the source Poisson noise. The
             # closest approximation we have is var_rnoise (read noise
@@ -99,26 +148,32 @@ def make_det_image(library, kernel_fwhm):
             wht_sum += np.nan_to_num(wht, copy=False, nan=0.0)
 
             coverage_mask = np.isnan(model.err)
-            with warnings.catch_warnings():
-                # Suppress warnings about any NaNs in the data
-                warnings.filterwarnings(action="ignore", category=AstropyUserWarning)
-                data_conv = convolve_fft(
-                    wht * model.data,
-                    kernel,
-                    mask=coverage_mask,
-                    preserve_nan=True,
-                    normalize_kernel=False,
+            # transform in double precision, as convolve_fft does
+            weighted_data = (wht * model.data).astype(np.float64)
+            weighted_var = (wht**2 * var_rnoise).astype(np.float64)
+
+            data_bad = coverage_mask | ~np.isfinite(weighted_data)
+            var_bad = coverage_mask | ~np.isfinite(weighted_var)
+            weighted_data[data_bad] = 0.0
+            weighted_var[var_bad] = 0.0
+
+            data_fft = fft.rfftn(weighted_data, fft_shape)
+            var_fft = fft.rfftn(weighted_var, fft_shape)
+            data_mask_fft = fft.rfftn(data_bad, fft_shape)
+            if np.array_equal(var_bad, data_bad):
+                var_mask_fft = data_mask_fft
+            else:
+                var_mask_fft = fft.rfftn(var_bad, fft_shape)
+            del weighted_data, weighted_var
+
+            for j in range(len(kernels)):
+                detection_data[j] += _convolve(
+                    data_fft, data_mask_fft, *data_kernels[j], fft_shape, data_bad
                 )
-                var_conv = convolve_fft(
-                    wht**2 * var_rnoise,
-                    kernel**2,
-                    mask=coverage_mask,
-                    preserve_nan=True,
-                    normalize_kernel=False,
+                detection_var[j] += _convolve(
+                    var_fft, var_mask_fft, *var_kernels[j], fft_shape, var_bad
                 )
 
-            detection_data += np.nan_to_num(data_conv, copy=False, nan=0.0)
-            detection_var += np.nan_to_num(var_conv, copy=False, nan=0.0)
             if i == 0:
                 all_nan_mask = coverage_mask
             else:
@@ -126,14 +181,41 @@ def make_det_image(library, kernel_fwhm):
 
             library.shelve(model, modify=False)
 
-    # pixels that are NaN in all models are set to NaN in the output
-    detection_data[all_nan_mask] = np.nan
-    detection_var[all_nan_mask] = np.nan
+    detection_images = []
+    for data, var in zip(detection_data, detection_var, strict=True):
+        # pixels that are NaN in all models are set to NaN in the output
+        data[all_nan_mask] = np.nan
+        var[all_nan_mask] = np.nan
+
+        data /= wht_sum
+        error = np.sqrt(var) / wht_sum  # std dev error
+        detection_images.append(data / (error + (error == 1)))
 
-    detection_data /= wht_sum
-    detection_error = np.sqrt(detection_var) / wht_sum  # std dev error
+    return detection_images
 
-    return detection_data / (detection_error + (detection_error == 1))
+
+def make_det_image(library, kernel_fwhm):
+    """
+    Make a detection image from a library of models.
+
+    The detection image is the weighted sum of the input models, where
+    the weights are SED weight divided by the read noise variance.
+
+    Parameters
+    ----------
+    library : `romancal.datamodels.ModelLibrary`
+        The input library of models.
+
+    kernel_fwhm : float
+        The full-width at half-maximum (FWHM) in pixels of the 2D
+        Gaussian kernel used to smooth the detection image.
+
+    Returns
+    -------
+    detection_image : 2D `numpy.ndarray`
+        The detection image (signal-to-noise).
+    """
+    return make_det_images(library, [kernel_fwhm])[0]
 
 
 def make_detection_image(library, kernel_fwhms):
@@ -154,16 +236,12 @@ def make_detection_image(library, kernel_fwhms):
 
     Returns
     -------
-    detection_data : 2D `numpy.ndarray`
-        The detection image data.
-
-    detection_error : 2D `numpy.ndarray`
-        The detection image (standard deviation) error.
+    detection_image : 2D `numpy.ndarray`
+        The detection image (signal-to-noise).
     """
     log.info("Making detection image")
     det_img = -np.inf
-    for kernel_fwhm in kernel_fwhms:
-        img = make_det_image(library, kernel_fwhm)
+    for img in make_det_images(library, kernel_fwhms):
         det_img = np.fmax(det_img, img)
 
     return det_img
@@ -4,15 +4,22 @@ Module for the multiband source catalog step.
 
 from __future__ import annotations
 
+import contextlib
 import copy
 import logging
+import multiprocessing
+import os
+import tempfile
+from collections import namedtuple
+from multiprocessing import cpu_count
 
 import numpy as np
 from astropy import coordinates
 from astropy import units as u
-from astropy.table import join
+from astropy.table import hstack, join
 from astropy.time import Time
 from roman_datamodels import datamodels
+from stcal.multiprocessing import compute_num_cores
 
 from romancal.datamodels import ModelLibrary
 from romancal.multiband_catalog.background import subtract_background_library
@@ -21,6 +28,7 @@ from romancal.multiband_catalog.utils import add_filter_to_colnames
 from romancal.source_catalog import injection
 from romancal.source_catalog.background import RomanBackground
 from romancal.source_catalog.detection import make_segmentation_image
+from romancal.source_catalog.psf_cache import PSF_MODEL_CACHE
 from romancal.source_catalog.source_catalog import RomanSourceCatalog
 from romancal.source_catalog.utils import get_ee_spline
 
@@ -148,91 +156,79 @@ def multiband_catalog(self, library, example_model, cat_model, ee_spline):
 
     time_means = []
     exposure_times = []
-
-    # Create catalogs for each input image
-    with library:
-        for model in library:
-            mask = ~np.isfinite(model.data) | ~np.isfinite(model.err) | (model.err <= 0)
-
-            if self.fit_psf:
+    filter_names = []
+    results = []
+
+    n_workers = compute_num_cores(self.maximum_cores, len(library), cpu_count())
+    with contextlib.ExitStack() as stack:
+        # Create catalogs for each input image, or with more than one
+        # process write the images to files for the worker processes
+        if n_workers > 1:
+            tmpdir = stack.enter_context(tempfile.TemporaryDirectory())
+        tasks = []
+        with library:
+            for index, model in enumerate(library):
                 filter_name = model.meta.instrument.optical_element
-                log.info(f"Creating catalog for {filter_name} image")
-                ref_file = self.get_reference_file(model, "epsf")
-                log.info("Using ePSF reference file: %s", ref_file)
-                psf_ref_model = datamodels.open(ref_file)
-            else:
-                psf_ref_model = None
-
-            apcorr_ref = self.get_reference_file(model, "apcorr")
-            ee_spline = get_ee_spline(model, apcorr_ref)
-
-            catobj = RomanSourceCatalog(
-                model,
-                cat_model,
-                segment_img,
-                None,
-                star_kernel_fwhm,
-                fit_psf=self.fit_psf,
-                detection_cat=det_catobj,
-                mask=mask,
-                psf_ref_model=psf_ref_model,
-                cat_type="dr_band",
-                ee_spline=ee_spline,
-            )
+                filter_names.append(filter_name)
+                if self.fit_psf:
+                    log.info(f"Creating catalog for {filter_name} image")
+                    psf_ref_file = self.get_reference_file(model, "epsf")
+                    log.info("Using ePSF reference file: %s", psf_ref_file)
+                else:
+                    psf_ref_file = None
+                apcorr_ref = self.get_reference_file(model, "apcorr")
 
-            # Add the filter name to the column names
-            filter_name = model.meta.instrument.optical_element
-            cat = add_filter_to_colnames(catobj.catalog, filter_name)
-            ee_fractions = cat.meta["ee_fractions"]
-
-            # TODO: what metadata do we want to keep, if any,
-            # from the filter catalogs?
-            cat.meta = None
-
-            # Add the filter catalog to the multiband catalog.
-            # The outer join prevents an empty table if any
-            # columns have the same name but different values
-            # (e.g., repeated filter names)
-            det_cat = join(det_cat, cat, keys="label", join_type="outer")
-            det_cat.meta["ee_fractions"][filter_name.lower()] = ee_fractions
-
-            # accumulate image metadata
-            image_meta = {
-                k: copy.deepcopy(v)
-                for k, v in model["meta"].items()
-                if k not in _SKIP_IMAGE_META_KEYS
-            }
-            cat_model.meta.image_metas.append(image_meta)
-
-            # blend model with catalog metadata
-            if model.meta.file_date < cat_model.meta.image.file_date:
-                cat_model.meta.image.file_date = model.meta.file_date
-
-            for key, value in image_meta.items():
-                if key in _SKIP_BLEND_KEYS:
-                    continue
-                if not isinstance(value, dict):
-                    # skip blending of single top-level values
-                    continue
-                if key not in cat_model.meta:
-                    # skip blending if the key is not in the catalog meta
-                    continue
-                if key == "coadd_info":
-                    cat_model.meta[key]["time_first"] = min(
-                        cat_model.meta[key]["time_first"], value["time_first"]
-                    )
-                    cat_model.meta[key]["time_last"] = max(
-                        cat_model.meta[key]["time_last"], value["time_last"]
-                    )
-                    time_means.append(value["time_mean"])
-                    exposure_times.append(value["exposure_time"])
+                if n_workers > 1:
+                    path = os.path.join(tmpdir, f"band_{index}.asdf")
+                    model.save(path)
+                    tasks.append((path, psf_ref_file, apcorr_ref))
                 else:
-                    # set non-matching metadata values to None
-                    for subkey, subvalue in value.items():
-                        if cat_model.meta[key].get(subkey, None) != subvalue:
-                            cat_model.meta[key][subkey] = None
+                    results.append(
+                        _band_catalog(
+                            model,
+                            cat_model,
+                            segment_img,
+                            det_catobj,
+                            star_kernel_fwhm,
+                            self.fit_psf,
+                            psf_ref_file,
+                            apcorr_ref,
+                        )
+                    )
 
-            library.shelve(model, modify=False)
+                _blend_image_meta(model, cat_model, time_means, exposure_times)
+
+                library.shelve(model, index, modify=False)
+
+        if n_workers > 1:
+            log.info(
+                "Creating catalogs for %s images using %s processes",
+                len(tasks),
+                n_workers,
+            )
+            detection_cat = _DetectionCatalog(
+                det_catobj.x_centroid,
+                det_catobj.y_centroid,
+                _SegmentCatalog(det_catobj.segment_cat.source_cat),
+            )
+            ctx = multiprocessing.get_context("spawn")
+            with ctx.Pool(
+                processes=n_workers,
+                initializer=_init_band_catalog_worker,
+                initargs=(
+                    type(cat_model),
+                    segment_img,
+                    detection_cat,
+                    star_kernel_fwhm,
+                    self.fit_psf,
+                ),
+            ) as pool:
+                results = pool.starmap(_band_catalog_worker, tasks)
+
+    # Add the filter catalogs to the multiband catalog
+    det_cat = _merge_catalogs(det_cat, [cat for cat, _ in results])
+    for filter_name, (_, ee_fractions) in zip(filter_names, results, strict=True):
+        det_cat.meta["ee_fractions"][filter_name.lower()] = ee_fractions
 
     # finish blending
     cat_model.meta.coadd_info.time_mean = Time(time_means).mean()
@@ -244,6 +240,178 @@ def multiband_catalog(self, library, example_model, cat_model, ee_spline):
     return segment_img, cat_model, None
 
 
+# The parts of the detection image RomanSourceCatalog that the filter
+# image catalogs use, which unlike the full catalog can be sent to worker
+# processes.
+_SegmentCatalog = namedtuple("_SegmentCatalog", ["source_cat"])
+_DetectionCatalog = namedtuple(
+    "_DetectionCatalog", ["x_centroid", "y_centroid", "segment_cat"]
+)
+
+# state shared by the tasks of a band catalog worker process
+_worker_state = {}
+
+
+def _band_catalog(
+    model,
+    cat_model,
+    segment_img,
+    detection_cat,
+    star_kernel_fwhm,
+    fit_psf,
+    psf_ref_file,
+    apcorr_ref,
+):
+    """
+    Create the catalog of a filter image.
+
+    Returns
+    -------
+    cat : `~astropy.table.Table`
+        The catalog, with the filter name added to the column names.
+    ee_fractions : list
+        The encircled energy fractions of the apertures.
+    """
+    mask = ~np.isfinite(model.data) | ~np.isfinite(model.err) | (model.err <= 0)
+
+    if fit_psf:
+        gridded_psf_model = PSF_MODEL_CACHE.get_gridded_psf_model(psf_ref_file)
+    else:
+        gridded_psf_model = None
+    ee_spline = get_ee_spline(model, apcorr_ref)
+
+    catobj = RomanSourceCatalog(
+        model,
+        cat_model,
+        segment_img,
+        None,
+        star_kernel_fwhm,
+        fit_psf=fit_psf,
+        detection_cat=detection_cat,
+        mask=mask,
+        gridded_psf_model=gridded_psf_model,
+        cat_type="dr_band",
+        ee_spline=ee_spline,
+    )
+
+    # Add the filter name to the column names
+    filter_name = model.meta.instrument.optical_element
+    cat = add_filter_to_colnames(catobj.catalog, filter_name)
+    ee_fractions = cat.meta["ee_fractions"]
+
+    # TODO: what metadata do we want to keep, if any,
+    # from the filter catalogs?
+    cat.meta = None
+
+    return cat, ee_fractions
+
+
+def _init_band_catalog_worker(
+    cat_model_type, segment_img, detection_cat, star_kernel_fwhm, fit_psf
+):
+    """Store the inputs shared by all filter images in a worker process."""
+    _worker_state.update(
+        cat_model=cat_model_type.create_minimal(),
+        segment_img=segment_img,
+        detection_cat=detection_cat,
+        star_kernel_fwhm=star_kernel_fwhm,
+        fit_psf=fit_psf,
+    )
+
+
+def _band_catalog_worker(path, psf_ref_file, apcorr_ref):
+    """Create the catalog of the filter image in ``path``"""
+    with datamodels.open(path) as model:
+        return _band_catalog(
+            model,
+            _worker_state["cat_model"],
+            _worker_state["segment_img"],
+            _worker_state["detection_cat"],
+            _worker_state["star_kernel_fwhm"],
+            _worker_state["fit_psf"],
+            psf_ref_file,
+            apcorr_ref,
+        )
+
+
+def _merge_catalogs(det_cat, band_cats):
+    """
+    Add the filter image catalogs to the detection catalog.
+
+    All the catalogs are made from the same segmentation image, so they
+    usually have the same labels, in the same order, and distinct column
+    names.  They are then stacked in one step.  Otherwise, they are added
+    one by one with outer joins on the label, which keep every source and
+    rename columns with the same name but different values (e.g., from
+    repeated filter names).
+    """
+    colnames = set(det_cat.colnames)
+    can_stack = True
+    for cat in band_cats:
+        names = set(cat.colnames) - {"label"}
+        if names & colnames or not np.array_equal(cat["label"], det_cat["label"]):
+            can_stack = False
+            break
+        colnames |= names
+
+    if can_stack:
+        meta = det_cat.meta
+        det_cat = hstack(
+            [det_cat, *(cat[cat.colnames[1:]] for cat in band_cats)],
+            join_type="exact",
+        )
+        det_cat.meta = meta
+        return det_cat
+
+    for cat in band_cats:
+        det_cat = join(det_cat, cat, keys="label", join_type="outer")
+    return det_cat
+
+
+def _blend_image_meta(model, cat_model, time_means, exposure_times):
+    """
+    Blend the metadata of a filter image into the catalog metadata.
+
+    The mean time and exposure time of the image are appended to
+    ``time_means`` and ``exposure_times``.
+    """
+    # accumulate image metadata
+    image_meta = {
+        k: copy.deepcopy(v)
+        for k, v in model["meta"].items()
+        if k not in _SKIP_IMAGE_META_KEYS
+    }
+    cat_model.meta.image_metas.append(image_meta)
+
+    # blend model with catalog metadata
+    if model.meta.file_date < cat_model.meta.image.file_date:
+        cat_model.meta.image.file_date = model.meta.file_date
+
+    for key, value in image_meta.items():
+        if key in _SKIP_BLEND_KEYS:
+            continue
+        if not isinstance(value, dict):
+            # skip blending of single top-level values
+            continue
+        if key not in cat_model.meta:
+            # skip blending if the key is not in the catalog meta
+            continue
+        if key == "coadd_info":
+            cat_model.meta[key]["time_first"] = min(
+                cat_model.meta[key]["time_first"], value["time_first"]
+            )
+            cat_model.meta[key]["time_last"] = max(
+                cat_model.meta[key]["time_last"], value["time_last"]
+            )
+            time_means.append(value["time_mean"])
+            exposure_times.append(value["exposure_time"])
+        else:
+            # set non-matching metadata values to None
+            for subkey, subvalue in value.items():
+                if cat_model.meta[key].get(subkey, None) != subvalue:
+                    cat_model.meta[key][subkey] = None
+
+
 def make_source_injected_library(library):
     """
     Create a library of source injected models.
@@ -55,6 +55,7 @@ class MultibandCatalogStep(RomanStep):
         suffix = string(default='cat')        # Default suffix for output files
         fit_psf = boolean(default=True)       # fit source PSFs for accurate astrometry?
         inject_sources = boolean(default=False) # Inject sources into images
+        maximum_cores = string(default='1') # cores for creating the filter catalogs in parallel. Can be an integer, 'half', 'quarter', or 'all'
         save_debug_info = boolean(default=False)
                                    # Include image data and other data for testing
     """
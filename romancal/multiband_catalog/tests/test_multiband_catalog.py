@@ -6,6 +6,7 @@ import astropy.units as u
 import numpy as np
 import pyarrow
 import pytest
+from astropy.convolution import convolve_fft
 from astropy.modeling.models import Gaussian2D
 from astropy.table import Table
 from astropy.time import Time
@@ -13,7 +14,11 @@ from roman_datamodels import datamodels as rdm
 from roman_datamodels.datamodels import MosaicModel, MultibandSegmentationMapModel
 
 from romancal.datamodels import ModelLibrary
-from romancal.multiband_catalog import MultibandCatalogStep
+from romancal.multiband_catalog import MultibandCatalogStep, multiband_catalog
+from romancal.multiband_catalog.detection_image import (
+    make_det_images,
+    make_gaussian_kernel,
+)
 from romancal.multiband_catalog.multiband_catalog import match_recovered_sources
 from romancal.skycell.tests.test_skycell_match import mk_gwcs
 
@@ -453,3 +458,78 @@ def test_match_recovered_sources():
     # Test columns included or excluded as expected
     assert "one" in rec_table.colnames
     assert "empty" not in rec_table.colnames
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_make_det_images(library_model):
+    """
+    Test that the single pass over the library gives the detection image
+    of each kernel computed with convolve_fft.
+    """
+    with library_model:
+        for i, model in enumerate(library_model):
+            model.err[:5] = np.nan
+            model.var_rnoise[40:45, 60:70] = np.nan
+            model.data *= i + 1
+            library_model.shelve(model, i)
+
+    kernel_fwhms = [2.0, 3.0]
+    det_images = make_det_images(library_model, kernel_fwhms)
+
+    for kernel_fwhm, det_image in zip(kernel_fwhms, det_images, strict=True):
+        kernel = make_gaussian_kernel(kernel_fwhm)
+        data_sum = var_sum = wht_sum = 0.0
+        with library_model:
+            for i, model in enumerate(library_model):
+                wht = np.nan_to_num(1 / model.var_rnoise, nan=0.0)
+                mask = np.isnan(model.err)
+                kwargs = {"mask": mask, "preserve_nan": True, "normalize_kernel": False}
+                data_sum += np.nan_to_num(
+                    convolve_fft(wht * model.data, kernel, **kwargs)
+                )
+                var_sum += np.nan_to_num(
+                    convolve_fft(wht**2 * model.var_rnoise, kernel**2, **kwargs)
+                )
+                wht_sum += wht
+                library_model.shelve(model, i, modify=False)
+
+        data_sum[mask] = np.nan
+        error = np.sqrt(var_sum) / wht_sum
+        expected = data_sum / wht_sum / (error + (error == 1))
+        np.testing.assert_allclose(det_image, expected, rtol=1e-10, atol=1e-10)
+
+
+@pytest.mark.parametrize("fit_psf", (False, True))
+def test_multiband_catalog_parallel(mosaic_model, fit_psf, monkeypatch, function_jail):
+    """Creating the filter catalogs in worker processes gives the same catalog."""
+    monkeypatch.setattr(multiband_catalog, "cpu_count", lambda: 2)
+    filters = ("F184", "F158", "F129")
+
+    cats = {}
+    for maximum_cores in ("1", "2"):
+        models = []
+        for filter_name in filters:
+            model = mosaic_model.copy()
+            model.meta.instrument.optical_element = filter_name
+            models.append(model)
+        result = MultibandCatalogStep.call(
+            ModelLibrary(models),
+            bkg_boxsize=50,
+            snr_threshold=3,
+            npixels=10,
+            fit_psf=fit_psf,
+            deblend=True,
+            maximum_cores=maximum_cores,
+        )
+        cats[maximum_cores] = result.source_catalog
+
+    serial_cat, parallel_cat = cats["1"], cats["2"]
+    assert len(serial_cat) == 7
+    assert parallel_cat.colnames == serial_cat.colnames
+    assert any("psf" in colname for colname in serial_cat.colnames) == fit_psf
+    for colname in serial_cat.colnames:
+        np.testing.assert_array_equal(parallel_cat[colname], serial_cat[colname])
+    for filter_name, ee_fractions in serial_cat.meta["ee_fractions"].items():
+        np.testing.assert_array_equal(
+            parallel_cat.meta["ee_fractions"][filter_name], ee_fractions
+        )
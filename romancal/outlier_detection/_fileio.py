@@ -15,10 +15,19 @@ def save_median(median_data, median_wcs, make_output_path):
 
 
 def save_drizzled(drizzled_model, make_output_path):
-    input_path = drizzled_model.meta.get("filename", "none").replace("_outlier_", "_")
-    _save_intermediate_output(
+    save_drizzled_data(
         drizzled_model.data,
         drizzled_model.meta.wcs,
+        drizzled_model.meta.get("filename", "none"),
+        make_output_path,
+    )
+
+
+def save_drizzled_data(data, wcs, filename, make_output_path):
+    input_path = filename.replace("_outlier_", "_")
+    _save_intermediate_output(
+        data,
+        wcs,
         make_output_path(input_path, suffix="outlier_coadd"),
     )
 
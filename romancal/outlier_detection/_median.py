@@ -0,0 +1,147 @@
+"""Streaming approximate median of a sequence of images."""
+
+import warnings
+
+import numpy as np
+
+from romancal.lib.basic_utils import row_bands
+
+__all__ = ["StreamingMedianComputer"]
+
+
+class StreamingMedianComputer:
+    """
+    Per-pixel median of images that are added one at a time.
+
+    The median is estimated with the remedian of Rousseeuw & Bassett
+    (1990, JASA 85, 97).  Each pixel has a buffer of ``base`` values per
+    level.  Valid values are added to the first level and, whenever the
+    buffer of a level is full, its median is added to the next level and
+    the buffer is emptied.  The estimate is the weighted median of the values
+    left in the buffers, where each value of level ``l`` stands for
+    ``base**l`` input values.  Memory use grows only with the logarithm of
+    the number of images, and the median of pixels with at most ``base``
+    valid values is exact.  NaN values are ignored, as in `numpy.nanmedian`.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        The shape of each image.
+
+    dtype : str or `numpy.dtype`
+        The data type of the buffers and of the median.
+
+    base : int
+        The number of values in the buffer of each level.
+
+    rows_per_band : int or None
+        Update the buffers in bands of at most this many rows to bound the
+        size of the temporary arrays.
+    """
+
+    def __init__(self, shape, dtype="float32", base=11, rows_per_band=128):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.base = base
+        self.rows_per_band = rows_per_band
+        # buffers and per-pixel fill counts of each level, added as needed
+        self._buffers = []
+        self._counts = []
+
+    def _add_level(self):
+        self._buffers.append(np.full((self.base, *self.shape), np.nan, self.dtype))
+        self._counts.append(np.zeros(self.shape, dtype=np.min_scalar_type(self.base)))
+
+    def append(self, data, mask=None):
+        """
+        Add an image.
+
+        Parameters
+        ----------
+        data : `numpy.ndarray`
+            The image, with the shape given at initialization.  It is not
+            modified.
+
+        mask : `numpy.ndarray` or None
+            Boolean array that is True for pixels of ``data`` to ignore.
+        """
+        for band in row_bands(self.shape[0], self.rows_per_band):
+            values = data[band]
+            valid = ~np.isnan(values)
+            if mask is not None:
+                valid &= ~mask[band]
+
+            level = 0
+            while np.any(valid):
+                if level == len(self._buffers):
+                    self._add_level()
+                buffer = self._buffers[level][:, band]
+                count = self._counts[level][band]
+
+                if np.all(valid) and np.all(count == count.flat[0]):
+                    # every pixel goes to the same slot
+                    buffer[count.flat[0]] = values
+                    count += 1
+                else:
+                    buffer[(count[valid], *np.nonzero(valid))] = values[valid]
+                    count[valid] += 1
+
+                # move the median of each full buffer to the next level
+                valid = count == self.base
+                if np.all(valid):
+                    values = np.median(buffer, axis=0)
+                    buffer[:] = np.nan
+                    count[:] = 0
+                elif np.any(valid):
+                    values = np.full(valid.shape, np.nan, dtype=self.dtype)
+                    values[valid] = np.median(buffer[:, valid], axis=0)
+                    buffer[:, valid] = np.nan
+                    count[valid] = 0
+                level += 1
+
+    def evaluate(self):
+        """
+        Compute the median.
+
+        Returns
+        -------
+        median : `numpy.ndarray`
+            The estimated median of each pixel, NaN where no valid value
+            was added.
+        """
+        if not self._buffers:
+            return np.full(self.shape, np.nan, dtype=self.dtype)
+
+        median = np.empty(self.shape, dtype=self.dtype)
+        for band in row_bands(self.shape[0], self.rows_per_band):
+            median[band] = self._evaluate_band(band)
+        return median
+
+    def _evaluate_band(self, band):
+        values = np.concatenate([buffer[:, band] for buffer in self._buffers])
+        weights = np.concatenate(
+            [
+                np.where(np.isnan(buffer[:, band]), 0, self.base**level)
+                for level, buffer in enumerate(self._buffers)
+            ]
+        )
+
+        # Sort the values of each pixel (NaNs last) and find the value where
+        # the cumulative weight reaches half the total.  When it is reached
+        # exactly, average with the next value, as for the median of an even
+        # number of values.
+        order = np.argsort(values, axis=0)
+        values = np.take_along_axis(values, order, axis=0)
+        cumulative = np.cumsum(np.take_along_axis(weights, order, axis=0), axis=0)
+        half = cumulative[-1] / 2
+        index = np.argmax(cumulative >= half, axis=0)[np.newaxis]
+        lower = np.take_along_axis(values, index, axis=0)[0]
+        upper = np.take_along_axis(
+            values, np.minimum(index + 1, len(values) - 1), axis=0
+        )[0]
+        at_half = np.take_along_axis(cumulative, index, axis=0)[0] == half
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            median = np.where(at_half, (lower + upper) / 2, lower)
+        median[half == 0] = np.nan
+        return median
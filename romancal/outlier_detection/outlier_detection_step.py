@@ -44,6 +44,8 @@ class OutlierDetectionStep(RomanStep):
         resample_data = boolean(default=True) # Specifies whether or not to resample the input images when performing outlier detection
         resample_on_skycell = boolean(default=True) # if association contains skycell information use the skycell wcs for resampling
         good_bits = string(default="~DO_NOT_USE+NON_SCIENCE")  # DQ bit value to be considered 'good'
+        median_method = option('exact','streaming',default='exact') # 'streaming' estimates the median with memory that grows with the log of the number of groups
+        maximum_cores = string(default='1') # cores for resampling groups and flagging outliers in parallel. Can be an integer, 'half', 'quarter', or 'all'
         in_memory = boolean(default=True) # Specifies whether or not to keep all intermediate products and datamodels in memory, ignored if run as part of a pipeline
         pixmap_stepsize = float(default=10)  # step size for computation of the pixel map
         pixmap_order = integer(1, 3, default=3)  # interpolating spline order (1 or 3) used when pixmap_stepsize > 1
@@ -120,5 +122,7 @@ class OutlierDetectionStep(RomanStep):
             self.make_output_path,
             pixmap_stepsize=self.pixmap_stepsize,
             pixmap_order=int(self.pixmap_order),
+            median_method=self.median_method,
+            maximum_cores=self.maximum_cores,
         )
         return library
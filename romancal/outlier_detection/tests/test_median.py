@@ -0,0 +1,76 @@
+"""Tests of the streaming median computer."""
+
+import numpy as np
+import pytest
+
+from romancal.outlier_detection._median import StreamingMedianComputer
+
+SHAPE = (30, 20)
+
+
+@pytest.mark.parametrize("nimages", [1, 2, 6, 11])
+def test_exact_for_few_images(nimages):
+    """With at most ``base`` values per pixel the median is exact."""
+    rng = np.random.default_rng(nimages)
+    stack = rng.normal(0, 1, (nimages, *SHAPE)).astype(np.float32)
+    stack[rng.random(stack.shape) < 0.1] = np.nan
+    stack[:, 0, 0] = np.nan
+
+    computer = StreamingMedianComputer(SHAPE, rows_per_band=7)
+    for image in stack:
+        computer.append(image)
+
+    with pytest.warns(RuntimeWarning, match="All-NaN slice"):
+        expected = np.nanmedian(stack, axis=0)
+    median = computer.evaluate()
+    assert median.dtype == stack.dtype
+    np.testing.assert_array_equal(median, expected)
+    assert np.isnan(median[0, 0])
+
+
+def test_remedian():
+    """With ``base**2`` values the result is the median of the medians of
+    each run of ``base`` values."""
+    base = 5
+    rng = np.random.default_rng(42)
+    stack = rng.normal(0, 1, (base**2, *SHAPE)).astype(np.float32)
+
+    computer = StreamingMedianComputer(SHAPE, base=base)
+    for image in stack:
+        computer.append(image)
+
+    expected = np.median(np.median(stack.reshape(base, base, *SHAPE), axis=1), axis=0)
+    np.testing.assert_array_equal(computer.evaluate(), expected)
+
+
+def test_mask():
+    """Masked pixels are ignored and the data are not modified."""
+    rng = np.random.default_rng(1)
+    stack = rng.normal(0, 1, (3, *SHAPE)).astype(np.float32)
+    masks = rng.random(stack.shape) < 0.3
+    original = stack.copy()
+
+    computer = StreamingMedianComputer(SHAPE)
+    for image, mask in zip(stack, masks, strict=True):
+        computer.append(image, mask)
+
+    with pytest.warns(RuntimeWarning, match="All-NaN slice"):
+        expected = np.nanmedian(np.where(masks, np.nan, stack), axis=0)
+    np.testing.assert_array_equal(computer.evaluate(), expected)
+    np.testing.assert_array_equal(stack, original)
+
+
+def test_robust_to_outliers():
+    """Outliers do not leak into the estimate of a deep stack."""
+    rng = np.random.default_rng(3)
+    stack = rng.normal(0, 1, (60, *SHAPE)).astype(np.float32)
+    hits = rng.random(stack.shape) < 0.02
+    stack[hits] += rng.uniform(10, 1000, np.count_nonzero(hits))
+
+    computer = StreamingMedianComputer(SHAPE)
+    for image in stack:
+        computer.append(image)
+
+    difference = computer.evaluate() - np.median(stack, axis=0)
+    assert np.max(np.abs(difference)) < 2
+    assert abs(np.mean(difference)) < 0.1
@@ -1,8 +1,11 @@
 import numpy as np
 import pytest
+from roman_datamodels.dqflags import pixel
 
 from romancal.datamodels import ModelLibrary
-from romancal.outlier_detection import OutlierDetectionStep
+from romancal.outlier_detection import OutlierDetectionStep, utils
+from romancal.outlier_detection.utils import _median_with_resampling
+from romancal.resample.resample import ResampleData
 
 
 def test_outlier_skips_step_on_invalid_number_of_elements_in_input(base_image):
@@ -113,7 +116,10 @@ def test_outlier_do_detection_write_files_to_custom_location(tmp_path, base_imag
 @pytest.mark.parametrize("pixmap_order", [1, 3])
 @pytest.mark.parametrize("pixmap_stepsize", [1, 10])
 @pytest.mark.parametrize("on_disk", (True, False))
-def test_find_outliers(tmp_path, base_image, on_disk, pixmap_order, pixmap_stepsize):
+@pytest.mark.parametrize("median_method", ["exact", "streaming"])
+def test_find_outliers(
+    tmp_path, base_image, on_disk, pixmap_order, pixmap_stepsize, median_method
+):
     """
     Test that OutlierDetection can find outliers.
     """
@@ -169,6 +175,7 @@ def test_find_outliers(tmp_path, base_image, on_disk, pixmap_order, pixmap_steps
     outlier_step.in_memory = not on_disk
     outlier_step.pixmap_order = pixmap_order
     outlier_step.pixmap_stepsize = pixmap_stepsize
+    outlier_step.median_method = median_method
 
     result = outlier_step.run(input_models)
 
@@ -270,3 +277,74 @@ def test_outlier_detection_always_returns_modelcontainer_with_updated_datamodels
         for i, model in enumerate(res):
             assert model.meta.cal_step.outlier_detection == "COMPLETE"
             res.shelve(model, i, modify=False)
+
+
+def test_median_parallel_resampling(tmp_path, base_image):
+    """Resampling the groups in worker processes gives the same median."""
+    rng = np.random.default_rng(12)
+    imgs = []
+    for i in range(3):
+        img = base_image()
+        img.data[:] = rng.normal(1, 0.1, img.data.shape)
+        img.data[rng.integers(0, 100, 5), rng.integers(0, 100, 5)] = 100
+        img.err[:] = 0.1
+        img.meta.filename = f"img{i}_suffix.asdf"
+        img.meta.observation.observation_id = str(i)
+        img.meta.background.level = 0
+        imgs.append(img)
+
+    medians = []
+    for n_workers in (1, 2):
+        library = ModelLibrary([img.copy() for img in imgs])
+        resamp = ResampleData(
+            library,
+            None,
+            1.0,
+            "square",
+            "NaN",
+            "ivm",
+            "~DO_NOT_USE+NON_SCIENCE",
+            False,
+            False,
+            False,
+            False,
+            False,
+            True,
+        )
+        median, _ = _median_with_resampling(
+            library, resamp, 0.7, False, None, n_workers=n_workers
+        )
+        medians.append(median)
+
+    assert np.any(np.isfinite(medians[0]))
+    np.testing.assert_array_equal(medians[1], medians[0])
+
+
+def test_flag_parallel(base_image, monkeypatch):
+    """Flagging the outliers in worker processes flags the same pixels."""
+    monkeypatch.setattr(utils, "cpu_count", lambda: 2)
+    rng = np.random.default_rng(13)
+    imgs = []
+    for i in range(3):
+        img = base_image()
+        img.data[:] = rng.normal(1, 0.1, img.data.shape)
+        img.data[rng.integers(0, 100, 5), rng.integers(0, 100, 5)] = 100
+        img.err[:] = 0.1
+        img.meta.filename = f"img{i}_suffix.asdf"
+        img.meta.observation.observation_id = str(i)
+        img.meta.background.level = 0
+        imgs.append(img)
+
+    dqs = {}
+    for maximum_cores in ("1", "2"):
+        library = ModelLibrary([img.copy() for img in imgs])
+        result = OutlierDetectionStep.call(library, maximum_cores=maximum_cores)
+        with result:
+            dqs[maximum_cores] = []
+            for index, model in enumerate(result):
+                dqs[maximum_cores].append(model.dq.copy())
+                result.shelve(model, index, modify=False)
+
+    assert np.count_nonzero(dqs["1"][0] & pixel.OUTLIER) >= 5
+    for serial_dq, parallel_dq in zip(dqs["1"], dqs["2"], strict=True):
+        np.testing.assert_array_equal(parallel_dq, serial_dq)
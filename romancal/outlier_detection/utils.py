@@ -1,21 +1,31 @@
+import contextlib
 import copy
 import logging
+import multiprocessing
+import os
+import tempfile
 from functools import partial
+from multiprocessing import cpu_count, shared_memory
 
 import numpy as np
+import roman_datamodels as rdm
+from drizzle.resample import blot_image
 from roman_datamodels.dqflags import pixel
+from stcal.multiprocessing import compute_num_cores
 from stcal.outlier_detection.median import MedianComputer
 from stcal.outlier_detection.utils import (
     compute_weight_threshold,
     flag_crs,
     flag_resampled_crs,
-    gwcs_blot,
 )
 from stcal.resample.utils import build_driz_weight
 
+from romancal.datamodels import ModelLibrary
+from romancal.resample.pixmap_cache import PIXMAP_CACHE
 from romancal.resample.resample import ResampleData
 
 from . import _fileio
+from ._median import StreamingMedianComputer
 
 __all__ = ["detect_outliers"]
 
@@ -31,6 +41,9 @@ def _median_with_resampling(
     save_intermediate_results,
     make_output_path,
     buffer_size=None,
+    median_method="exact",
+    n_workers=1,
+    paths=None,
 ):
     """
     Compute median of resampled data from models in a library.
@@ -57,29 +70,67 @@ def _median_with_resampling(
         This parameter has no effect if the input library has its on_disk attribute
         set to False. If None or 0 the buffer size will be set to the size of one
         resampled image.
+
+    median_method : {"exact", "streaming"}
+        If "streaming", estimate the median with a
+        `~romancal.outlier_detection._median.StreamingMedianComputer` instead
+        of storing every resampled group.
+
+    n_workers : int
+        If larger than 1, resample up to this many groups at a time in a
+        pool of worker processes.  The groups are still added to the median
+        in order, so the median does not depend on the number of workers.
+
+    paths : list of str or None
+        Files holding the models, as written by `_save_models`, for the
+        worker processes.  If None and ``n_workers`` is larger than 1, the
+        models are written to a temporary directory.
     """
     in_memory = not input_models._on_disk
     indices_by_group = list(input_models.group_indices.values())
     nresultants = len(indices_by_group)
     median_wcs = resamp.output_wcs
+    computer = None
 
-    with input_models:
-        for i, indices in enumerate(indices_by_group):
-            drizzled_model = resamp.resample_group(indices)
+    def add_group(i, data, weight, filename):
+        nonlocal computer
+        if save_intermediate_results:
+            # write the drizzled model to file
+            _fileio.save_drizzled_data(data, median_wcs, filename, make_output_path)
 
-            if save_intermediate_results:
-                # write the drizzled model to file
-                _fileio.save_drizzled(drizzled_model, make_output_path)
-
-            if i == 0:
-                input_shape = (nresultants, *drizzled_model.data.shape)
-                dtype = drizzled_model.data.dtype
-                computer = MedianComputer(input_shape, in_memory, buffer_size, dtype)
+        if computer is None:
+            computer = _median_computer(
+                median_method, nresultants, data, in_memory, buffer_size
+            )
 
-            weight_threshold = compute_weight_threshold(drizzled_model.weight, maskpt)
-            drizzled_model.data[drizzled_model.weight < weight_threshold] = np.nan
-            computer.append(drizzled_model.data, i)
-            del drizzled_model
+        weight_threshold = compute_weight_threshold(weight, maskpt)
+        data[weight < weight_threshold] = np.nan
+        if median_method == "streaming":
+            computer.append(data)
+        else:
+            computer.append(data, i)
+
+    # there is no use for more workers than groups
+    n_workers = min(n_workers, nresultants)
+    if n_workers > 1:
+        with contextlib.ExitStack() as stack:
+            if paths is None:
+                tmpdir = stack.enter_context(tempfile.TemporaryDirectory())
+                paths = _save_models(input_models, tmpdir)
+            _resample_groups_parallel(
+                paths, resamp, indices_by_group, n_workers, add_group
+            )
+    else:
+        with input_models:
+            for i, indices in enumerate(indices_by_group):
+                drizzled_model = resamp.resample_group(indices)
+                add_group(
+                    i,
+                    drizzled_model.data,
+                    drizzled_model.weight,
+                    drizzled_model.meta.get("filename", "none"),
+                )
+                del drizzled_model
 
     # Perform median combination on set of drizzled mosaics
     median_data = computer.evaluate()
@@ -95,6 +146,135 @@ def _median_with_resampling(
     return median_data, median_wcs
 
 
+def _save_models(input_models, directory):
+    """
+    Write the models of a library to files for worker processes.
+
+    Parameters
+    ----------
+    input_models : ModelLibrary
+        The input datamodels.
+
+    directory : str
+        The directory for the files.
+
+    Returns
+    -------
+    list of str
+        The path of each model, in library order.
+    """
+    paths = []
+    with input_models:
+        for index, model in enumerate(input_models):
+            path = os.path.join(directory, f"input_{index}.asdf")
+            model.save(path)
+            paths.append(path)
+            input_models.shelve(model, index, modify=False)
+    return paths
+
+
+def _resample_groups_parallel(paths, resamp, indices_by_group, n_workers, add_group):
+    """
+    Resample groups of models in a pool of worker processes.
+
+    Up to ``n_workers`` groups at a time are resampled by workers, each
+    into its own pair of shared memory arrays (data and weight).
+    ``add_group`` is then called for each of these groups in order.
+
+    Parameters
+    ----------
+    paths : list of str
+        The files holding the input models, see `_save_models`.
+
+    resamp : resample.resample.ResampleData object
+        The controlling object for the resampling process.  The workers
+        use the same parameters and output WCS.
+
+    indices_by_group : list of list of int
+        The indices of the models in each group.
+
+    n_workers : int
+        Number of worker processes.
+
+    add_group : callable
+        Called as ``add_group(i, data, weight, filename)`` for each group.
+        ``data`` and ``weight`` are only valid during the call.
+    """
+    log.info(
+        "Resampling %s groups using %s processes", len(indices_by_group), n_workers
+    )
+    params = {
+        "output_wcs": {
+            "wcs": resamp.output_wcs,
+            "pixel_scale": resamp.output_pixel_scale,
+        },
+        "pixfrac": resamp.pixfrac,
+        "kernel": resamp.kernel,
+        "fillval": str(resamp.fillval),
+        "weight_type": resamp.weight_type,
+        "good_bits": resamp.good_bits,
+        "enable_ctx": False,
+        "enable_var": False,
+        "compute_err": None,
+        "compute_exptime": False,
+        "blend_meta": False,
+        "resample_on_skycell": False,
+        "pixmap_stepsize": resamp.pixmap_stepsize,
+        "pixmap_order": resamp.pixmap_order,
+    }
+    shape = tuple(resamp.output_array_shape)
+    nbytes = int(np.prod(shape)) * np.dtype(np.float32).itemsize
+
+    blocks = []
+    try:
+        for _ in range(2 * n_workers):
+            blocks.append(shared_memory.SharedMemory(create=True, size=nbytes))
+        slots = [
+            (blocks[2 * slot].name, blocks[2 * slot + 1].name)
+            for slot in range(n_workers)
+        ]
+
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(processes=n_workers) as pool:
+            for start in range(0, len(indices_by_group), n_workers):
+                batch = indices_by_group[start : start + n_workers]
+                tasks = [
+                    (params, [paths[index] for index in indices], slot, shape)
+                    for indices, slot in zip(batch, slots, strict=False)
+                ]
+                filenames = pool.starmap(_resample_group_worker, tasks)
+
+                for slot, filename in enumerate(filenames):
+                    data = np.ndarray(shape, np.float32, blocks[2 * slot].buf)
+                    weight = np.ndarray(shape, np.float32, blocks[2 * slot + 1].buf)
+                    add_group(start + slot, data, weight, filename)
+                    del data, weight
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _resample_group_worker(params, paths, slot, shape):
+    """Resample the models in ``paths`` into the shared memory ``slot``"""
+    with contextlib.ExitStack() as stack:
+        models = [stack.enter_context(rdm.open(path)) for path in paths]
+        resamp = ResampleData(ModelLibrary(models), **params)
+        drizzled_model = resamp.resample_group(range(len(paths)))
+
+    blocks = [shared_memory.SharedMemory(name=name) for name in slot]
+    try:
+        data = np.ndarray(shape, np.float32, blocks[0].buf)
+        weight = np.ndarray(shape, np.float32, blocks[1].buf)
+        data[...] = drizzled_model.data
+        weight[...] = drizzled_model.weight
+        del data, weight
+    finally:
+        for block in blocks:
+            block.close()
+    return drizzled_model.meta.get("filename", "none")
+
+
 def _median_without_resampling(
     input_models,
     maskpt,
@@ -103,6 +283,7 @@ def _median_without_resampling(
     save_intermediate_results,
     make_output_path,
     buffer_size=None,
+    median_method="exact",
 ):
     """
     Compute median of data from models in a library.
@@ -135,6 +316,10 @@ def _median_without_resampling(
         set to False. If None or 0 the buffer size will be set to the size of one
         input image.
 
+    median_method : {"exact", "streaming"}
+        If "streaming", estimate the median with a
+        `~romancal.outlier_detection._median.StreamingMedianComputer` instead
+        of storing a copy of every image.
     """
     in_memory = not input_models._on_disk
     nresultants = len(input_models)
@@ -155,19 +340,25 @@ def _median_without_resampling(
                 _fileio.save_drizzled(model, make_output_path)
 
             if i == 0:
-                input_shape = (nresultants, *model.data.shape)
-                dtype = model.data.dtype
-                computer = MedianComputer(input_shape, in_memory, buffer_size, dtype)
+                computer = _median_computer(
+                    median_method, nresultants, model.data, in_memory, buffer_size
+                )
                 median_wcs = copy.deepcopy(model.meta.wcs)
 
             weight_threshold = compute_weight_threshold(wht, maskpt)
 
-            data_copy = model.data.copy()
-            data_copy[wht < weight_threshold] = np.nan
-            computer.append(data_copy, i)
+            if median_method == "streaming":
+                # the streaming computer does not keep the data, so mask it
+                # without a copy
+                computer.append(model.data, wht < weight_threshold)
+            else:
+                data_copy = model.data.copy()
+                data_copy[wht < weight_threshold] = np.nan
+                computer.append(data_copy, i)
+                del data_copy
 
             input_models.shelve(model, i, modify=True)
-            del data_copy, model
+            del model
 
     # Perform median combination on set of drizzled mosaics
     median_data = computer.evaluate()
@@ -178,7 +369,36 @@ def _median_without_resampling(
     return median_data, median_wcs
 
 
-def _flag_resampled_model_crs(
+def _median_computer(median_method, nimages, data, in_memory, buffer_size):
+    """Make the computer for the median of ``nimages`` images like ``data``."""
+    if median_method == "streaming":
+        return StreamingMedianComputer(data.shape, data.dtype)
+    input_shape = (nimages, *data.shape)
+    return MedianComputer(input_shape, in_memory, buffer_size, data.dtype)
+
+
+def _blot_median(median_data, pixmap, fillval):
+    """
+    Blot the median with a pixel map, as `stcal.outlier_detection.utils.gwcs_blot`.
+
+    The pixel map is modified.
+    """
+    blot = np.full(pixmap.shape[:2], fillval, dtype=np.float32)
+    # drizzle cannot blot with NaNs in the pixel map
+    pixmap[np.isnan(pixmap)] = -1
+    blot_image(
+        data=median_data,
+        pixmap=pixmap,
+        out_img=blot,
+        fillval=fillval,
+        iscale=1.0,
+        interp="linear",
+        sinscl=1.0,
+    )
+    return blot
+
+
+def _resampled_crs_mask(
     image,
     median_data,
     median_wcs,
@@ -188,25 +408,24 @@ def _flag_resampled_model_crs(
     scale2,
     backg,
     fillval,
-    save_intermediate_results,
-    make_output_path,
     pixmap_stepsize=1,
     pixmap_order=1,
 ):
+    """Blot the median to the frame of ``image`` and find its outliers."""
     if fillval is None or fillval.strip().upper() == "INDEF":
         fillval = 0
     else:
         fillval = float(fillval)
 
-    blot = gwcs_blot(
-        median_data=median_data,
-        median_wcs=median_wcs,
-        blot_shape=image.data.shape,
-        blot_wcs=image.meta.wcs,
-        fillval=fillval,
-        pixmap_stepsize=pixmap_stepsize,
-        pixmap_order=pixmap_order,
+    # take the pixel map stored when the image was resampled to the median
+    pixmap = PIXMAP_CACHE.pop(
+        image.meta.wcs,
+        median_wcs,
+        image.data.shape,
+        stepsize=pixmap_stepsize,
+        order=pixmap_order,
     )
+    blot = _blot_median(median_data, pixmap, fillval)
 
     # Get background level of science data if it has not been subtracted, so it
     # can be added into the level of the blotted data, which has been
@@ -221,15 +440,111 @@ def _flag_resampled_model_crs(
             f"Adding background level {image.meta.background.level} to blotted image"
         )
 
-    cr_mask = flag_resampled_crs(
+    return flag_resampled_crs(
         image.data, image.err, blot, snr1, snr2, scale1, scale2, backg
     )
 
+
+def _flag_resampled_model_crs(
+    image,
+    median_data,
+    median_wcs,
+    snr1,
+    snr2,
+    scale1,
+    scale2,
+    backg,
+    fillval,
+    save_intermediate_results,
+    make_output_path,
+    pixmap_stepsize=1,
+    pixmap_order=1,
+):
+    cr_mask = _resampled_crs_mask(
+        image,
+        median_data,
+        median_wcs,
+        snr1,
+        snr2,
+        scale1,
+        scale2,
+        backg,
+        fillval,
+        pixmap_stepsize=pixmap_stepsize,
+        pixmap_order=pixmap_order,
+    )
+
     # update the dq flags in-place
     image.dq |= cr_mask * np.uint32(pixel.DO_NOT_USE | pixel.OUTLIER)
     log.info(f"{np.count_nonzero(cr_mask)} pixels marked as outliers")
 
 
+def _flag_resampled_crs_parallel(paths, median_data, median_wcs, n_workers, **kwargs):
+    """
+    Find the outliers of each model in a pool of worker processes.
+
+    The median is copied once to shared memory.  Each worker reads a model
+    from its file, blots the median to it and returns only the indices of
+    its outliers, so no image arrays are sent between processes.
+
+    Parameters
+    ----------
+    paths : list of str
+        The files holding the input models, see `_save_models`.
+
+    median_data : numpy.ndarray
+        The median image.
+
+    median_wcs : gwcs.wcs.WCS
+        The WCS of the median image.
+
+    n_workers : int
+        Number of worker processes.
+
+    **kwargs
+        Passed to `_resampled_crs_mask`.
+
+    Yields
+    ------
+    numpy.ndarray
+        The flat indices of the outliers of each model, in order.
+    """
+    log.info("Flagging outliers in %s models using %s processes", len(paths), n_workers)
+    block = shared_memory.SharedMemory(create=True, size=median_data.nbytes)
+    try:
+        shared = np.ndarray(median_data.shape, median_data.dtype, block.buf)
+        shared[...] = median_data
+        del shared
+        median = (block.name, median_data.shape, median_data.dtype)
+
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(processes=n_workers) as pool:
+            worker = partial(
+                _flag_resampled_crs_worker,
+                median=median,
+                median_wcs=median_wcs,
+                kwargs=kwargs,
+            )
+            yield from pool.imap(worker, paths)
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _flag_resampled_crs_worker(path, median, median_wcs, kwargs):
+    """Return the flat indices of the outliers of the model in ``path``"""
+    name, shape, dtype = median
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        median_data = np.ndarray(shape, dtype, block.buf)
+        with rdm.open(path) as image:
+            cr_mask = _resampled_crs_mask(image, median_data, median_wcs, **kwargs)
+        del median_data
+    finally:
+        block.close()
+    return np.flatnonzero(cr_mask)
+
+
 def _flag_model_crs(image, median_data, snr):
     cr_mask = flag_crs(image.data, image.err, median_data, snr)
 
@@ -258,6 +573,8 @@ def detect_outliers(
     make_output_path,
     pixmap_stepsize,
     pixmap_order,
+    median_method="exact",
+    maximum_cores="1",
 ):
     # setup ResampleData
     # call
@@ -283,49 +600,93 @@ def detect_outliers(
             pixmap_stepsize=pixmap_stepsize,
             pixmap_order=pixmap_order,
         )
-        median_data, median_wcs = _median_with_resampling(
-            library,
-            resamp,
-            maskpt,
-            save_intermediate_results=save_intermediate_results,
-            make_output_path=make_output_path,
-        )
+        n_workers = compute_num_cores(maximum_cores, len(library), cpu_count())
     else:
-        median_data, median_wcs = _median_without_resampling(
-            library,
-            maskpt,
-            weight_type,
-            good_bits,
-            save_intermediate_results=save_intermediate_results,
-            make_output_path=make_output_path,
-        )
+        n_workers = 1
+
+    with contextlib.ExitStack() as stack:
+        # the worker processes read the models from files
+        paths = None
+        if n_workers > 1:
+            tmpdir = stack.enter_context(tempfile.TemporaryDirectory())
+            paths = _save_models(library, tmpdir)
+
+        if resample_data:
+            median_data, median_wcs = _median_with_resampling(
+                library,
+                resamp,
+                maskpt,
+                save_intermediate_results=save_intermediate_results,
+                make_output_path=make_output_path,
+                median_method=median_method,
+                n_workers=n_workers,
+                paths=paths,
+            )
+        else:
+            median_data, median_wcs = _median_without_resampling(
+                library,
+                maskpt,
+                weight_type,
+                good_bits,
+                save_intermediate_results=save_intermediate_results,
+                make_output_path=make_output_path,
+                median_method=median_method,
+            )
 
-    # Perform outlier detection using statistical comparisons between
-    # each original input image and its blotted version of the median image
-    with library:
-        for image in library:
-            if resample_data:
-                _flag_resampled_model_crs(
-                    image,
-                    median_data,
-                    median_wcs,
-                    snr1,
-                    snr2,
-                    scale1,
-                    scale2,
-                    backg,
-                    fillval,
-                    save_intermediate_results,
-                    make_output_path,
-                    pixmap_stepsize=pixmap_stepsize,
-                    pixmap_order=pixmap_order,
+        outliers = None
+        if n_workers > 1:
+            outliers = stack.enter_context(
+                contextlib.closing(
+                    _flag_resampled_crs_parallel(
+                        paths,
+                        median_data,
+                        median_wcs,
+                        n_workers,
+                        snr1=snr1,
+                        snr2=snr2,
+                        scale1=scale1,
+                        scale2=scale2,
+                        backg=backg,
+                        fillval=fillval,
+                        pixmap_stepsize=pixmap_stepsize,
+                        pixmap_order=pixmap_order,
+                    )
                 )
-            else:
-                _flag_model_crs(image, median_data, snr1)
-
-            # mark step as complete
-            image.meta.cal_step["outlier_detection"] = "COMPLETE"
+            )
 
-            library.shelve(image, modify=True)
+        # Perform outlier detection using statistical comparisons between
+        # each original input image and its blotted version of the median image
+        with library:
+            for image in library:
+                if outliers is not None:
+                    # found by a worker process
+                    indices = next(outliers)
+                    image.dq.flat[indices] |= np.uint32(
+                        pixel.DO_NOT_USE | pixel.OUTLIER
+                    )
+                    log.info(f"{len(indices)} pixels marked as outliers")
+                elif resample_data:
+                    _flag_resampled_model_crs(
+                        image,
+                        median_data,
+                        median_wcs,
+                        snr1,
+                        snr2,
+                        scale1,
+                        scale2,
+                        backg,
+                        fillval,
+                        save_intermediate_results,
+                        make_output_path,
+                        pixmap_stepsize=pixmap_stepsize,
+                        pixmap_order=pixmap_order,
+                    )
+                else:
+                    _flag_model_crs(image, median_data, snr1)
+
+                # mark step as complete
+                image.meta.cal_step["outlier_detection"] = "COMPLETE"
+
+                library.shelve(image, modify=True)
 
     return library
@@ -1,12 +1,18 @@
 #!/usr/bin/env python
 from __future__ import annotations
 
+import contextlib
 import logging
+import multiprocessing
+import tempfile
+from multiprocessing import cpu_count
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 import numpy as np
 import roman_datamodels.datamodels as rdm
 from roman_datamodels.dqflags import group
+from stcal.multiprocessing import compute_num_cores
 
 # step imports
 from romancal.assign_wcs import AssignWcsStep
@@ -23,10 +29,12 @@ from romancal.ramp_fitting import ramp_fit_step
 from romancal.refpix import RefPixStep
 from romancal.saturation import SaturationStep
 from romancal.source_catalog import SourceCatalogStep
+from romancal.source_catalog.psf_cache import PSF_MODEL_CACHE
 from romancal.tweakreg import TweakRegStep
 from romancal.wfi18_transient import WFI18TransientStep
 
 from ..stpipe import RomanPipeline
+from .front_end import dq_init_and_saturation
 
 if TYPE_CHECKING:
     from typing import ClassVar
@@ -50,6 +58,9 @@ class ExposurePipeline(RomanPipeline):
     spec = """
         save_results = boolean(default=False)
         suffix = string(default="cal")
+        maximum_cores = string(default='1') # cores for processing exposures in parallel. Can be an integer, 'half', 'quarter', or 'all'
+        cache_psf_models = boolean(default=True) # prepare the PSF model of each detector once for source_catalog
+        psf_cache_dir = string(default=None) # keep the prepared PSF models in this directory for later runs
     """
 
     # Define aliases to steps
@@ -91,55 +102,23 @@ class ExposurePipeline(RomanPipeline):
         )
         return_lib = input_type in ("ModelLibrary", "asn")
 
-        # Flag to track if any of the input models are fully saturated
-        any_saturated = False
-
-        with lib:
-            for model_index, model in enumerate(lib):
-                self.dq_init.suffix = "dq_init"
-                result = self.dq_init.run(model)
-
-                del model
-
-                result = self.saturation.run(result)
-
-                if is_fully_saturated(result):
-                    log.info("All pixels are saturated. Returning a zeroed-out image.")
-                    result = self.create_fully_saturated_zeroed_image(result)
-
-                    # Track that we've seen a fully saturated input
-                    any_saturated = True
-                    log.warning(
-                        "tweakreg will not be run due to a fully saturated input"
-                    )
-                else:
-                    result = self.refpix.run(result)
-                    result = self.dark_decay.run(result)
-                    result = self.wfi18_transient.run(result)
-                    result = self.linearity.run(result)
-                    result = self.rampfit.run(result)
-                    result = self.dark_current.run(result)
-                    result = self.assign_wcs.run(result)
-
-                    if result.meta.exposure.type == "WFI_IMAGE":
-                        result = self.flatfield.run(result)
-                        result = self.photom.run(result)
-                        result = self.source_catalog.run(result)
-                    else:
-                        log.info("Flat Field step is being SKIPPED")
-                        log.info("Photom step is being SKIPPED")
-                        log.info("Source Detection step is being SKIPPED")
-                        log.info("Tweakreg step is being SKIPPED")
-                        result.meta.cal_step.flat_field = "SKIPPED"
-                        result.meta.cal_step.photom = "SKIPPED"
-                        result.meta.cal_step.source_catalog = "SKIPPED"
-
-                if any_saturated:
-                    # the input association contains a fully saturated model
-                    # where source_catalog can't be run which means we
-                    # also can't run tweakreg.
-                    result.meta.cal_step.tweakreg = "SKIPPED"
-                lib.shelve(result, model_index)
+        n_workers = compute_num_cores(self.maximum_cores, len(lib), cpu_count())
+        with contextlib.ExitStack() as stack:
+            # exposures of the same detector share the jitter-convolved
+            # PSF model; worker processes share it through files
+            psf_cache_dir = None
+            if self.cache_psf_models:
+                psf_cache_dir = self.psf_cache_dir
+                if psf_cache_dir is None and n_workers > 1:
+                    psf_cache_dir = stack.enter_context(tempfile.TemporaryDirectory())
+                stack.enter_context(PSF_MODEL_CACHE.enable(directory=psf_cache_dir))
+
+            if n_workers > 1:
+                any_saturated = self._process_library_parallel(
+                    lib, n_workers, psf_cache_dir
+                )
+            else:
+                any_saturated = self._process_library_serial(lib)
 
         # Now that all the exposures are collated, run tweakreg
         # Note: this does not cover the case where the asn mixes imaging and spectral
@@ -159,6 +138,173 @@ class ExposurePipeline(RomanPipeline):
             lib.shelve(model, modify=False)
         return model
 
+    def _process_library_serial(self, lib):
+        """Calibrate each exposure in the library one at a time.
+
+        Returns
+        -------
+        any_saturated : bool
+            True if any of the input models was fully saturated.
+        """
+        # Flag to track if any of the input models are fully saturated
+        any_saturated = False
+
+        with lib:
+            # the exposures go through dq_init and saturation one at a time
+            for model_index, result in enumerate(self.front_end(lib)):
+                result, saturated = self.process_ramp(result)
+
+                any_saturated |= saturated
+                if any_saturated:
+                    # the input association contains a fully saturated model
+                    # where source_catalog can't be run which means we
+                    # also can't run tweakreg.
+                    result.meta.cal_step.tweakreg = "SKIPPED"
+                lib.shelve(result, model_index)
+
+        return any_saturated
+
+    def _process_library_parallel(self, lib, n_workers, psf_cache_dir=None):
+        """Calibrate the exposures in the library using a pool of processes.
+
+        Each library member is written to a temporary file, calibrated
+        (up to, but not including, tweakreg) by a worker process running
+        a pipeline configured identically to this one and the result
+        is shelved back into the library in the original order.
+
+        If ``psf_cache_dir`` is given, the workers share the prepared PSF
+        models through the files in this directory.
+
+        Returns
+        -------
+        any_saturated : bool
+            True if any of the input models was fully saturated.
+        """
+        log.info("Processing %s exposures using %s processes", len(lib), n_workers)
+        pars = self.get_pars()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            tasks = []
+            with lib:
+                for model_index, model in enumerate(lib):
+                    input_path = tmpdir / f"input_{model_index}.asdf"
+                    output_path = tmpdir / f"output_{model_index}.asdf"
+                    model.save(input_path)
+                    tasks.append(
+                        (
+                            pars,
+                            str(input_path),
+                            str(output_path),
+                            model.meta.filename,
+                            psf_cache_dir,
+                        )
+                    )
+                    lib.shelve(model, model_index, modify=False)
+
+            ctx = multiprocessing.get_context("spawn")
+            with ctx.Pool(processes=n_workers) as pool:
+                results = pool.starmap(_process_exposure_file, tasks)
+
+            any_saturated = False
+            with lib:
+                for model_index, model in enumerate(lib):
+                    del model
+                    saturated, filename = results[model_index]
+                    output_path = tmpdir / f"output_{model_index}.asdf"
+                    result = rdm.open(output_path, lazy_load=False)
+                    result.meta.filename = filename
+
+                    any_saturated |= saturated
+                    if any_saturated:
+                        # match the serial behavior, see _process_library_serial
+                        result.meta.cal_step.tweakreg = "SKIPPED"
+                    lib.shelve(result, model_index)
+
+        return any_saturated
+
+    def process_exposure(self, model):
+        """Calibrate a single exposure from dq_init through source_catalog.
+
+        Parameters
+        ----------
+        model : `~roman_datamodels.datamodels.DataModel`
+            The uncalibrated exposure.
+
+        Returns
+        -------
+        result : `~roman_datamodels.datamodels.DataModel`
+            The calibrated exposure.
+        saturated : bool
+            True if the exposure was fully saturated.
+        """
+        (result,) = self.front_end([model])
+        return self.process_ramp(result)
+
+    def front_end(self, models):
+        """Run dq_init and saturation on each exposure.
+
+        The exposures share the opened mask and saturation reference files,
+        see `~romancal.pipeline.front_end.dq_init_and_saturation`.
+
+        Parameters
+        ----------
+        models : iterable
+            The uncalibrated exposures.
+
+        Returns
+        -------
+        iterator of `~roman_datamodels.datamodels.RampModel`
+            The flagged ramp of each exposure, in input order.
+        """
+        self.dq_init.suffix = "dq_init"
+        return dq_init_and_saturation(models, self.dq_init, self.saturation)
+
+    def process_ramp(self, result):
+        """Calibrate a flagged ramp from refpix through source_catalog.
+
+        Parameters
+        ----------
+        result : `~roman_datamodels.datamodels.RampModel`
+            The ramp returned by `front_end`.
+
+        Returns
+        -------
+        result : `~roman_datamodels.datamodels.DataModel`
+            The calibrated exposure.
+        saturated : bool
+            True if the exposure was fully saturated.
+        """
+        if is_fully_saturated(result):
+            log.info("All pixels are saturated. Returning a zeroed-out image.")
+            result = self.create_fully_saturated_zeroed_image(result)
+
+            log.warning("tweakreg will not be run due to a fully saturated input")
+            return result, True
+
+        result = self.refpix.run(result)
+        result = self.dark_decay.run(result)
+        result = self.wfi18_transient.run(result)
+        result = self.linearity.run(result)
+        result = self.rampfit.run(result)
+        result = self.dark_current.run(result)
+        result = self.assign_wcs.run(result)
+
+        if result.meta.exposure.type == "WFI_IMAGE":
+            result = self.flatfield.run(result)
+            result = self.photom.run(result)
+            result = self.source_catalog.run(result)
+        else:
+            log.info("Flat Field step is being SKIPPED")
+            log.info("Photom step is being SKIPPED")
+            log.info("Source Detection step is being SKIPPED")
+            log.info("Tweakreg step is being SKIPPED")
+            result.meta.cal_step.flat_field = "SKIPPED"
+            result.meta.cal_step.photom = "SKIPPED"
+            result.meta.cal_step.source_catalog = "SKIPPED"
+
+        return result, False
+
     def save_model(self, result, *args, **kwargs):
         if not isinstance(result, rdm.WfiWcsModel):
             save_wfiwcs(self, result, force=True)
@@ -204,3 +350,40 @@ class ExposurePipeline(RomanPipeline):
 
         # Return zeroed-out image file
         return fully_saturated_model
+
+
+def _process_exposure_file(pars, input_path, output_path, filename, psf_cache_dir=None):
+    """Calibrate one exposure in a worker process.
+
+    Parameters
+    ----------
+    pars : dict
+        Parameters (as returned by ``get_pars``) of the parent pipeline.
+    input_path : str
+        Path of the uncalibrated exposure.
+    output_path : str
+        Path where the calibrated exposure will be written.
+    filename : str
+        Original filename of the exposure, used for output naming.
+    psf_cache_dir : str or None
+        Directory of the PSF models prepared by the other workers.
+
+    Returns
+    -------
+    saturated : bool
+        True if the exposure was fully saturated.
+    filename : str
+        Filename of the calibrated exposure.
+    """
+    pipeline = ExposurePipeline(**pars)
+
+    if psf_cache_dir is not None:
+        psf_cache = PSF_MODEL_CACHE.enable(directory=psf_cache_dir)
+    else:
+        psf_cache = contextlib.nullcontext()
+    with psf_cache, rdm.open(input_path) as model:
+        model.meta.filename = filename
+        result, saturated = pipeline.process_exposure(model)
+        filename = result.meta.filename
+        result.save(output_path)
+    return saturated, filename
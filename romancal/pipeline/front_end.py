@@ -0,0 +1,93 @@
+"""Batched DQ initialization and saturation flagging.
+
+When several exposures from the same detector are calibrated together, the
+mask and saturation reference files are the same for all of them.  This
+module runs the ``dq_init`` and ``saturation`` steps on a sequence of
+exposures with one opened copy of each reference file.
+"""
+
+import logging
+import time
+
+from romancal.dq_init import DQInitStep
+from romancal.saturation import SaturationStep
+from romancal.stpipe.reference_cache import ReferenceModelCache
+
+__all__ = ["dq_init_and_saturation"]
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+# Enough for the mask and saturation references of a few detectors
+FRONT_END_CACHE_SIZE = 1 << 30
+
+
+def dq_init_and_saturation(
+    models, dq_init=None, saturation=None, max_bytes=FRONT_END_CACHE_SIZE
+):
+    """Apply DQ initialization and saturation flagging to many exposures.
+
+    Each exposure is run through `~romancal.dq_init.DQInitStep` and then
+    `~romancal.saturation.SaturationStep`, so the results, the ``cal_step``
+    status and the recorded reference files match running the steps one
+    exposure at a time.  The two steps share a reference model cache, so
+    each reference file is opened once for all exposures that use it.
+
+    Parameters
+    ----------
+    models : iterable
+        The uncalibrated exposures: datamodels or filenames.
+
+    dq_init : `~romancal.dq_init.DQInitStep` or None
+        The configured step, for example of a pipeline.  If None a step
+        with the default parameters is used.
+
+    saturation : `~romancal.saturation.SaturationStep` or None
+        The configured step.  If None a step with the default parameters
+        is used.
+
+    max_bytes : int
+        The maximum total size, in bytes, of the arrays of the opened
+        reference files, see
+        `~romancal.stpipe.reference_cache.ReferenceModelCache`.
+
+    Yields
+    ------
+    output_model : `~roman_datamodels.datamodels.RampModel`
+        The flagged ramp for each exposure, in input order.
+    """
+    if dq_init is None:
+        dq_init = DQInitStep()
+    if saturation is None:
+        saturation = SaturationStep()
+
+    cache = ReferenceModelCache(max_bytes)
+    steps = (dq_init, saturation)
+    for step in steps:
+        step.reference_cache = cache
+    try:
+        for model in models:
+            start = time.perf_counter()
+            result = dq_init.run(model)
+            dq_init_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = saturation.run(result)
+            saturation_time = time.perf_counter() - start
+
+            log.info(
+                "%s: dq_init %.3f s, saturation %.3f s",
+                result.meta.filename,
+                dq_init_time,
+                saturation_time,
+            )
+            yield result
+    finally:
+        for step in steps:
+            step.reference_cache = None
+        log.info(
+            "Front end reference files: %d opened, %d reused",
+            cache.misses,
+            cache.hits,
+        )
+        cache.clear()
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 from __future__ import annotations
 
+import contextlib
 import logging
 from typing import TYPE_CHECKING
 
@@ -10,6 +11,7 @@ from romancal.datamodels.fileio import open_dataset
 from romancal.flux import FluxStep
 from romancal.outlier_detection import OutlierDetectionStep
 from romancal.resample import ResampleStep
+from romancal.resample.pixmap_cache import PIXMAP_CACHE
 from romancal.skymatch import SkyMatchStep
 from romancal.source_catalog import SourceCatalogStep
 
@@ -37,6 +39,7 @@ class MosaicPipeline(RomanPipeline):
         save_results = boolean(default=False)
         on_disk = boolean(default=False)
         resample_on_skycell = boolean(default=True)
+        cache_pixmaps = boolean(default=True) # compute the pixel map of each exposure once for outlier_detection
     """
 
     # Define aliases to steps
@@ -70,8 +73,17 @@ class MosaicPipeline(RomanPipeline):
         result = self.flux.run(library)
         self.skymatch.suffix = "skymatch"
         result = self.skymatch.run(result)
-        self.outlier_detection.suffix = "outlier_detection"
-        result = self.outlier_detection.run(result)
+
+        # outlier_detection blots the median with the maps computed when
+        # resampling the exposures to it; when the library is on disk keep
+        # the maps there too
+        if self.cache_pixmaps:
+            pixmap_cache = PIXMAP_CACHE.enable(on_disk=self.on_disk)
+        else:
+            pixmap_cache = contextlib.nullcontext()
+        with pixmap_cache:
+            self.outlier_detection.suffix = "outlier_detection"
+            result = self.outlier_detection.run(result)
         self.resample.suffix = "coadd"
         self.output_file = library.asn["products"][0]["name"]
         result = self.resample.run(result)
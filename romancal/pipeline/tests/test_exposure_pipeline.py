@@ -5,7 +5,7 @@ from astropy.time import Time
 
 from romancal.associations.asn_from_list import asn_from_list
 from romancal.datamodels.library import ModelLibrary
-from romancal.pipeline import ExposurePipeline
+from romancal.pipeline import ExposurePipeline, exposure_pipeline
 
 
 @pytest.fixture(scope="function")
@@ -101,3 +101,57 @@ def test_elp_save_results(function_jail, save_results, monkeypatch):
         expected.add("test_cal.asdf")
         expected.add("test_wcs.asdf")
     assert output_files == expected
+
+
+def test_elp_parallel_matches_serial(function_jail, monkeypatch):
+    """
+    Test that processing exposures in parallel gives the same result
+    as processing them serially.
+    """
+    # allow 2 processes even on single core machines
+    monkeypatch.setattr(exposure_pipeline, "cpu_count", lambda: 2)
+
+    models = []
+    for i in range(2):
+        model = rdm.RampModel.create_fake_data(shape=(2, 20, 20))
+        model.meta.filename = f"model_{i}.asdf"
+        model.meta.exposure.start_time = Time(
+            "2024-01-03T00:00:00.0", format="isot", scale="utc"
+        )
+        model.meta.instrument.detector = "WFI18" if i == 0 else "WFI01"
+        model.meta.cal_step.wfi18_transient = "INCOMPLETE"
+        model.data[:] = i
+        model.groupdq[:] = 0
+        models.append(model)
+
+    results = {}
+    for maximum_cores in ("1", "2"):
+        pipeline = ExposurePipeline()
+        pipeline.prefetch_references = False
+        pipeline.maximum_cores = maximum_cores
+        [setattr(getattr(pipeline, k), "skip", True) for k in pipeline.step_defs]
+        # run a step which needs no reference files
+        pipeline.wfi18_transient.skip = False
+        library = pipeline.run(ModelLibrary([m.copy() for m in models]))
+        with library:
+            results[maximum_cores] = []
+            for index, model in enumerate(library):
+                results[maximum_cores].append(
+                    (
+                        model.meta.filename,
+                        model.meta.cal_step.wfi18_transient,
+                        model.data.copy(),
+                        model.groupdq.copy(),
+                    )
+                )
+                library.shelve(model, index, modify=False)
+
+    # the transient rows are masked for WFI18 only
+    assert [r[1] for r in results["1"]] == ["COMPLETE", "N/A"]
+    assert results["1"][0][3].any()
+    assert not results["1"][1][3].any()
+
+    for serial, parallel in zip(results["1"], results["2"], strict=True):
+        assert serial[:2] == parallel[:2]
+        np.testing.assert_array_equal(serial[2], parallel[2])
+        np.testing.assert_array_equal(serial[3], parallel[3])
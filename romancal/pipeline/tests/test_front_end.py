@@ -0,0 +1,116 @@
+"""Tests of the batched DQ initialization and saturation front end."""
+
+import logging
+
+import numpy as np
+import pytest
+from astropy.time import Time
+from roman_datamodels.datamodels import (
+    MaskRefModel,
+    SaturationRefModel,
+    ScienceRawModel,
+)
+from roman_datamodels.dqflags import group, pixel
+
+from romancal.dq_init import DQInitStep
+from romancal.pipeline.front_end import dq_init_and_saturation
+from romancal.saturation import SaturationStep
+
+SHAPE = (6, 20, 20)
+
+
+def make_raw(seed):
+    rng = np.random.default_rng(seed)
+    model = ScienceRawModel.create_fake_data(shape=SHAPE)
+    model.meta.filename = f"raw_{seed}.asdf"
+    model.meta.exposure.start_time = Time(
+        "2024-01-03T00:00:00.0", format="isot", scale="utc"
+    )
+    model.meta.exposure.type = "WFI_IMAGE"
+    model.meta.exposure.read_pattern = [[1], [2, 3], [4], [5, 6, 7, 8], [9], [10]]
+    model.meta.guide_star.window_xstart = 4
+    model.meta.guide_star.window_xstop = 8
+    model.data = np.cumsum(rng.integers(0, 15000, SHAPE), axis=0).astype(
+        model.data.dtype
+    )
+    model.amp33 = np.zeros((SHAPE[0], 4096, 128), dtype=model.amp33.dtype)
+    return model
+
+
+@pytest.fixture
+def references(tmp_path):
+    rng = np.random.default_rng(7)
+    mask = MaskRefModel.create_fake_data(shape=SHAPE[1:])
+    mask.dq = np.zeros(SHAPE[1:], dtype=np.uint32)
+    mask.dq[3, 4] = pixel.DEAD
+    mask.dq[10, 2] = pixel.HOT | pixel.DO_NOT_USE
+    mask_file = str(tmp_path / "mask.asdf")
+    mask.save(mask_file)
+
+    saturation = SaturationRefModel.create_fake_data(shape=SHAPE[1:])
+    saturation.data = rng.uniform(30000, 60000, SHAPE[1:]).astype(saturation.data.dtype)
+    saturation.data[5, 5] = np.nan
+    saturation.dq = np.zeros(SHAPE[1:], dtype=np.uint32)
+    saturation.dq[8, 9] = pixel.NO_SAT_CHECK
+    saturation_file = str(tmp_path / "saturation.asdf")
+    saturation.save(saturation_file)
+    return mask_file, saturation_file
+
+
+@pytest.mark.parametrize("rows_per_band", [None, 3])
+def test_dq_init_and_saturation(references, rows_per_band, caplog):
+    """The batched front end matches running the two steps on each exposure."""
+    mask_file, saturation_file = references
+    seeds = [1, 2, 3]
+
+    dq_init = DQInitStep(override_mask=mask_file)
+    saturation = SaturationStep(
+        override_saturation=saturation_file, rows_per_band=rows_per_band
+    )
+    with caplog.at_level(logging.INFO, logger="romancal.pipeline.front_end"):
+        results = list(
+            dq_init_and_saturation(
+                [make_raw(seed) for seed in seeds], dq_init, saturation
+            )
+        )
+
+    # each reference file is opened once
+    assert "Front end reference files: 2 opened, 4 reused" in caplog.text
+    assert dq_init.reference_cache is None
+    assert saturation.reference_cache is None
+
+    assert len(results) == len(seeds)
+    for seed, result in zip(seeds, results, strict=True):
+        expected = DQInitStep.call(make_raw(seed), override_mask=mask_file)
+        expected = SaturationStep.call(expected, override_saturation=saturation_file)
+
+        assert f"{result.meta.filename}: dq_init" in caplog.text
+        assert result.meta.filename == expected.meta.filename
+        assert result.meta.cal_step.dq_init == "COMPLETE"
+        assert result.meta.cal_step.saturation == "COMPLETE"
+        assert result.meta.ref_file.mask == expected.meta.ref_file.mask
+        assert result.meta.ref_file.saturation == expected.meta.ref_file.saturation
+        np.testing.assert_array_equal(result.data, expected.data)
+        np.testing.assert_array_equal(result.pixeldq, expected.pixeldq)
+        np.testing.assert_array_equal(result.groupdq, expected.groupdq)
+        np.testing.assert_array_equal(
+            result.dq_border_ref_pix_left, expected.dq_border_ref_pix_left
+        )
+        np.testing.assert_array_equal(
+            result.border_ref_pix_top, expected.border_ref_pix_top
+        )
+        assert np.any(result.groupdq & group.SATURATED)
+
+
+def test_dq_init_and_saturation_skipped():
+    """Skipped steps are reported as such for every exposure."""
+    dq_init = DQInitStep(skip=True)
+    saturation = SaturationStep(skip=True)
+
+    results = list(
+        dq_init_and_saturation([make_raw(1), make_raw(2)], dq_init, saturation)
+    )
+
+    for result in results:
+        assert result.meta.cal_step.dq_init == "SKIPPED"
+        assert result.meta.cal_step.saturation == "SKIPPED"
@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 import copy
+import itertools
 import logging
+import multiprocessing
+from multiprocessing import cpu_count, shared_memory
 from typing import TYPE_CHECKING
 
 import asdf
@@ -12,9 +15,10 @@ from astropy.utils.decorators import deprecated
 from roman_datamodels import datamodels as rdm
 from roman_datamodels.dqflags import group, pixel
 from stcal.jump.jump_class import JumpData
+from stcal.multiprocessing import compute_num_cores
 from stcal.ramp_fitting import ols_cas22_fit
 from stcal.ramp_fitting.likely_fit import likely_ramp_fit
-from stcal.ramp_fitting.ols_cas22 import Parameter, Variance
+from stcal.ramp_fitting.ols_cas22 import Parameter, RampFitOutputs, Variance
 
 from romancal.datamodels.fileio import open_dataset
 from romancal.stpipe import RomanStep
@@ -66,9 +70,9 @@ class RampFitStep(RomanStep):
         readnoise_filename = self.get_reference_file(input_model, "readnoise")
         gain_filename = self.get_reference_file(input_model, "gain")
         log.info("Using READNOISE reference file: %s", readnoise_filename)
-        readnoise_model = rdm.open(readnoise_filename, mode="r")
+        readnoise_model = self.open_reference_model(readnoise_filename, mode="r")
         log.info("Using GAIN reference file: %s", gain_filename)
-        gain_model = rdm.open(gain_filename, mode="r")
+        gain_model = self.open_reference_model(gain_filename, mode="r")
 
         # Do the fitting based on the algorithm selected.
         algorithm = self.algorithm.lower()
@@ -142,16 +146,32 @@ class RampFitStep(RomanStep):
         if len(read_pattern) != resultants.shape[0]:
             raise RuntimeError("mismatch between resultants shape and read_pattern.")
 
-        # Fit the ramps
-        output = ols_cas22_fit.fit_ramps_casertano(
-            resultants,
-            dq,
-            read_noise,
-            read_time,
-            read_pattern=read_pattern,
-            use_jump=use_jump,
-            **kwargs,
+        # Fit the ramps, split into row slabs if more than one core is requested
+        n_workers = compute_num_cores(
+            self.maximum_cores, resultants.shape[1], cpu_count()
         )
+        if n_workers > 1:
+            log.info("Fitting ramps in %d row slabs", n_workers)
+            output = fit_ramps_casertano_slabs(
+                resultants,
+                dq,
+                read_noise,
+                read_time,
+                read_pattern,
+                use_jump,
+                n_workers,
+                **kwargs,
+            )
+        else:
+            output = ols_cas22_fit.fit_ramps_casertano(
+                resultants,
+                dq,
+                read_noise,
+                read_time,
+                read_pattern=read_pattern,
+                use_jump=use_jump,
+                **kwargs,
+            )
 
         # Break out the information and fix units back to DN/s
         slopes = output.parameters[..., Parameter.slope] / gain
@@ -286,6 +306,128 @@ class RampFitStep(RomanStep):
 # #########
 # Utilities
 # #########
+def fit_ramps_casertano_slabs(
+    resultants, dq, read_noise, read_time, read_pattern, use_jump, n_workers, **kwargs
+):
+    """Run `~stcal.ramp_fitting.ols_cas22_fit.fit_ramps_casertano` in row slabs
+
+    Every pixel is fit independently, so the detector is split into
+    ``n_workers`` slabs of rows which are fit in a pool of processes.
+    The inputs and outputs are exchanged through shared memory, so only
+    the slab boundaries are sent to the workers. The result is identical
+    to fitting the full arrays at once.
+
+    Parameters
+    ----------
+    resultants : np.ndarray[n_resultants, n_rows, n_cols]
+        The resultants in electrons.
+
+    dq : np.ndarray[n_resultants, n_rows, n_cols]
+        The group dq array.
+
+    read_noise : np.ndarray[n_rows, n_cols]
+        The read noise in electrons.
+
+    read_time : float
+        The frame time.
+
+    read_pattern : list[list[int]]
+        The read pattern.
+
+    use_jump : bool
+        Run jump detection as part of the fit.
+
+    n_workers : int
+        Number of row slabs, and processes, to use.
+
+    **kwargs
+        Passed on to ``fit_ramps_casertano``.
+
+    Returns
+    -------
+    RampFitOutputs
+        The stitched parameters, variances and dq.
+    """
+    n_resultants, n_rows, n_cols = resultants.shape
+    specs = {
+        "resultants": ((n_resultants, n_rows, n_cols), np.float32),
+        "dq": ((n_resultants, n_rows, n_cols), np.int32),
+        "read_noise": ((n_rows, n_cols), np.float32),
+        "parameters": ((n_rows, n_cols, 2), np.float32),
+        "variances": ((n_rows, n_cols, 3), np.float32),
+        "dq_out": ((n_resultants, n_rows, n_cols), np.int32),
+    }
+
+    blocks = {}
+    try:
+        for name, (shape, dtype) in specs.items():
+            nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            blocks[name] = shared_memory.SharedMemory(create=True, size=nbytes)
+        arrays = {
+            name: np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+            for name, (shape, dtype) in specs.items()
+        }
+        arrays["resultants"][...] = resultants
+        arrays["dq"][...] = dq
+        arrays["read_noise"][...] = read_noise
+
+        layout = {
+            name: (blocks[name].name, shape, np.dtype(dtype).str)
+            for name, (shape, dtype) in specs.items()
+        }
+        bounds = np.linspace(0, n_rows, n_workers + 1).astype(int)
+        tasks = [
+            (layout, start, stop, read_time, read_pattern, use_jump, kwargs)
+            for start, stop in itertools.pairwise(bounds)
+            if stop > start
+        ]
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(processes=len(tasks)) as pool:
+            pool.starmap(_fit_ramp_slab, tasks)
+
+        output = RampFitOutputs(
+            arrays["parameters"].copy(),
+            arrays["variances"].copy(),
+            arrays["dq_out"].copy(),
+        )
+        del arrays
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+    return output
+
+
+def _fit_ramp_slab(layout, start, stop, read_time, read_pattern, use_jump, kwargs):
+    """Fit the rows ``start:stop`` of the shared arrays described by ``layout``"""
+    blocks = {
+        name: shared_memory.SharedMemory(name=shm_name)
+        for name, (shm_name, _, _) in layout.items()
+    }
+    try:
+        arrays = {
+            name: np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+            for name, (_, shape, dtype) in layout.items()
+        }
+        output = ols_cas22_fit.fit_ramps_casertano(
+            arrays["resultants"][:, start:stop],
+            arrays["dq"][:, start:stop],
+            arrays["read_noise"][start:stop],
+            read_time,
+            read_pattern=read_pattern,
+            use_jump=use_jump,
+            **kwargs,
+        )
+        arrays["parameters"][start:stop] = output.parameters
+        arrays["variances"][start:stop] = output.variances
+        arrays["dq_out"][:, start:stop] = output.dq
+        del arrays
+    finally:
+        for block in blocks.values():
+            block.close()
+
+
 def create_image_model(input_model, image_info, include_var_rnoise=False):
     """Creates an ImageModel from the computed arrays from ramp_fit.
 
@@ -3,9 +3,9 @@
 import numpy as np
 import pytest
 
-from romancal.ramp_fitting import RampFitStep
+from romancal.ramp_fitting import RampFitStep, ramp_fit_step
 
-from .common import SIMPLE_RESULTANTS, make_data
+from .common import SIMPLE_RESULTANTS, make_data, rng
 
 SIMPLE_EXPECTED_DEFAULT = {
     "data": np.array(
@@ -80,6 +80,35 @@ def test_fits(fit_ramps, attribute):
     np.testing.assert_allclose(value, expected_value, precision)
 
 
+@pytest.mark.parametrize("use_jump", [True, False])
+def test_maximum_cores(monkeypatch, use_jump):
+    """Ensure fitting in row slabs reproduces the single process fit exactly"""
+    resultants = np.cumsum(rng.poisson(20, size=(6, 9, 7)), axis=0).astype(np.float32)
+    # Add a jump to exercise the jump detection
+    resultants[3:, 2, 3] += 1000
+    ramp_model, gain_model, readnoise_model, dark_model = make_data(
+        resultants, 2, 5.0, False
+    )
+    monkeypatch.setattr(ramp_fit_step, "cpu_count", lambda: 3)
+
+    results = [
+        RampFitStep.call(
+            ramp_model.copy(),
+            algorithm="ols_cas22",
+            use_ramp_jump_detection=use_jump,
+            override_gain=gain_model,
+            override_readnoise=readnoise_model,
+            maximum_cores=maximum_cores,
+        )
+        for maximum_cores in ("1", "3")
+    ]
+
+    for attribute in ("data", "dq", "err", "var_poisson", "dumo"):
+        np.testing.assert_array_equal(
+            getattr(results[0], attribute), getattr(results[1], attribute)
+        )
+
+
 # ########
 # Fixtures
 # ########
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import abc
+from functools import partial
 from itertools import islice
 from typing import TYPE_CHECKING
 
@@ -11,7 +12,7 @@ from dataclasses import dataclass
 from enum import IntEnum
 
 import numpy as np
-from scipy import fft
+from scipy import fft, ndimage
 
 
 class Const(IntEnum):
@@ -322,6 +323,10 @@ class ChannelView(BaseView):
             This is different than the offset correction, which is computed
             simultaneously across all frames in order to remove any general bias.
 
+        The linear fits for every channel and frame are computed simultaneously
+        using the closed form least squares solution over the non-zero reference
+        pixel rows, see `linear_trends`.
+
         Note:
             - Change will be inplace of this object.
             - It will also return this object so it can be treated functionally.
@@ -335,33 +340,74 @@ class ChannelView(BaseView):
         # Locate the top and bottom reference pixel rows
         REF_ROWS = [*np.arange(Const.REF), *(rows - np.arange(Const.REF) - 1)[::-1]]
 
-        # Restrict to the reference pixels and non-zero values
-        t_ref = t[REF_ROWS, :]
-        not_zero = self.data != 0
-
-        # fit needs to be done for each channel and frame separately
-        for chan_data, chan_not_zero in zip(self.data, not_zero, strict=False):
-            for frame_data, frame_not_zero in zip(
-                chan_data, chan_not_zero, strict=False
+        # Fit all the channels and frames at once
+        #    [channel, frame]
+        m, b = self.linear_trends(t[REF_ROWS, :], self.data[:, :, REF_ROWS, :])
+
+        # Remove the fit from the non-zero data, frame by frame so that only a
+        # single frame sized buffer is needed for the trend, the trend is
+        # computed in double precision and only cast when subtracted
+        trend = np.empty(t.shape, dtype=np.float64)
+        for chan_data, chan_m, chan_b in zip(self.data, m, b, strict=True):
+            for frame_data, frame_m, frame_b in zip(
+                chan_data, chan_m, chan_b, strict=True
             ):
-                # Find the non-zero reference pixels for this channel and frame
-                mask = frame_not_zero[REF_ROWS, :]
+                np.multiply(t, frame_m, out=trend)
+                trend += frame_b
+                np.subtract(frame_data, trend, out=frame_data, where=frame_data != 0)
+
+        return self
 
-                # Compute the independent and dependent variables for the fit
-                x_vals = t_ref[mask]
-                y_vals = frame_data[REF_ROWS, :][mask]
+    @staticmethod
+    def linear_trends(
+        t_ref: np.ndarray, ref: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the linear least squares fit (slope and intercept) of the
+        non-zero values of the reference rows for every channel and frame.
 
-                # Skip if there is no data
-                if x_vals.size < 1 or y_vals.size < 1:
-                    continue
+        This reproduces fitting each channel and frame separately with
+        ``np.polyfit(t_ref[mask], ref[mask], 1)``.
 
-                # Perform the fit using a 1st order polynomial, (i.e. linear fit)
-                m, b = np.polyfit(x_vals, y_vals, 1)
+        Parameters:
+        ----------
+            t_ref: The independent variable of the reference rows, [row, column]
+            ref: The reference rows, [channel, frame, row, column]
+
+        Returns:
+        -------
+            The double precision slope and intercept of each fit,
+            [channel, frame]. Fits with no non-zero values have zero slope and
+            intercept.
+        """
+        mask = ref != 0
+        t_ref = t_ref.astype(np.float64)
+
+        # Compute the masked sums needed for linear least squares,
+        #    zero values of ref do not contribute to the y sums anyway
+        n = np.count_nonzero(mask, axis=(2, 3))
+        sx = np.einsum("cfij,ij->cf", mask, t_ref)
+        sxx = np.einsum("cfij,ij->cf", mask, t_ref**2)
+        sy = np.sum(ref, axis=(2, 3), dtype=np.float64)
+        sxy = np.einsum("cfij,ij->cf", ref, t_ref, dtype=np.float64)
+
+        m = np.zeros(n.shape, dtype=np.float64)
+        b = np.zeros(n.shape, dtype=np.float64)
+
+        # Regular fits
+        fit = n > 1
+        m[fit] = (n[fit] * sxy[fit] - sx[fit] * sy[fit]) / (
+            n[fit] * sxx[fit] - sx[fit] ** 2
+        )
+        b[fit] = (sy[fit] - m[fit] * sx[fit]) / n[fit]
 
-                # Remove the fit from the data
-                frame_data -= (t * m + b) * frame_not_zero
+        # A single point is under-determined, polyfit returns the minimum norm
+        # solution, which splits the value evenly between slope and intercept
+        single = n == 1
+        m[single] = sy[single] / (2 * sx[single])
+        b[single] = sy[single] / 2
 
-        return self
+        return m, b
 
     def cosine_interpolate(self) -> ChannelView:
         """
@@ -373,62 +419,88 @@ class ChannelView(BaseView):
         I have purposely let this computation be verbose because we may have to
         apply it to both the left and right reference pixel channels.
         """
-        data = self.amp33
-        channels, _, rows, columns = self.detector.shape
+        channels = self.detector.shape[0]
 
         # Create the "cosine" interpolation
-        interp = np.sin(np.arange(1, channels + 1, dtype=data.dtype) * np.pi / channels)
-
-        for frame in data:
-            # flatten the frame into a 1D array
-            kern = frame.reshape(rows * columns)
-
-            # Find the non-zero values (so we can normalize by their values later)
-            #    Note: I do not thing the dtype cast is necessary here, but it was
-            #          specifically cast this way in the original code. I suspect
-            #          we can remove the dtype cast here to avoid a data copy. For
-            #          little loss of numerical precision and a modest speedup.
-            mask = (kern != 0).astype(np.int64)
-
-            # Convolve the interpolation with the data
-            cov = np.convolve(kern, interp, mode="same")
-            mask_conv = np.convolve(mask, interp, mode="same")
-
-            # Normalize by the non-zero values
-            kern = (cov / mask_conv).reshape(rows, columns)
+        interp = np.sin(
+            np.arange(1, channels + 1, dtype=self.data.dtype) * np.pi / channels
+        )
 
-            # Apply the interpolation to the data
-            frame += kern * (1 - mask.reshape(rows, columns))
+        # Flatten each frame into a 1D array, all the frames are convolved at once
+        amp33 = self.amp33
+        frames = amp33.reshape(amp33.shape[0], -1)
+
+        # Find the non-zero values (so we can normalize by their values later)
+        nonzero = frames != 0
+
+        # Convolve the interpolation with the data and with the non-zero values,
+        #    the sums are accumulated in double precision. The origin centers
+        #    the kernel as np.convolve(..., mode="same") does.
+        origin = (channels - 1) // 2 - channels // 2
+        convolve = partial(
+            ndimage.convolve1d,
+            weights=interp,
+            axis=-1,
+            output=self.data.dtype,
+            mode="constant",
+            origin=origin,
+        )
+        cov = convolve(frames)
+        norm = convolve(nonzero)
+
+        # The mask now selects the zero values to interpolate
+        zeros = np.logical_not(nonzero, out=nonzero)
+
+        # Normalize by the non-zero values
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.divide(cov, norm, out=cov)
+        del norm
+
+        # Apply the interpolation to the zero values of the frames
+        np.add(
+            amp33,
+            cov.reshape(amp33.shape),
+            out=amp33,
+            where=zeros.reshape(amp33.shape),
+        )
 
         # Fix NaN values because the above computations can interpolate to NaN
         #     values, these will be set to zero.
-        np.nan_to_num(data, copy=False)
+        np.nan_to_num(self.amp33, copy=False)
 
         return self
 
     @staticmethod
     def fft_interp_generator(
-        frame: np.ndarray, pad: np.ndarray, apodize: np.ndarray
+        data: np.ndarray, pad: np.ndarray, apodize: np.ndarray, workers: int = 1
     ) -> np.ndarray:
         """
         Provide an infinite generator of FFT interpolation iterations using the
-        apodizing function for the padded columns of a given frame.
+        apodizing function for the padded columns of a stack of frames.
 
             Since this is an iterative method, and determining the number of iterations
             is arbitrary, a generator is provided so tha it is simple to choose method
             of stopping the iteration (fixed, relative change, absolute change, etc.)
+
+            All the frames are transformed at once, data is [frame, flattened frame].
         """
+        length = data.shape[-1]
+
         while True:
             # Perform the FFT interpolation using the apodizing function
-            result = apodize * fft.rfft(frame, workers=1) / frame.size
-            result = fft.irfft(result * frame.size, workers=1).astype(frame.dtype)
+            result = apodize * fft.rfft(data, axis=-1, workers=workers) / length
+            result = fft.irfft(result * length, axis=-1, workers=workers).astype(
+                data.dtype
+            )
 
             # Only update the padded columns
-            frame[pad] = result[pad]
+            data[:, pad] = result[:, pad]
 
-            yield frame
+            yield data
 
-    def fft_interpolate(self, num: int = 3) -> ChannelView:
+    def fft_interpolate(
+        self, num: int = 3, tol: float | None = None, workers: int = 1
+    ) -> ChannelView:
         """
         FFT interpolate the amp33 reference channel's padded columns.
             - This is done in place.
@@ -439,7 +511,11 @@ class ChannelView(BaseView):
 
         Parameters:
         ----------
-            num: The number of iterations to perform. (default: 3)
+            num: The number of iterations to perform, or the maximum number of
+                 iterations if `tol` is given. (default: 3)
+            tol: If given, stop iterating once the largest change of the padded
+                 values between iterations is at most this value. (default: None)
+            workers: The number of workers used to compute the FFTs. (default: 1)
         """
         frames, rows, columns = self.amp33.shape
         length = rows * columns
@@ -459,15 +535,18 @@ class ChannelView(BaseView):
             1 + np.cos(2 * np.pi * np.abs(np.fft.rfftfreq(length, 1 / length)) / length)
         ) / 2
 
-        for frame in data:
+        iterations = self.fft_interp_generator(data, pad, apodize, workers)
+
+        if tol is None:
             # Note `islice(iter, start, stop)` is tool which takes in an iterator
             # and returns selected elements from it.
-            #   - `start` is the index of the first element to return from the iterator
+            #   - `start` is the index of the first element to return from the
+            #     iterator
             #   - `stop` is the index of the last element to return, if it is None
             #      then an iterator starting at `start` is returned.
             #
-            # In this case we are using it to advance (skip) the generator (returns an
-            # iterator) to the  `num - 1` index term (i.e. run the generator `num`
+            # In this case we are using it to advance (skip) the generator (returns
+            # an iterator) to the  `num - 1` index term (i.e. run the generator `num`
             # times). Since`stop = None`, it will return an iterator whose first
             # output will be the `num`th iteration of the algorithm (the one we want).
             #
@@ -480,18 +559,16 @@ class ChannelView(BaseView):
             # In this case, we have the infinite iterable, whose first value is
             # the iteration of the algorithm we want from `islice`, so calling
             # `next()` on it will simply return the iteration we desire.
-            #
-            # Other itertools can be use to recreate any iteration termination behavior
-            # desired. In this case, we put them together to iterate a fixed number of
-            # times.
-
-            next(
-                islice(
-                    self.fft_interp_generator(frame, pad, apodize),
-                    num - 1,
-                    None,
-                )
-            )
+            next(islice(iterations, num - 1, None))
+            return self
+
+        # Iterate until the padded values stop changing (or `num` iterations)
+        previous = data[:, pad]
+        for interpolated in islice(iterations, num):
+            current = interpolated[:, pad]
+            if np.max(np.abs(current - previous), initial=0) <= tol:
+                break
+            previous = current
 
         return self
 
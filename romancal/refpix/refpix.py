@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import time
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -19,9 +20,16 @@ def run_steps(
     remove_trends: bool = True,
     cosine_interpolate: bool = True,
     fft_interpolate: bool = True,
+    fft_iterations: int = 3,
+    fft_tolerance: float | None = None,
+    workers: int = 1,
 ) -> RampModel:
     """
     Organize the steps to run the reference pixel correction.
+
+    The FFT interpolation is run for ``fft_iterations`` iterations, or until the
+    padded values change by at most ``fft_tolerance`` if it is given, using
+    ``workers`` workers for the FFTs.
     """
 
     # Read in the data from the datamodels
@@ -44,12 +52,16 @@ def run_steps(
 
     # Cosine interpolate the the data
     if cosine_interpolate:
+        start = time.perf_counter()
         channel = channel.cosine_interpolate()
-        log.debug("Cosine interpolated the reference pixels.")
+        log.debug(
+            "Cosine interpolated the reference pixels in %.3f s.",
+            time.perf_counter() - start,
+        )
 
     # FFT interpolate the data
     if fft_interpolate:
-        channel = channel.fft_interpolate()
+        channel = channel.fft_interpolate(fft_iterations, fft_tolerance, workers)
         log.debug("FFT interpolated the reference pixel pads.")
 
     # Perform the reference pixel correction
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import logging
+from multiprocessing import cpu_count
 from typing import TYPE_CHECKING
 
-import roman_datamodels as rdm
+from stcal.multiprocessing import compute_num_cores
 
 from romancal.datamodels.fileio import open_dataset
 from romancal.refpix import refpix
@@ -35,6 +36,12 @@ class RefPixStep(RomanStep):
     # interpolation of the reference pixels
     fft_interpolate = boolean(default=True) # Turn on or off the FFT interpolation
     # of the reference pixel padded values.
+    fft_interpolate_iterations = integer(default=3) # Number of FFT interpolation
+    # iterations, or the maximum number if fft_interpolate_tolerance is set
+    fft_interpolate_tolerance = float(default=None) # Stop the FFT interpolation
+    # once the padded values change by at most this amount between iterations
+    maximum_cores = string(default='1') # cores for computing the FFTs. Can be an
+    # integer, 'half', 'quarter', or 'all'
     """
 
     reference_file_types: ClassVar = ["refpix"]
@@ -58,8 +65,12 @@ class RefPixStep(RomanStep):
             datamodel.meta.cal_step.refpix = "SKIPPED"
             return datamodel
 
+        workers = compute_num_cores(
+            self.maximum_cores, datamodel.data.shape[0], cpu_count()
+        )
+
         log.debug(f"Opening the reference file: {ref_file}")
-        with rdm.open(ref_file) as refs:
+        with self.open_reference_model(ref_file) as refs:
             # Run the correction
             log.debug("Running the reference pixel correction")
             refpix.run_steps(
@@ -69,6 +80,9 @@ class RefPixStep(RomanStep):
                 self.remove_trends,
                 self.cosine_interpolate,
                 self.fft_interpolate,
+                self.fft_interpolate_iterations,
+                self.fft_interpolate_tolerance,
+                workers,
             )
             # Update the step status
             datamodel.meta.cal_step["refpix"] = "COMPLETE"
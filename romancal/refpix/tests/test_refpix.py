@@ -1,3 +1,5 @@
+import numpy as np
+
 from romancal.refpix.data import StandardView
 from romancal.refpix.refpix import run_steps
 
@@ -12,5 +14,8 @@ def test_run_steps_regression(datamodel, ref_pix_ref):
 
     result = run_steps(datamodel, ref_pix_ref, True, True, True, True)
 
-    assert (result.data == regression_out).all()
+    # The amp33 interpolation is accumulated in double precision rather than
+    # float32, so the results agree to the float32 precision of the data
+    tolerance = np.finfo(np.float32).eps * np.abs(regression_out).max()
+    np.testing.assert_allclose(result.data, regression_out, rtol=0, atol=tolerance)
     # regression_out does not return amp33 data
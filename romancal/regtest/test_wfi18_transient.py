@@ -1,10 +1,16 @@
 from pathlib import Path
 
+import numpy as np
 import pytest
 import roman_datamodels as rdm
 
 from romancal.lib.suffix import replace_suffix
 from romancal.stpipe import RomanStep
+from romancal.wfi18_transient.tests.test_wfi18_transient import (
+    create_ramp_model,
+    transient_glow,
+)
+from romancal.wfi18_transient.wfi18_transient import correct_anomaly
 
 from .regtestdata import compare_asdf
 
@@ -56,3 +62,14 @@ def test_cal_step_updated(output_model):
         assert output_model.meta.cal_step.wfi18_transient == "COMPLETE"
     else:
         assert output_model.meta.cal_step.wfi18_transient == "N/A"
+
+
+@pytest.mark.parametrize("rows_per_band", [None, 256])
+def test_correct_anomaly_resources(rows_per_band, resource_tracker, request):
+    """Track the runtime and peak memory of the correction on a 16 resultant ramp"""
+    model = create_ramp_model(16)
+    model.data[:] = np.arange(16, dtype=np.float32)[:, None, None] * 5 + 100
+    model.data[0, 4:-4, 4:-4] += transient_glow()[4:-4, 4:-4] * 300
+
+    with resource_tracker.track(log=request):
+        correct_anomaly(model, rows_per_band=rows_per_band)
@@ -5,8 +5,22 @@ from stcal.resample.utils import (
     build_driz_weight,
 )
 
+# Extent, in input pixels, of the largest drizzle kernel (lanczos3)
+# around the center of an input pixel.
+_KERNEL_RADIUS = 4
+
 
 class ExptimeResampler:
+    """
+    Accumulate the exposure time of each output pixel.
+
+    Each input image is drizzled as a unit image, which is one in every
+    output pixel it covers, and added to the total scaled by its effective
+    exposure time.  Only the region of the output covered by the image is
+    added and then reset, so the cost of each image scales with its
+    footprint rather than with the size of the output.
+    """
+
     def __init__(self, out_wcs, out_shape, good_bits, kernel):
         self.out_wcs = out_wcs
         self.out_shape = out_shape
@@ -16,6 +30,9 @@ class ExptimeResampler:
         self.out_wht = np.zeros(out_shape, dtype="f4")
         self.exptime_total = np.zeros(out_shape, dtype="f4")
 
+        # unit image drizzled for each input, reused while the shape matches
+        self._unit = None
+
         self._driz = Drizzle(
             kernel=kernel,
             fillval=0,
@@ -24,8 +41,37 @@ class ExptimeResampler:
             disable_ctx=True,
         )
 
+    def _footprint(self, pixmap, pixel_scale_ratio, xmin, xmax, ymin, ymax):
+        """
+        Slices of the output covering the pixels drizzled from an image.
+
+        Returns None if no input pixel maps onto the output.
+        """
+        region = pixmap[ymin : ymax + 1, xmin : xmax + 1]
+        x = region[..., 0]
+        y = region[..., 1]
+        if np.all(np.isnan(x)):
+            return None
+
+        # pad by the kernel extent, in output pixels
+        pad = int(np.ceil(_KERNEL_RADIUS / pixel_scale_ratio)) + 1
+        ny, nx = self.out_shape
+        x0 = max(int(np.floor(np.nanmin(x))) - pad, 0)
+        x1 = min(int(np.ceil(np.nanmax(x))) + pad + 1, nx)
+        y0 = max(int(np.floor(np.nanmin(y))) - pad, 0)
+        y1 = min(int(np.ceil(np.nanmax(y))) + pad + 1, ny)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return np.s_[y0:y1, x0:x1]
+
     def add_image(self, model, pixmap, pixel_scale_ratio, xmin, xmax, ymin, ymax):
-        data = np.full(model["data"].shape, model["effective_exposure_time"])
+        footprint = self._footprint(pixmap, pixel_scale_ratio, xmin, xmax, ymin, ymax)
+        if footprint is None:
+            return
+
+        shape = model["data"].shape
+        if self._unit is None or self._unit.shape != shape:
+            self._unit = np.ones(shape, dtype="f4")
 
         # create a unit weight map for all the input pixels with science data
         inwht = build_driz_weight(
@@ -39,7 +85,7 @@ class ExptimeResampler:
         )
 
         self._driz.add_image(
-            data,
+            self._unit,
             pixmap=pixmap,
             exptime=1.0,
             iscale=1.0,
@@ -54,11 +100,14 @@ class ExptimeResampler:
             ymax=ymax,
         )
 
-        self.exptime_total += self.out_img
+        # the output is one where the image has coverage
+        self.exptime_total[footprint] += (
+            model["effective_exposure_time"] * self.out_img[footprint]
+        )
 
-        # zero out arrays for next image
-        self.out_img[:] = 0
-        self.out_wht[:] = 0
+        # reset the covered region for the next image
+        self.out_img[footprint] = 0
+        self.out_wht[footprint] = 0
 
     def finalize(self):
         return self.exptime_total
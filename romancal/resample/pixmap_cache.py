@@ -0,0 +1,216 @@
+"""
+Process-level cache of pixel maps
+"""
+
+import contextlib
+import hashlib
+import logging
+import os
+import tempfile
+
+import numpy as np
+from stcal.resample.utils import calc_pixmap
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+__all__ = ["PIXMAP_CACHE", "PIXMAP_CACHE_SIZE", "PixmapCache", "wcs_fingerprint"]
+
+# number of points along each axis used to fingerprint a WCS
+_FINGERPRINT_SAMPLES = 8
+
+# Default size of the maps kept in memory, a 4088 x 4088 map is 267 MB
+PIXMAP_CACHE_SIZE = 2 << 30
+
+
+def wcs_fingerprint(wcs, shape):
+    """
+    Hash identifying a WCS over an array of the given shape.
+
+    The forward transform is evaluated on a grid of pixels spanning the
+    array, so two WCS objects with the same transform (for example one
+    read back from a file) have the same fingerprint, while any change to
+    the transform, such as a tweakreg correction, changes it.
+
+    Parameters
+    ----------
+    wcs : gwcs.wcs.WCS
+        The WCS.
+
+    shape : tuple of int
+        The shape of the array the WCS describes.
+
+    Returns
+    -------
+    str
+        The fingerprint.
+    """
+    ny, nx = shape
+    y, x = np.meshgrid(
+        np.linspace(0, ny - 1, _FINGERPRINT_SAMPLES),
+        np.linspace(0, nx - 1, _FINGERPRINT_SAMPLES),
+        indexing="ij",
+    )
+    world = np.asarray(wcs(x, y, with_bounding_box=False), dtype=np.float64)
+    digest = hashlib.sha256(world.tobytes())
+    digest.update(np.asarray(shape, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+class PixmapCache:
+    """
+    Cache of the pixel maps between input and output WCS.
+
+    Outlier detection resamples each exposure to the median frame and later
+    blots the median back, which needs the same map from every input pixel
+    to the output frame.  When the cache is enabled, `ResampleData
+    <romancal.resample.resample.ResampleData>` stores each map it computed,
+    keyed on the fingerprints of the two WCS, the input shape and the
+    interpolation parameters, and the blot takes it out of the cache instead
+    of computing it again.
+
+    The maps are kept in memory up to a total size, further maps are
+    written to ``.npy`` files in a temporary directory and memory mapped
+    when they are taken, see `enable`.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.max_bytes = 0
+        self.nbytes = 0
+        self._pixmaps = {}
+        self._tmpdir = None
+        self._nfiles = 0
+        self.hits = 0
+        self.misses = 0
+
+    @contextlib.contextmanager
+    def enable(self, max_bytes=PIXMAP_CACHE_SIZE, on_disk=False):
+        """
+        Enable the cache for the duration of a ``with`` block.
+
+        The cache is cleared, and any files removed, at the end of the
+        block.  Nested calls leave the cache as set up by the outer one.
+
+        Parameters
+        ----------
+        max_bytes : int
+            The maximum total size, in bytes, of the maps kept in memory.
+
+        on_disk : bool
+            If `True`, keep all maps in files.
+        """
+        if self.enabled:
+            yield self
+            return
+
+        self.max_bytes = 0 if on_disk else max_bytes
+        self.enabled = True
+        try:
+            yield self
+        finally:
+            log.info("Pixel map cache: %d reused, %d computed", self.hits, self.misses)
+            self.clear()
+            self.enabled = False
+
+    @staticmethod
+    def _key(in_wcs, out_wcs, shape, stepsize, order):
+        return (
+            wcs_fingerprint(in_wcs, shape),
+            wcs_fingerprint(out_wcs, out_wcs.array_shape or shape),
+            tuple(shape),
+            stepsize,
+            order,
+        )
+
+    def store(self, pixmap, in_wcs, out_wcs, shape, stepsize=1, order=1):
+        """
+        Keep a computed pixel map, if the cache is enabled.
+
+        The cache takes over the map, it must not be modified afterwards.
+
+        Parameters
+        ----------
+        pixmap : numpy.ndarray
+            The pixel map.
+
+        in_wcs, out_wcs, shape, stepsize, order
+            The parameters of `stcal.resample.utils.calc_pixmap` that
+            computed the map.
+        """
+        if not self.enabled:
+            return
+
+        key = self._key(in_wcs, out_wcs, shape, stepsize, order)
+        if key in self._pixmaps:
+            return
+
+        if self.nbytes + pixmap.nbytes <= self.max_bytes:
+            self.nbytes += pixmap.nbytes
+            self._pixmaps[key] = pixmap
+            return
+
+        if self._tmpdir is None:
+            self._tmpdir = tempfile.TemporaryDirectory()
+        filename = os.path.join(self._tmpdir.name, f"pixmap_{self._nfiles}.npy")
+        self._nfiles += 1
+        np.save(filename, pixmap)
+        self._pixmaps[key] = filename
+
+    def pop(self, in_wcs, out_wcs, shape, stepsize=1, order=1):
+        """
+        Take a pixel map out of the cache, or compute it.
+
+        Parameters are those of `stcal.resample.utils.calc_pixmap`.
+
+        Returns
+        -------
+        pixmap : numpy.ndarray
+            The pixel map, which the caller may modify.  Maps kept in a file
+            are memory mapped copy-on-write, so they are not read in full.
+        """
+        if self.enabled:
+            key = self._key(in_wcs, out_wcs, shape, stepsize, order)
+            if key in self._pixmaps:
+                self.hits += 1
+                pixmap = self._pixmaps.pop(key)
+                if isinstance(pixmap, str):
+                    return np.load(pixmap, mmap_mode="c")
+                self.nbytes -= pixmap.nbytes
+                return pixmap
+            self.misses += 1
+        return calc_pixmap(in_wcs, out_wcs, shape, stepsize=stepsize, order=order)
+
+    def clear(self):
+        """Remove all maps from the cache and reset the statistics."""
+        self._pixmaps.clear()
+        self.nbytes = 0
+        if self._tmpdir is not None:
+            self._tmpdir.cleanup()
+            self._tmpdir = None
+        self._nfiles = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        Cache statistics.
+
+        Returns
+        -------
+        dict
+            The number of hits and misses along with the number of cached
+            maps and the size of those kept in memory.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "pixmaps": len(self._pixmaps),
+            "nbytes": self.nbytes,
+        }
+
+    def __len__(self):
+        return len(self._pixmaps)
+
+
+PIXMAP_CACHE = PixmapCache()
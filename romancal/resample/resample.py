@@ -10,6 +10,7 @@ from romancal.lib.basic_utils import compute_var_rnoise
 from .exptime_resampler import ExptimeResampler
 from .l3_wcs import assign_l3_wcs
 from .meta_blender import MetaBlender
+from .pixmap_cache import PIXMAP_CACHE
 from .resample_utils import compute_var_sky, make_output_wcs
 
 log = logging.getLogger(__name__)
@@ -249,6 +250,16 @@ class ResampleData(Resample):
         ymin,
         ymax,
     ):
+        # keep the map for blotting from the same output WCS, such as
+        # blotting the outlier detection median
+        PIXMAP_CACHE.store(
+            pixmap,
+            model["wcs"],
+            self.output_wcs,
+            model["data"].shape,
+            stepsize=self.pixmap_stepsize,
+            order=self.pixmap_order,
+        )
         if self.compute_exptime:
             if not hasattr(self, "_exptime_resampler"):
                 self._exptime_resampler = ExptimeResampler(
@@ -0,0 +1,118 @@
+import copy
+import os
+
+import numpy as np
+import pytest
+from astropy.modeling.models import Shift
+from stcal.resample.utils import calc_pixmap
+
+from romancal.datamodels import ModelLibrary
+from romancal.outlier_detection import OutlierDetectionStep
+from romancal.resample.pixmap_cache import PIXMAP_CACHE, PixmapCache
+
+
+def shift_wcs(image, shift):
+    """Shift the WCS of an image along x, like a tweakreg correction"""
+    bounding_box = image.meta.wcs.bounding_box
+    image.meta.wcs.insert_transform("detector", Shift(shift) & Shift(0), after=True)
+    image.meta.wcs.bounding_box = bounding_box
+
+
+@pytest.fixture
+def wcs_pair(base_image):
+    image = base_image()
+    shifted = base_image()
+    shift_wcs(shifted, 5)
+    return image.meta.wcs, shifted.meta.wcs, image.data.shape
+
+
+def test_disabled(wcs_pair):
+    cache = PixmapCache()
+    in_wcs, out_wcs, shape = wcs_pair
+    expected = calc_pixmap(in_wcs, out_wcs, shape)
+
+    cache.store(expected, in_wcs, out_wcs, shape)
+    pixmap = cache.pop(in_wcs, out_wcs, shape)
+
+    np.testing.assert_array_equal(pixmap, expected)
+    assert pixmap is not expected
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 0
+
+
+@pytest.mark.parametrize(
+    "max_bytes, on_disk",
+    [(1 << 30, False), (1 << 30, True), (0, False)],
+    ids=["memory", "on_disk", "spilled"],
+)
+def test_hits_and_misses(wcs_pair, max_bytes, on_disk):
+    cache = PixmapCache()
+    in_wcs, out_wcs, shape = wcs_pair
+    expected = calc_pixmap(in_wcs, out_wcs, shape, stepsize=10, order=3)
+    in_memory = max_bytes > 0 and not on_disk
+
+    with cache.enable(max_bytes=max_bytes, on_disk=on_disk):
+        cache.store(expected, in_wcs, out_wcs, shape, stepsize=10, order=3)
+        assert cache.stats()["nbytes"] == (expected.nbytes if in_memory else 0)
+        if not in_memory:
+            directory = cache._tmpdir.name
+            assert os.listdir(directory)
+
+        # an equal WCS gives the same map, which is taken out of the cache
+        pixmap = cache.pop(copy.deepcopy(in_wcs), out_wcs, shape, stepsize=10, order=3)
+        np.testing.assert_array_equal(pixmap, expected)
+        assert (pixmap is expected) == in_memory
+        assert isinstance(pixmap, np.memmap) != in_memory
+        assert pixmap.flags.writeable
+        assert len(cache) == 0
+        assert cache.stats()["nbytes"] == 0
+
+        # other parameters, or another WCS, are computed
+        cache.store(expected, in_wcs, out_wcs, shape, stepsize=10, order=3)
+        cache.pop(in_wcs, out_wcs, shape, stepsize=1, order=1)
+        cache.pop(out_wcs, out_wcs, shape, stepsize=10, order=3)
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 2
+        assert cache.stats()["pixmaps"] == 1
+
+    assert len(cache) == 0
+    assert not cache.enabled
+    if not in_memory:
+        assert not os.path.exists(directory)
+
+
+def test_outlier_detection_and_resample(base_image):
+    """Outlier detection computes the map of each image once and gives the
+    same results as without the cache."""
+    images = []
+    for i in range(3):
+        image = base_image()
+        shift_wcs(image, i * 10)
+        image.err[:] = 1
+        image.meta.filename = f"img{i}_cal.asdf"
+        image.meta.observation.observation_id = str(i)
+        image.meta.background.level = 0
+        images.append(image)
+    images[0].data[40, 50] = 1000
+
+    def run():
+        library = ModelLibrary([image.copy() for image in images])
+        library = OutlierDetectionStep.call(library, resample_on_skycell=False)
+        dqs = []
+        with library:
+            for i, model in enumerate(library):
+                dqs.append(model.dq.copy())
+                library.shelve(model, i, modify=False)
+        return dqs
+
+    expected_dqs = run()
+    with PIXMAP_CACHE.enable():
+        dqs = run()
+        stats = PIXMAP_CACHE.stats()
+
+    assert stats["misses"] == 0
+    assert stats["hits"] == len(images)
+    assert stats["pixmaps"] == 0
+    for dq, expected_dq in zip(dqs, expected_dqs, strict=True):
+        np.testing.assert_array_equal(dq, expected_dq)
+    assert np.any(expected_dqs[0])
@@ -14,6 +14,7 @@ from romancal.assign_wcs.utils import add_s_region
 from romancal.datamodels import ModelLibrary
 from romancal.lib.tests.helpers import word_precision_check
 from romancal.resample import ResampleStep, resample_utils
+from romancal.resample.exptime_resampler import ExptimeResampler
 
 
 class WfiSca:
@@ -628,3 +629,39 @@ def test_resample_pixel_scale_units(wfi_sca1):
     coords = output_model.meta.wcs.pixel_to_world((100, 100), (100, 101))
     pscale = coords[0].separation(coords[1]).to(u.arcsec).value
     np.testing.assert_allclose(pscale, pixel_scale)
+
+
+@pytest.mark.parametrize("kernel", ["square", "point", "gaussian", "lanczos3"])
+def test_exptime_resampler_footprint(kernel):
+    """
+    Test that accumulating only the footprint of each image gives the same
+    exposure time as resampling every image separately.
+    """
+    rng = np.random.default_rng(42)
+    out_shape = (200, 200)
+    resampler = ExptimeResampler(None, out_shape, 0, kernel)
+    expected = np.zeros(out_shape, dtype="f4")
+    y, x = np.indices((50, 50), dtype=float)
+    for angle, exptime in zip([0.2, 1.0, 2.5], [100.0, 50.0, 25.0], strict=True):
+        pixmap = np.dstack(
+            [
+                np.cos(angle) * x - np.sin(angle) * y + rng.uniform(60, 140),
+                np.sin(angle) * x + np.cos(angle) * y + rng.uniform(60, 140),
+            ]
+        )
+        model = {
+            "data": np.ones((50, 50), dtype="f4"),
+            "dq": (rng.random((50, 50)) < 0.1).astype("u4"),
+            "effective_exposure_time": exptime,
+        }
+        resampler.add_image(model, pixmap, 1.0, 0, 49, 0, 49)
+
+        single = ExptimeResampler(None, out_shape, 0, kernel)
+        single.add_image(model, pixmap, 1.0, 0, 49, 0, 49)
+        expected += single.finalize()
+
+        # the region drizzled to is reset for the next image
+        assert not np.any(resampler.out_img)
+        assert not np.any(resampler.out_wht)
+
+    np.testing.assert_array_equal(resampler.finalize(), expected)
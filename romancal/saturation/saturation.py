@@ -6,13 +6,15 @@ import numpy as np
 from roman_datamodels.dqflags import pixel
 from stcal.saturation.saturation import flag_saturated_pixels
 
+from romancal.lib.basic_utils import row_bands
+
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
 ATOD_LIMIT = 65535.0  # Hard DN limit of 16-bit A-to-D converter
 
 
-def flag_saturation(input_model, ref_model):
+def flag_saturation(input_model, ref_model, rows_per_band=None):
     """
     Short Summary
     -------------
@@ -26,6 +28,13 @@ def flag_saturation(input_model, ref_model):
     ref_model : `~roman_datamodels.datamodels.SaturationRefModel`
         Saturation reference file data model
 
+    rows_per_band : int or None
+        If given, flag the data in bands of at most this many rows so that
+        only a band of the reference arrays (and of the temporary arrays)
+        is held in memory at a time.  The saturation flagging does not grow
+        the flags into neighboring pixels, so the result does not depend on
+        the banding.
+
     Returns
     -------
     output_model : `~roman_datamodels.datamodels.RampModel`
@@ -33,36 +42,42 @@ def flag_saturation(input_model, ref_model):
         the GROUPDQ array
         The input model is modified in place and returned as the output model.
     """
+    nrows = input_model.data.shape[-2]
+    read_pattern = input_model.meta.exposure.read_pattern
+
+    for band in row_bands(nrows, rows_per_band):
+        # stcal expects an integrations axis; these are views of the model
+        # arrays, so groupdq is flagged in place.
+        data = input_model.data[np.newaxis, :, band]
+        gdq = input_model.groupdq[np.newaxis, :, band]
+        pdq = input_model.pixeldq[np.newaxis, band]
+
+        # stcal modifies the reference arrays, so copy them from the
+        # reference file
+        sat_thresh = np.array(ref_model.data[band])
+        sat_dq = np.array(ref_model.dq[band])
+
+        # Obtain dq arrays updated for saturation
+        # The third variable is the processed ZEROFRAME, which is not
+        # used in romancal, so is always None.
+        gdq_new, pdq_new, _ = flag_saturated_pixels(
+            data,
+            gdq,
+            pdq,
+            sat_thresh,
+            sat_dq,
+            ATOD_LIMIT,
+            pixel,
+            n_pix_grow_sat=0,
+            read_pattern=read_pattern,
+        )
+
+        # Save the flags in the output GROUPDQ array, unless they were
+        # already set through the view
+        if gdq_new is not gdq:
+            input_model.groupdq[:, band] = gdq_new[0, :]
 
-    data = input_model.data[np.newaxis, :]
-
-    # Modify input_model in place.
-    gdq = input_model.groupdq[np.newaxis, :]
-    pdq = input_model.pixeldq[np.newaxis, :]
-
-    # Copy information from saturation reference file
-    sat_thresh = ref_model.data.copy()
-    sat_dq = ref_model.dq.copy()
-
-    # Obtain dq arrays updated for saturation
-    # The third variable is the processed ZEROFRAME, which is not
-    # used in romancal, so is always None.
-    gdq_new, pdq_new, _ = flag_saturated_pixels(
-        data,
-        gdq,
-        pdq,
-        sat_thresh,
-        sat_dq,
-        ATOD_LIMIT,
-        pixel,
-        n_pix_grow_sat=0,
-        read_pattern=input_model.meta.exposure.read_pattern,
-    )
-
-    # Save the flags in the output GROUPDQ array
-    input_model.groupdq = gdq_new[0, :]
-
-    # Save the NO_SAT_CHECK flags in the output PIXELDQ array
-    input_model.pixeldq = pdq_new[0, :]
+        # Save the NO_SAT_CHECK flags in the output PIXELDQ array
+        input_model.pixeldq[band] = pdq_new[0, :]
 
     return input_model
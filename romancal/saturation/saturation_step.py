@@ -4,8 +4,6 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
-from roman_datamodels.datamodels import SaturationRefModel
-
 from romancal.datamodels.fileio import open_dataset
 from romancal.saturation import saturation
 from romancal.stpipe import RomanStep
@@ -25,6 +23,10 @@ class SaturationStep(RomanStep):
 
     class_alias = "saturation"
 
+    spec = """
+        rows_per_band = integer(default=None, min=1) # Process the ramp in bands of this many rows to limit memory use
+    """
+
     reference_file_types: ClassVar = ["saturation"]
 
     def process(self, dataset):
@@ -43,9 +45,12 @@ class SaturationStep(RomanStep):
         # Open the reference file data model
         # Test for reference file
         log.info("Using SATURATION reference file: %s", self.ref_name)
-        with SaturationRefModel(self.ref_name) as ref_model:
+        # When processing in bands, memory map the reference file so that only
+        # the rows of each band are read
+        memmap = self.rows_per_band is not None
+        with self.open_reference_model(self.ref_name, memmap=memmap) as ref_model:
             # Perform saturation check
-            saturation.flag_saturation(input_model, ref_model)
+            saturation.flag_saturation(input_model, ref_model, self.rows_per_band)
 
         input_model.meta.cal_step.saturation = "COMPLETE"
 
@@ -311,6 +311,30 @@ def test_nans_in_mask(setup_wfi_datamodels):
     assert output.pixeldq[5, 5] == pixel.NO_SAT_CHECK
 
 
+def test_rows_per_band(setup_wfi_datamodels):
+    """Check that flagging the data in bands of rows gives the same result."""
+
+    nresultants = 5
+    nrows = 20
+    ncols = 20
+    rng = np.random.default_rng(42)
+
+    ramp, satmap = setup_wfi_datamodels(nresultants, nrows, ncols)
+    ramp.data = np.cumsum(
+        rng.uniform(-100, 30000, (nresultants, nrows, ncols)), axis=0
+    ).astype(ramp.data.dtype)
+    satmap.data[:] = rng.uniform(40000, 80000, (nrows, ncols))
+    satmap.data[5, 5] = np.nan
+    satmap.dq[7, 3] = pixel.NO_SAT_CHECK
+
+    expected = flag_saturation(ramp.copy(), satmap.copy())
+    output = flag_saturation(ramp, satmap, rows_per_band=3)
+
+    np.testing.assert_array_equal(output.groupdq, expected.groupdq)
+    np.testing.assert_array_equal(output.pixeldq, expected.pixeldq)
+    assert np.any(output.groupdq & group.SATURATED)
+
+
 def test_saturation_getbestref(setup_wfi_datamodels):
     """Check that when CRDS returns N/A for the reference file the
     step is skipped"""
@@ -5,15 +5,18 @@ Roman step for sky matching.
 from __future__ import annotations
 
 import logging
-from copy import deepcopy
 from typing import TYPE_CHECKING
 
 import numpy as np
 from astropy.nddata.bitmask import bitfield_to_boolean_mask, interpret_bit_flags
 from roman_datamodels.dqflags import pixel
+from scipy.sparse import coo_array
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import KDTree
 from stcal.skymatch import SkyImage, SkyStats, skymatch
 
 from romancal.datamodels.fileio import open_dataset
+from romancal.skycell.match import ImageFootprint
 from romancal.stpipe import RomanStep
 
 if TYPE_CHECKING:
@@ -71,39 +74,124 @@ class SkyMatchStep(RomanStep):
             binwidth=self.binwidth,
         )
 
-        # create a list of "Sky" Images and/or Groups:
-        images = []
+        do_match = "match" in self.skymethod
+        do_global = "global" in self.skymethod
+
+        # Only one model is borrowed from the library at a time. Each model
+        # has a `_SkyMeasurements` image that keeps its bounding polygon and
+        # sky value between passes, along with the sky statistics measured
+        # while the model was borrowed, which stcal's skymatch then works on.
+        # The sky values skymatch subtracts from the images are only
+        # subtracted from the data in the final pass.
         with library:
-            for model in library:
-                images.append(self._imodel2skyim(model))
-
-            # match/compute sky values:
-            skymatch(
-                images,
-                skymethod=self.skymethod,
-                match_down=self.match_down,
-                subtract=self.subtract,
-            )
+            images, footprints = self._footprints(library)
+
+            if do_match:
+                pairs = _overlap_candidates(footprints)
+                # With subtraction off the global sky is measured on the
+                # unchanged data, so it is measured in the same pass.
+                self._measure_skies(
+                    library, images, pairs=pairs, local=do_global and not self.subtract
+                )
+                _log_overlap_graph(images, pairs)
+                skymatch(
+                    images,
+                    skymethod="match",
+                    match_down=self.match_down,
+                    subtract=self.subtract,
+                )
+
+            if do_global or not do_match:
+                if not do_match or self.subtract:
+                    self._measure_skies(library, images, local=True)
+                # skymatch compares each sky to the smallest one so far, which
+                # fails for an image without a sky after one with a sky, so
+                # those images are passed first and left out of the minimum.
+                skymatch(
+                    sorted(images, key=lambda im: im.local_sky[0] is not None),
+                    skymethod="global" if do_global else "local",
+                    subtract=self.subtract,
+                )
 
             # set sky background value in each image's meta:
-            for im in images:
-                if isinstance(im, SkyImage):
-                    self._set_sky_background(
-                        im, "COMPLETE" if im.is_sky_valid else "SKIPPED"
-                    )
-                else:
-                    for gim in im:
-                        self._set_sky_background(
-                            gim, "COMPLETE" if gim.is_sky_valid else "SKIPPED"
-                        )
-            for index, image in enumerate(images):
-                library.shelve(image.meta["image_model"], index)
+            for index, model in enumerate(library):
+                for sky in images[index].image:
+                    model.data -= sky
+                self._set_sky_background(
+                    model,
+                    images[index],
+                    "COMPLETE" if images[index].is_sky_valid else "SKIPPED",
+                )
+                library.shelve(model, index)
 
         return library
 
-    def _imodel2skyim(self, image_model):
-        input_image_model = image_model
+    def _footprints(self, library):
+        """Create the sky image and footprint of each model"""
+        images = []
+        footprints = []
+        for index, model in enumerate(library):
+            images.append(self._imodel2skyim(model))
+            footprints.append(_footprint(model.meta.wcs, model.data.shape))
+            library.shelve(model, index, modify=False)
+        return images, footprints
+
+    def _measure_skies(self, library, images, pairs=None, local=False):
+        """
+        Measure sky statistics with one model borrowed at a time.
+
+        The statistics are measured on the data with the sky values already
+        subtracted by skymatch removed, and stored in the sky images.
+
+        Parameters
+        ----------
+        library : ModelLibrary
+            The models to measure the statistics of.
+        images : list of _SkyMeasurements
+            The sky images of the models.
+        pairs : np.ndarray or None
+            Pairs of indices of images that may overlap. The sky of both
+            images in each pair is measured in their overlap.
+        local : bool
+            Measure the sky of each image over the whole image.
+        """
+        neighbors = [[] for _ in images]
+        if pairs is not None:
+            for i, j in pairs:
+                neighbors[i].append(j)
+                neighbors[j].append(i)
+
+        for index, model in enumerate(library):
+            image = images[index]
+            data = model.data
+            for sky in image.image:
+                data = data - sky
+            sky_im = SkyImage(
+                image=data,
+                wcs_fwd=model.meta.wcs.forward_transform,
+                wcs_inv=model.meta.wcs.backward_transform,
+                mask=self._dqmask(model),
+                sky_id=image.sky_id,
+                skystat=self._skystat,
+                stepsize=self.stepsize,
+            )
+            for other in neighbors[index]:
+                image.overlap_skies[images[other]] = sky_im.calc_sky(
+                    overlap=images[other], delta=False
+                )
+            if local:
+                image.local_sky = sky_im.calc_sky(delta=False)
+            library.shelve(model, index, modify=False)
+
+    def _dqmask(self, image_model):
+        if self._dqbits is None:
+            return np.isfinite(image_model.data)
+        return bitfield_to_boolean_mask(
+            image_model.dq, self._dqbits, good_mask_value=True, dtype="bool"
+        ) & np.isfinite(image_model.data)
 
+    @staticmethod
+    def _init_background(image_model):
         if "background" not in image_model.meta:
             image_model.meta["background"] = {
                 "level": None,
@@ -111,12 +199,8 @@ class SkyMatchStep(RomanStep):
                 "method": None,
             }
 
-        if self._dqbits is None:
-            dqmask = np.isfinite(image_model.data)
-        else:
-            dqmask = bitfield_to_boolean_mask(
-                image_model.dq, self._dqbits, good_mask_value=True, dtype="bool"
-            ) & np.isfinite(image_model.data)
+    def _imodel2skyim(self, image_model):
+        self._init_background(image_model)
 
         # see if 'skymatch' was previously run and raise an exception
         # if 'subtract' mode has changed compared to the previous pass:
@@ -143,17 +227,14 @@ class SkyMatchStep(RomanStep):
                 f"present in image '{image_model.meta.filename:s}' meta."
             )
 
-        wcs = deepcopy(image_model.meta.wcs)
-
-        sky_im = SkyImage(
+        sky_im = _SkyMeasurements(
             image=image_model.data,
-            wcs_fwd=wcs.forward_transform,
-            wcs_inv=wcs.backward_transform,
-            mask=dqmask,
+            wcs_fwd=image_model.meta.wcs.forward_transform,
+            wcs_inv=image_model.meta.wcs.backward_transform,
+            mask=np.broadcast_to(True, image_model.data.shape),
             sky_id=image_model.meta.filename,  # file name?
             skystat=self._skystat,
             stepsize=self.stepsize,
-            meta={"image_model": input_image_model},
         )
 
         if self.subtract and level is not None:
@@ -161,17 +242,136 @@ class SkyMatchStep(RomanStep):
 
         return sky_im
 
-    def _set_sky_background(self, sky_image, step_status):
-        image = sky_image.meta["image_model"]
+    def _set_sky_background(self, image_model, sky_image, step_status):
         sky = sky_image.sky if sky_image.sky is not None else 0
 
-        image.meta.background.method = str(self.skymethod)
-        image.meta.background.subtracted = self.subtract
+        self._init_background(image_model)
+        image_model.meta.background.method = str(self.skymethod)
+        image_model.meta.background.subtracted = self.subtract
         # In numpy 2, the dtypes are more carefully controlled, so to match the
         # schema the data type needs to be re-cast to float64.
-        image.meta.background.level = sky
+        image_model.meta.background.level = sky
+
+        image_model.meta.cal_step.skymatch = step_status
+
+
+class _SkySubtractions(list):
+    """The sky values subtracted from an image, in order"""
 
-        if step_status == "COMPLETE" and self.subtract:
-            image.data[...] = sky_image.image[...]
+    def __isub__(self, sky):
+        self.append(sky)
+        return self
 
-        image.meta.cal_step.skymatch = step_status
+
+class _SkyMeasurements(SkyImage):
+    """
+    A `SkyImage` holding the sky statistics of an image instead of its data.
+
+    `calc_sky` returns the statistics measured while the model of the image
+    was borrowed, so that `stcal.skymatch.skymatch` can work on all the
+    images without their data in memory. The sky values ``skymatch``
+    subtracts from the image are recorded in ``image``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # only the bounding polygon is needed from the data
+        self.image = _SkySubtractions()
+        self.mask = None
+        self.local_sky = (None, 0, 0.0)
+        self.overlap_skies = {}
+
+    def calc_sky(self, overlap=None, delta=True):
+        if overlap is None:
+            skyval, npix, polyarea = self.local_sky
+        else:
+            skyval, npix, polyarea = self.overlap_skies.get(overlap, (None, 0, 0.0))
+        if delta and skyval is not None:
+            skyval -= self.sky
+        return skyval, npix, polyarea
+
+
+def _footprint(wcs, shape):
+    """The footprint of the corners of an image, as bounded by `SkyImage`"""
+    ny, nx = shape
+    x = np.array([-0.5, nx - 0.5, nx - 0.5, -0.5])
+    y = np.array([-0.5, -0.5, ny - 0.5, ny - 0.5])
+    return ImageFootprint(np.stack(wcs(x, y, with_bounding_box=False), axis=1))
+
+
+def _overlap_candidates(footprints):
+    """
+    Find the pairs of images whose footprints may overlap.
+
+    As is done for sky cells in `romancal.skycell.match`, the footprint
+    centers are indexed in a k-d tree to find the nearby footprints. Each
+    footprint lies within the sphere around its center that passes through
+    its farthest vertex, so images whose spheres do not intersect cannot
+    overlap.
+
+    Parameters
+    ----------
+    footprints : list of ImageFootprint
+        The footprints of the images.
+
+    Returns
+    -------
+    pairs : np.ndarray
+        Sorted ``(i, j)`` index pairs, with ``i < j``, of the images whose
+        footprints may intersect.
+    """
+    centers = np.array([footprint.vectorpoint_center for footprint in footprints])
+    radii = np.array(
+        [
+            np.max(
+                np.linalg.norm(
+                    footprint.vectorpoint_vertices - footprint.vectorpoint_center,
+                    axis=1,
+                )
+            )
+            for footprint in footprints
+        ]
+    )
+
+    # pad the search radius, as is done for sky cells, so the pruning never
+    # drops an overlap because of rounding or the distortion of the edges
+    pairs = KDTree(centers).query_pairs(
+        r=2 * np.max(radii) * 1.1, output_type="ndarray"
+    )
+    distances = np.linalg.norm(centers[pairs[:, 0]] - centers[pairs[:, 1]], axis=1)
+    pairs = pairs[distances <= (radii[pairs[:, 0]] + radii[pairs[:, 1]]) * 1.1]
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def _log_overlap_graph(images, pairs):
+    """Log statistics of the graph of images connected by their overlaps"""
+    nimages = len(images)
+
+    # the pairs skymatch uses, with a sky and weight measured in both images
+    def measured(image, other):
+        skyval, npix, polyarea = image.calc_sky(overlap=other, delta=False)
+        return skyval is not None and polyarea != 0.0 and npix > 0
+
+    overlaps = np.array(
+        [
+            (i, j)
+            for i, j in pairs
+            if measured(images[i], images[j]) and measured(images[j], images[i])
+        ],
+        dtype=int,
+    ).reshape(-1, 2)
+    graph = coo_array(
+        (np.ones(len(overlaps)), (overlaps[:, 0], overlaps[:, 1])),
+        shape=(nimages, nimages),
+    )
+    ngroups, labels = connected_components(graph, directed=False)
+    nisolated = np.count_nonzero(np.bincount(labels) == 1)
+    log.info(
+        f"Overlap graph: {nimages} images, {len(pairs)} of "
+        f"{nimages * (nimages - 1) // 2} image pairs compared, "
+        f"{len(overlaps)} overlapping pairs"
+    )
+    log.info(
+        f"Overlap graph: {ngroups} connected groups of images, "
+        f"{nisolated} images without overlaps"
+    )
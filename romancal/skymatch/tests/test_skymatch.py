@@ -9,9 +9,11 @@ from gwcs import coordinate_frames as cf
 from gwcs import wcs as gwcs_wcs
 from roman_datamodels.datamodels import ImageModel
 from roman_datamodels.dqflags import pixel
+from stcal.skymatch import SkyImage, SkyStats
 
 from romancal.datamodels import ModelLibrary
 from romancal.skymatch import SkyMatchStep
+from romancal.skymatch.skymatch_step import _footprint, _overlap_candidates
 
 
 def mk_gwcs(shape, sky_offset=[0, 0] * u.arcsec, rotate=0 * u.deg):
@@ -447,3 +449,87 @@ def test_skymatch_always_returns_modellibrary_with_updated_datamodels(
             assert model.meta.cal_step.skymatch == "COMPLETE"
             assert hasattr(model.meta, "background")
             res.shelve(model, i, modify=False)
+
+
+@pytest.mark.parametrize("subtract", [False, True])
+def test_skymatch_on_disk(
+    mk_sky_match_image_models, create_mock_asn_file, subtract, tmp_path
+):
+    """Test that an on_disk library gives the same result as one in memory"""
+    models, _ = mk_sky_match_image_models
+    members = []
+    levels = [0.3, 0.5, 0.2, 0.7, 0.4]
+    for i, (model, level) in enumerate(zip(models, levels, strict=True)):
+        model.data += level
+        model.meta.filename = f"im{i}.asdf"
+        model.save(tmp_path / model.meta.filename)
+        members.append({"expname": model.meta.filename, "exptype": "science"})
+    asn_file = create_mock_asn_file(tmp_path, members_mapping=members)
+
+    kwargs = {"skymethod": "global+match", "subtract": subtract}
+    results = [
+        SkyMatchStep.call(ModelLibrary(asn_file), **kwargs),
+        SkyMatchStep.call(
+            ModelLibrary(asn_file, on_disk=True, temp_directory=tmp_path), **kwargs
+        ),
+    ]
+
+    with results[0], results[1]:
+        for i, (in_memory, on_disk) in enumerate(zip(*results, strict=True)):
+            assert on_disk.meta.background.level == in_memory.meta.background.level
+            assert on_disk.meta.cal_step.skymatch == "COMPLETE"
+            np.testing.assert_array_equal(on_disk.data, in_memory.data)
+            results[0].shelve(in_memory, i, modify=False)
+            results[1].shelve(on_disk, i, modify=False)
+
+
+def test_skymatch_global_skips_unmeasured(mk_sky_match_image_models):
+    """Test that images without a valid sky do not set the global sky"""
+    models, _ = mk_sky_match_image_models
+    for model, level in zip(models, [0.3, 0.5, 0.2, 0.7, 0.4], strict=True):
+        model.data += level
+
+    # images with a sky below the lower limit have no valid pixels
+    result = SkyMatchStep.call(
+        ModelLibrary(models), skymethod="global", skystat="median", lower=0.35
+    )
+
+    with result:
+        for i, model in enumerate(result):
+            assert abs(model.meta.background.level - 0.4) < 0.01
+            assert model.meta.cal_step.skymatch == "COMPLETE"
+            result.shelve(model, i, modify=False)
+
+
+def test_overlap_candidates():
+    """Test that pruning the image pairs keeps every overlapping pair"""
+    # a 4x4 grid of images spaced by ~0.8 of an image width, so only
+    # neighboring images overlap, plus one rotated image in the middle
+    offsets = [[x, y] * u.arcsec for x in range(0, 36, 9) for y in range(0, 36, 9)]
+    models = [mk_image_model(sky_offset=offset) for offset in offsets]
+    models.append(mk_image_model(sky_offset=[13, 13] * u.arcsec, rotation=45 * u.deg))
+    images = [
+        SkyImage(
+            image=model.data,
+            wcs_fwd=model.meta.wcs.forward_transform,
+            wcs_inv=model.meta.wcs.backward_transform,
+            mask=np.ones(model.data.shape, dtype=bool),
+            skystat=SkyStats(),
+        )
+        for model in models
+    ]
+
+    pairs = _overlap_candidates(
+        [_footprint(model.meta.wcs, model.data.shape) for model in models]
+    )
+
+    overlapping = {
+        (i, j)
+        for i in range(len(images))
+        for j in range(i + 1, len(images))
+        if images[i].intersection(images[j]).area() > 0
+    }
+    candidates = {tuple(pair) for pair in pairs}
+    assert overlapping <= candidates
+    assert len(candidates) < 2 * len(overlapping)
+    assert np.all(pairs[:, 0] < pairs[:, 1])
@@ -6,9 +6,7 @@ import warnings
 
 import numpy as np
 from astropy import units as u
-from astropy.stats import SigmaClip
 from astropy.utils.decorators import lazyproperty
-from astropy.utils.exceptions import AstropyUserWarning
 from photutils.aperture import CircularAnnulus, CircularAperture, aperture_photometry
 
 
@@ -67,34 +65,25 @@ class ApertureCatalog:
             self.aperture_radii["annulus_pix"][1],
         )
         bkg_aper_masks = bkg_aper.to_mask(method="center")
-        sigclip = SigmaClip(sigma=3.0)
+
+        # gather the annulus pixels of all sources into one array
+        data = self.model.data
+        unit = data.unit
+        bkg_values = [mask.get_values(data.value) for mask in bkg_aper_masks]
+        nvalues = np.array([values.size for values in bkg_values], dtype=np.intp)
+        offsets = np.concatenate(([0], np.cumsum(nvalues)))
+        bkg_values = np.concatenate(bkg_values) if bkg_values else np.empty(0)
 
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", category=RuntimeWarning)
-            warnings.simplefilter("ignore", category=AstropyUserWarning)
-
-            unit = self.model.data.unit
-            nvalues = []
-            bkg_median = []
-            bkg_std = []
-            for mask in bkg_aper_masks:
-                bkg_data = mask.get_values(self.model.data)
-                values = sigclip(bkg_data, masked=False)
-                nvalues.append(values.size)
-                med = np.median(values)
-                std = np.std(values)
-                if values.size == 0:
-                    # handle case where source is completely masked due to
-                    # forced photometry
-                    med <<= unit
-                    std <<= unit
-                bkg_median.append(med)
-                bkg_std.append(std)
-
-            nvalues = np.array(nvalues)
+
+            bkg_median, bkg_std, nvalues = _sigma_clipped_stats(
+                bkg_values, offsets, sigma=3.0
+            )
+
             pixel_area = self.pixel_scale**2
-            bkg_median = u.Quantity(bkg_median) / pixel_area
-            bkg_std = u.Quantity(bkg_std) / pixel_area
+            bkg_median = (bkg_median << unit) / pixel_area
+            bkg_std = (bkg_std << unit) / pixel_area
 
             # standard error of the median
             bkg_median_err = np.sqrt(np.pi / (2.0 * nvalues)) * bkg_std
@@ -193,3 +182,111 @@ class ApertureCatalog:
             self.names.append(flux_err_col)
 
         self.calc_ee_fractions()
+
+
+def _sigma_clipped_stats(values, offsets, sigma=3.0, maxiters=5):
+    """
+    Sigma-clipped median and standard deviation of segments of an array.
+
+    The values of segment ``i`` are ``values[offsets[i]:offsets[i + 1]]``.
+    Each segment is clipped as by `~astropy.stats.SigmaClip` with the
+    default median and standard deviation functions, and the median and
+    standard deviation of the values left are returned.  The results are
+    identical to clipping each segment separately.
+
+    The segments are clipped together.  Segments with the same number of
+    values are stacked and reduced along the rows of a 2D array, which
+    gives the same result as reducing each segment on its own.
+
+    Parameters
+    ----------
+    values : 1D `~numpy.ndarray`
+        The values of all the segments.
+
+    offsets : 1D `~numpy.ndarray`
+        The start of each segment in ``values``, followed by the end of
+        the last one.
+
+    sigma : float
+        The number of standard deviations of the lower and upper clipping
+        limits.
+
+    maxiters : int
+        The maximum number of clipping iterations.
+
+    Returns
+    -------
+    median, std : 1D `~numpy.ndarray`
+        The median and standard deviation of the clipped values of each
+        segment, NaN for segments without finite values.
+
+    nvalues : 1D `~numpy.ndarray`
+        The number of clipped values of each segment.
+    """
+    nvalues = np.diff(offsets)
+
+    # non-finite values are always clipped
+    finite = np.isfinite(values)
+    if not np.all(finite):
+        nvalues = _segment_count(finite, offsets)
+        values = values[finite]
+
+    active = np.ones(nvalues.size, dtype=bool)
+    for _ in range(maxiters):
+        index = np.flatnonzero(active)
+        if index.size == 0:
+            break
+        center, std = _segment_median_std(values, nvalues, index)
+        lower = np.full(nvalues.size, -np.inf)
+        upper = np.full(nvalues.size, np.inf)
+        lower[index] = center - std * sigma
+        upper[index] = center + std * sigma
+
+        keep = (values >= np.repeat(lower, nvalues)) & (
+            values <= np.repeat(upper, nvalues)
+        )
+        if np.all(keep):
+            break
+        offsets = np.concatenate(([0], np.cumsum(nvalues)))
+        clipped_nvalues = _segment_count(keep, offsets)
+        values = values[keep]
+
+        # stop clipping segments that did not change
+        active &= clipped_nvalues != nvalues
+        nvalues = clipped_nvalues
+
+    median, std = _segment_median_std(values, nvalues, np.arange(nvalues.size))
+    return median, std, nvalues
+
+
+def _segment_count(mask, offsets):
+    """Number of True elements of ``mask`` in each segment."""
+    total = np.concatenate(([0], np.cumsum(mask)))
+    return total[offsets[1:]] - total[offsets[:-1]]
+
+
+def _segment_median_std(values, nvalues, index, max_block_size=2**22):
+    """
+    Median and standard deviation of the selected segments of an array.
+
+    The segments are consecutive in ``values`` and have ``nvalues`` values
+    each.  The result for segment ``index[i]`` is in element ``i``, NaN for
+    empty segments.  At most ``max_block_size`` values are stacked at once.
+    """
+    offsets = np.concatenate(([0], np.cumsum(nvalues)))
+    median = np.full(index.size, np.nan)
+    std = np.full(index.size, np.nan)
+
+    selected_nvalues = nvalues[index]
+    for size in np.unique(selected_nvalues):
+        if size == 0:
+            continue
+        rows = np.flatnonzero(selected_nvalues == size)
+        step = max(max_block_size // size, 1)
+        for start in range(0, rows.size, step):
+            block_rows = rows[start : start + step]
+            block = values[offsets[index[block_rows], np.newaxis] + np.arange(size)]
+            median[block_rows] = np.median(block, axis=1)
+            std[block_rows] = np.std(block, axis=1)
+
+    return median, std
@@ -3,14 +3,16 @@ Module to calculate PSF photometry.
 """
 
 import logging
+import multiprocessing
 from collections import OrderedDict
+from multiprocessing import cpu_count, shared_memory
 
 import astropy.units as u
 import numpy as np
 from astropy.convolution import Box2DKernel, convolve
 from astropy.modeling.fitting import LevMarLSQFitter
 from astropy.nddata import NDData
-from astropy.table import Table
+from astropy.table import Table, vstack
 from astropy.utils import lazyproperty
 from numpy import fft
 from photutils.background import LocalBackground
@@ -23,6 +25,10 @@ from photutils.psf import (
     SourceGrouper,
 )
 from scipy.ndimage import map_coordinates
+from scipy.sparse import coo_array
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import KDTree
+from stcal.multiprocessing import compute_num_cores
 
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
@@ -274,13 +280,6 @@ def get_gridded_psf_model(psf_ref_model, focus=0, spectral_type=1):
     # select the infocus images (0) and we have a selection of spectral types
     # A0V, G2V, and M6V, pick G2V (1)
     psf_images = psf_ref_model.psf[focus, spectral_type, :, :, :].copy()
-    # get the central position of the cutouts in a list
-    psf_positions_x = psf_ref_model.meta.pixel_x
-    psf_positions_y = psf_ref_model.meta.pixel_y
-    meta = OrderedDict()
-    position_list = []
-    for index in range(len(psf_positions_x)):
-        position_list.append([psf_positions_x[index], psf_positions_y[index]])
 
     # integrate over the native pixel scale
     oversample = psf_ref_model.meta.oversample
@@ -290,9 +289,34 @@ def get_gridded_psf_model(psf_ref_model, focus=0, spectral_type=1):
         im = convolve(psf, pixel_response_kernel) * oversample**2
         psf_images[i, :, :] = im
 
-    meta["grid_xypos"] = position_list
-    meta["oversampling"] = oversample
-    nd = NDData(psf_images, meta=meta)
+    return _make_gridded_psf_model(psf_images, psf_ref_model.meta)
+
+
+def _make_gridded_psf_model(psf_images, meta):
+    """Gridded PSF model of PSF images at the positions of a reference file.
+
+    Parameters
+    ----------
+    psf_images : np.ndarray
+        The PSF images, already integrated over the native pixel scale.
+    meta : dict-like
+        The metadata of the PSF reference model.
+
+    Returns
+    -------
+    photutils.psf.GriddedPSFModel
+    """
+    # get the central position of the cutouts in a list
+    psf_positions_x = meta.pixel_x
+    psf_positions_y = meta.pixel_y
+    grid_meta = OrderedDict()
+    position_list = []
+    for index in range(len(psf_positions_x)):
+        position_list.append([psf_positions_x[index], psf_positions_y[index]])
+
+    grid_meta["grid_xypos"] = position_list
+    grid_meta["oversampling"] = meta.oversample
+    nd = NDData(psf_images, meta=grid_meta)
     model = GriddedPSFModel(nd)
 
     return model
@@ -517,6 +541,7 @@ def create_l3_psf_model(
     pixfrac=1.0,
     pixel_scale=0.11,
     oversample=None,
+    gridpsf=None,
 ):
     """
     Compute a PSF model for an L3 image.
@@ -545,6 +570,9 @@ def create_l3_psf_model(
         Often similar to the default detector scale of 0.11 arcsec.
     oversample : int, optional
         Oversample factor, default uses gridpsf oversampling
+    gridpsf : photutils.psf.GriddedPSFModel, optional
+        Gridded PSF model of the detector, by default made from
+        ``psf_ref_model`` with `get_gridded_psf_model`
 
     Returns
     -------
@@ -552,7 +580,8 @@ def create_l3_psf_model(
         PSF model.
 
     """
-    gridpsf = get_gridded_psf_model(psf_ref_model)  # 361x361, 4x oversampled
+    if gridpsf is None:
+        gridpsf = get_gridded_psf_model(psf_ref_model)  # 361x361, 4x oversampled
     # this already includes integration over the native pixel scale
     center = 2044  # Roman SCA center pixel
     oversample = oversample if oversample is not None else gridpsf.oversampling[0]
@@ -600,6 +629,8 @@ def fit_psf_to_image_model(
     error_lower_limit=None,
     fit_shape=(15, 15),
     exclude_out_of_bounds=True,
+    tile_size=None,
+    maximum_cores="1",
 ):
     """
     Fit PSF models to an ``ImageModel``.
@@ -655,6 +686,13 @@ def fit_psf_to_image_model(
     exclude_out_of_bounds : bool, optional
         If `True`, do not attempt to fit stars which have initial centroids
         that fall outside the pixel limits of the SCA. Default is False.
+    tile_size : int, optional
+        If given, fit the sources in square tiles of this many pixels on
+        a side, see `fit_psf_tiles`. Requires ``x_init`` and ``y_init``
+        and `photutils.psf.PSFPhotometry`.
+    maximum_cores : str, optional
+        The number of processes fitting the tiles: an integer, 'half',
+        'quarter' or 'all'. Default is '1'.
 
     Returns
     -------
@@ -662,8 +700,16 @@ def fit_psf_to_image_model(
         PSF photometry results.
     photometry : instance of class ``photutils_cls``
         PSF photometry instance with configuration settings and results.
+        When fitting in tiles, it holds only the configuration.
 
     """
+    if tile_size is not None and (
+        photometry_cls is not PSFPhotometry or x_init is None or y_init is None
+    ):
+        raise ValueError(
+            "Tiled PSF fitting requires initial source positions and PSFPhotometry."
+        )
+
     if grouper is None:
         # minimum separation before sources are fit simultaneously:
         grouper = SourceGrouper(min_separation=5)  # [pix]
@@ -740,12 +786,244 @@ def fit_psf_to_image_model(
         guesses = guesses[init_centroid_in_range]
 
     # fit the model PSF to the data:
-    results_table = photometry(data=data, error=error, init_params=guesses, mask=mask)
+    if tile_size is not None and len(guesses) > 0:
+        results_table = fit_psf_tiles(
+            data,
+            error,
+            guesses,
+            mask=mask,
+            tile_size=tile_size,
+            maximum_cores=maximum_cores,
+            grouper=grouper,
+            localbkg_estimator=localbkg_estimator,
+            psf_model=psf_model,
+            fitter=fitter,
+            fit_shape=fit_shape,
+            aperture_radius=fit_shape[0],
+            progress_bar=progress_bar,
+            **psf_photometry_kwargs,
+        )
+    else:
+        results_table = photometry(
+            data=data, error=error, init_params=guesses, mask=mask
+        )
 
     # results are stored on the PSFPhotometry instance:
     return results_table, photometry
 
 
+def group_sources(grouper, x, y):
+    """
+    Assign sources to the groups that are fit simultaneously.
+
+    For a `photutils.psf.SourceGrouper` the groups are the same as those
+    of the grouper, numbered in order of first appearance, but are found
+    with a k-d tree of the positions, which scales to many more sources.
+
+    Parameters
+    ----------
+    grouper : callable
+        The grouper, called with ``x, y`` unless it is a
+        `~photutils.psf.SourceGrouper`.
+
+    x, y : `numpy.ndarray`
+        The source positions.
+
+    Returns
+    -------
+    group_id : `numpy.ndarray`
+        The group of each source, starting at 1.
+    """
+    if not isinstance(grouper, SourceGrouper):
+        return np.asarray(grouper(x, y))
+
+    # sources are linked when closer than min_separation
+    # (single-linkage clustering)
+    points = np.column_stack([x, y])
+    pairs = KDTree(points).query_pairs(grouper.min_separation, output_type="ndarray")
+    graph = coo_array(
+        (np.ones(len(pairs), dtype=bool), (pairs[:, 0], pairs[:, 1])),
+        shape=(len(points), len(points)),
+    )
+    _, labels = connected_components(graph, directed=False)
+
+    # number the groups in order of first appearance
+    _, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=int)
+    rank[np.argsort(first)] = np.arange(1, len(first) + 1)
+    return rank[inverse]
+
+
+def fit_psf_tiles(
+    data,
+    error,
+    init_params,
+    *,
+    mask=None,
+    tile_size=1024,
+    maximum_cores="1",
+    **photometry_kwargs,
+):
+    """
+    Fit PSF models to the sources of an image in tiles.
+
+    The sources are grouped as by the ``grouper``, and each group is
+    assigned to the tile holding its first source.  The sources of each
+    tile are fit with `photutils.psf.PSFPhotometry`, one tile at a time or
+    in a pool of worker processes, and the results are merged in the order
+    of ``init_params``.  Each group is fit with all of its sources on the
+    whole image, so the results match fitting all the sources at once.
+
+    Parameters
+    ----------
+    data, error : `numpy.ndarray` or `astropy.units.Quantity`
+        The image and its uncertainties.
+
+    init_params : `astropy.table.Table`
+        The initial positions in the ``x_init`` and ``y_init`` columns.
+
+    mask : `numpy.ndarray` or `None`, optional
+        Boolean mask of the pixels to ignore.
+
+    tile_size : int, optional
+        The size of the tiles in pixels.
+
+    maximum_cores : str, optional
+        The number of processes fitting the tiles: an integer, 'half',
+        'quarter' or 'all'.
+
+    **photometry_kwargs
+        Passed to `photutils.psf.PSFPhotometry`.
+
+    Returns
+    -------
+    results_table : `astropy.table.QTable`
+        The PSF photometry results of all the sources.
+    """
+    x = np.asarray(init_params["x_init"], dtype=float)
+    y = np.asarray(init_params["y_init"], dtype=float)
+    group_id = group_sources(photometry_kwargs["grouper"], x, y)
+
+    # tile of the first source of each group
+    _, first, group_index = np.unique(group_id, return_index=True, return_inverse=True)
+    ny, nx = data.shape
+    n_tiles_x = -(-nx // tile_size)
+    n_tiles_y = -(-ny // tile_size)
+    tile_x = np.clip(np.floor(x[first] / tile_size), 0, n_tiles_x - 1)
+    tile_y = np.clip(np.floor(y[first] / tile_size), 0, n_tiles_y - 1)
+    source_tile = (tile_y * n_tiles_x + tile_x).astype(int)[group_index]
+
+    order = np.argsort(source_tile, kind="stable")
+    tile_starts = np.flatnonzero(np.diff(source_tile[order], prepend=-1))
+    tile_sources = np.split(order, tile_starts[1:])
+
+    # the groups are given, so photutils does not group the sources again
+    tasks = [
+        Table(
+            [x[sources], y[sources], group_id[sources]],
+            names=["x_init", "y_init", "group_id"],
+        )
+        for sources in tile_sources
+    ]
+
+    n_workers = compute_num_cores(maximum_cores, len(tasks), cpu_count())
+    log.info(
+        "Fitting PSFs to %s sources in %s tiles using %s processes",
+        len(x),
+        len(tasks),
+        n_workers,
+    )
+    if n_workers > 1:
+        tile_tables = _fit_psf_tiles_parallel(
+            data, error, mask, tasks, n_workers, photometry_kwargs
+        )
+    else:
+        photometry = PSFPhotometry(**photometry_kwargs)
+        tile_tables = [
+            photometry(data=data, error=error, init_params=tile_params, mask=mask)
+            for tile_params in tasks
+        ]
+
+    results_table = vstack(tile_tables, metadata_conflicts="silent")
+    results_table = results_table[np.argsort(np.concatenate(tile_sources))]
+    results_table["id"] = np.arange(1, len(results_table) + 1)
+    return results_table
+
+
+def _fit_psf_tiles_parallel(data, error, mask, tasks, n_workers, photometry_kwargs):
+    """
+    Fit the PSFs of the sources of each tile in a pool of worker processes.
+
+    The image, its uncertainties and the mask are copied once into shared
+    memory, which the workers attach to, instead of being sent to each
+    worker.
+
+    Returns
+    -------
+    list of `astropy.table.QTable`
+        The PSF photometry results of each tile, in the order of ``tasks``.
+    """
+    arrays = {"data": data, "error": error, "mask": mask}
+    blocks = {}
+    try:
+        layout = {}
+        for name, array in arrays.items():
+            if array is None:
+                layout[name] = None
+                continue
+            unit = getattr(array, "unit", None)
+            value = np.asarray(getattr(array, "value", array))
+            blocks[name] = shared_memory.SharedMemory(
+                create=True, size=max(value.nbytes, 1)
+            )
+            shared = np.ndarray(value.shape, value.dtype, blocks[name].buf)
+            shared[...] = value
+            del shared
+            layout[name] = (blocks[name].name, value.shape, value.dtype.str, unit)
+
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(
+            processes=n_workers,
+            initializer=_init_psf_tile_worker,
+            initargs=(photometry_kwargs, layout),
+        ) as pool:
+            return pool.map(_fit_psf_tile_worker, tasks)
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+
+# PSF photometry settings and shared image of a tile worker process
+_worker_state = {}
+
+
+def _init_psf_tile_worker(photometry_kwargs, layout):
+    """Attach a worker to the shared image used by all tiles."""
+    _worker_state["photometry"] = PSFPhotometry(**photometry_kwargs)
+    # the blocks stay attached for the lifetime of the worker
+    _worker_state["blocks"] = []
+    for name, spec in layout.items():
+        if spec is None:
+            _worker_state[name] = None
+            continue
+        shm_name, shape, dtype, unit = spec
+        block = shared_memory.SharedMemory(name=shm_name)
+        _worker_state["blocks"].append(block)
+        array = np.ndarray(shape, dtype, block.buf)
+        _worker_state[name] = array if unit is None else array << unit
+
+
+def _fit_psf_tile_worker(init_params):
+    """Fit the PSFs of the sources of a tile in a worker process."""
+    return _worker_state["photometry"](
+        data=_worker_state["data"],
+        error=_worker_state["error"],
+        init_params=init_params,
+        mask=_worker_state["mask"],
+    )
+
+
 class PSFCatalog:
     """
     Class to calculate PSF photometry.
@@ -764,13 +1042,37 @@ class PSFCatalog:
         A 2D boolean mask image with the same shape as the input data.
         This mask is used for PSF photometry. The mask should be the
         same one used to create the segmentation image.
+
+    tile_size : int or `None`, optional
+        If given, fit the sources in tiles of this many pixels on a side.
+
+    maximum_cores : str, optional
+        The number of processes fitting the tiles: an integer, 'half',
+        'quarter' or 'all'.
+
+    gridded_psf_model : `photutils.psf.GriddedPSFModel` or `None`, optional
+        The gridded PSF model of the detector, for example from
+        `~romancal.source_catalog.psf_cache.PSF_MODEL_CACHE`. By default
+        it is made from ``psf_ref_model``.
     """
 
-    def __init__(self, model, psf_ref_model, xypos, mask=None):
+    def __init__(
+        self,
+        model,
+        psf_ref_model,
+        xypos,
+        mask=None,
+        tile_size=None,
+        maximum_cores="1",
+        gridded_psf_model=None,
+    ):
         self.model = model
         self.psf_ref_model = psf_ref_model
+        self.gridded_psf_model = gridded_psf_model
         self.xypos = xypos
         self.mask = mask
+        self.tile_size = tile_size
+        self.maximum_cores = maximum_cores
 
         self.names = list(self._name_map.values())
         self.names.extend(["ra_psf", "dec_psf", "ra_psf_err", "dec_psf_err"])
@@ -783,9 +1085,13 @@ class PSFCatalog:
         A gridded PSF model based on instrument and detector
         information.
         """
+        gridpsf = self.gridded_psf_model
+        if gridpsf is None:
+            gridpsf = get_gridded_psf_model(self.psf_ref_model)
+
         if hasattr(self.model.meta, "instrument"):
             # ImageModel (L2 datamodel)
-            psf_model = get_gridded_psf_model(self.psf_ref_model)
+            psf_model = gridpsf
         else:
             # MosaicModel (L3 datamodel)
             psf_model = create_l3_psf_model(
@@ -793,6 +1099,7 @@ class PSFCatalog:
                 pixel_scale=self.model.meta.wcsinfo.pixel_scale
                 * 3600.0,  # wcsinfo is in degrees. Need arcsec
                 pixfrac=self.model.meta.resample.pixfrac,
+                gridpsf=gridpsf,
             )
 
         return psf_model
@@ -826,6 +1133,8 @@ class PSFCatalog:
             x_init=xinit,
             y_init=yinit,
             exclude_out_of_bounds=True,
+            tile_size=self.tile_size,
+            maximum_cores=self.maximum_cores,
         )
 
         # set these columns as attributes of this instance
@@ -0,0 +1,181 @@
+"""
+Process-level cache of gridded PSF models
+"""
+
+import contextlib
+import hashlib
+import logging
+import os
+import tempfile
+
+import numpy as np
+from roman_datamodels import datamodels
+
+from romancal.source_catalog.psf import (
+    _get_jitter_params,
+    _make_gridded_psf_model,
+    add_jitter,
+    get_gridded_psf_model,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+__all__ = ["PSF_MODEL_CACHE", "PSFModelCache"]
+
+
+class PSFModelCache:
+    """
+    Cache of the gridded PSF models prepared from ePSF reference files.
+
+    Preparing the PSF model of an exposure convolves every PSF of the
+    reference file with the jitter of the exposure and then integrates
+    the PSFs over the detector pixels.  When the cache is enabled, each
+    model is prepared once, keyed on the reference file, the focus and
+    spectral type slices and the jitter parameters, and then shared by
+    all the exposures with the same key.  The prepared PSFs can also be
+    kept as ``.npy`` files in a directory, which lets worker processes,
+    and later runs given the same directory, reuse them, see `enable`.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.directory = None
+        self._models = {}
+        self.hits = 0
+        self.misses = 0
+
+    @contextlib.contextmanager
+    def enable(self, directory=None):
+        """
+        Enable the cache for the duration of a ``with`` block.
+
+        The models in memory are cleared at the end of the block, while
+        any files in ``directory`` are kept.  Nested calls leave the cache
+        as set up by the outer one.
+
+        Parameters
+        ----------
+        directory : str or None
+            If given, also keep the prepared PSFs as ``.npy`` files in this
+            directory, and reuse those already there.
+        """
+        if self.enabled:
+            yield self
+            return
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.enabled = True
+        try:
+            yield self
+        finally:
+            log.info("PSF model cache: %d prepared, %d reused", self.misses, self.hits)
+            self.clear()
+            self.enabled = False
+            self.directory = None
+
+    def get_gridded_psf_model(
+        self, psf_ref_file, image_model=None, focus=0, spectral_type=1
+    ):
+        """
+        Prepare, or look up, a gridded PSF model.
+
+        Parameters
+        ----------
+        psf_ref_file : str
+            The ePSF reference file.
+
+        image_model : `ImageModel` or `MosaicModel` or `None`, optional
+            If given, the PSFs are convolved with the jitter of this image,
+            see `~romancal.source_catalog.psf.add_jitter`.
+
+        focus, spectral_type : int, optional
+            The slices of the reference file, see
+            `~romancal.source_catalog.psf.get_gridded_psf_model`.
+
+        Returns
+        -------
+        psf_model : `photutils.psf.GriddedPSFModel`
+            The gridded PSF model.
+        """
+        if not self.enabled:
+            return _prepare_gridded_psf_model(
+                psf_ref_file, image_model, focus, spectral_type
+            )
+
+        if image_model is not None:
+            jitter = _get_jitter_params(getattr(image_model.meta, "guide_star", {}))
+            jitter = tuple(jitter.values())
+        else:
+            jitter = None
+        key = (os.path.abspath(psf_ref_file), focus, spectral_type, jitter)
+        if key in self._models:
+            self.hits += 1
+            return self._models[key].copy()
+
+        filename = None
+        if self.directory is not None:
+            digest = hashlib.sha256(repr(key).encode()).hexdigest()[:16]
+            filename = os.path.join(self.directory, f"epsf_{digest}.npy")
+
+        if filename is not None and os.path.exists(filename):
+            self.hits += 1
+            with datamodels.open(psf_ref_file) as psf_ref_model:
+                psf_model = _make_gridded_psf_model(
+                    np.load(filename), psf_ref_model.meta
+                )
+        else:
+            self.misses += 1
+            psf_model = _prepare_gridded_psf_model(
+                psf_ref_file, image_model, focus, spectral_type
+            )
+            if filename is not None:
+                # write through a temporary file so that other processes
+                # never read a partial file
+                fd, tmp_filename = tempfile.mkstemp(suffix=".npy", dir=self.directory)
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, psf_model.data)
+                os.replace(tmp_filename, filename)
+
+        self._models[key] = psf_model
+        return psf_model.copy()
+
+    def clear(self):
+        """Remove all models from memory and reset the statistics."""
+        self._models.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        Cache statistics.
+
+        Returns
+        -------
+        dict
+            The number of hits and misses along with the number of cached
+            models.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "models": len(self._models),
+        }
+
+    def __len__(self):
+        return len(self._models)
+
+
+def _prepare_gridded_psf_model(psf_ref_file, image_model, focus, spectral_type):
+    """Read a reference file and prepare its gridded PSF model."""
+    with datamodels.open(psf_ref_file) as psf_ref_model:
+        if image_model is not None:
+            psf_ref_model.psf = add_jitter(psf_ref_model, image_model)
+        return get_gridded_psf_model(
+            psf_ref_model, focus=focus, spectral_type=spectral_type
+        )
+
+
+PSF_MODEL_CACHE = PSFModelCache()
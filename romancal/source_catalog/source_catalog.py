@@ -84,6 +84,18 @@ class RomanSourceCatalog:
     ee_spline : `~astropy.modeling.models.Spline1D` or `None`
         The PSF aperture correction model, built from the reference file.
 
+    psf_tile_size : int or `None`, optional
+        If given, fit the PSFs in tiles of this many pixels on a side.
+
+    maximum_cores : str, optional
+        The number of processes fitting the PSF tiles: an integer,
+        'half', 'quarter' or 'all'.
+
+    gridded_psf_model : `photutils.psf.GriddedPSFModel` or `None`, optional
+        The gridded PSF model of the detector, prepared from the PSF
+        reference file. If input, ``psf_ref_model`` is not needed for
+        PSF photometry of `ImageModel` data.
+
     Notes
     -----
     ``model.err`` is assumed to be the total error array corresponding
@@ -107,6 +119,9 @@ class RomanSourceCatalog:
         flux_unit="nJy",
         cat_type="prompt",
         ee_spline=None,
+        psf_tile_size=None,
+        maximum_cores="1",
+        gridded_psf_model=None,
     ):
         if not isinstance(model, ImageModel | MosaicModel):
             raise ValueError("The input model must be an ImageModel or MosaicModel.")
@@ -123,6 +138,9 @@ class RomanSourceCatalog:
         self.flux_unit = flux_unit
         self.cat_type = cat_type
         self.ee_spline = ee_spline
+        self.psf_tile_size = psf_tile_size
+        self.maximum_cores = maximum_cores
+        self.gridded_psf_model = gridded_psf_model
 
         self.n_sources = len(segment_img.labels)
         self.wcs = self.model.meta.wcs
@@ -138,7 +156,11 @@ class RomanSourceCatalog:
             u.Unit(self.flux_unit)
         )
 
-        if self.fit_psf and self.psf_ref_model is None:
+        if (
+            self.fit_psf
+            and self.psf_ref_model is None
+            and self.gridded_psf_model is None
+        ):
             log.error(
                 "PSF fitting is requested but no PSF reference model is provided. Skipping PSF photometry."
             )
@@ -312,7 +334,15 @@ class RomanSourceCatalog:
 
         The results are set as dynamic attributes on the class instance.
         """
-        psf_cat = PSFCatalog(self.model, self.psf_ref_model, self._xypos, self.mask)
+        psf_cat = PSFCatalog(
+            self.model,
+            self.psf_ref_model,
+            self._xypos,
+            self.mask,
+            tile_size=self.psf_tile_size,
+            maximum_cores=self.maximum_cores,
+            gridded_psf_model=self.gridded_psf_model,
+        )
         for name in psf_cat.names:
             setattr(self, name, getattr(psf_cat, name))
 
@@ -17,7 +17,7 @@ from roman_datamodels.dqflags import pixel
 from romancal.datamodels.fileio import open_dataset
 from romancal.source_catalog.background import RomanBackground
 from romancal.source_catalog.detection import convolve_data, make_segmentation_image
-from romancal.source_catalog.psf import add_jitter
+from romancal.source_catalog.psf_cache import PSF_MODEL_CACHE
 from romancal.source_catalog.save_utils import save_all_results, save_empty_results
 from romancal.source_catalog.source_catalog import RomanSourceCatalog
 from romancal.source_catalog.utils import get_ee_spline
@@ -55,6 +55,8 @@ class SourceCatalogStep(RomanStep):
         suffix = string(default='cat')        # Default suffix for output files
         fit_psf = boolean(default=True)       # fit source PSFs for accurate astrometry?
         forced_segmentation = string(default='')  # force the use of this segmentation map
+        psf_tile_size = integer(default=None, min=1)  # fit PSFs in tiles of this many pixels on a side
+        maximum_cores = string(default='1')  # cores for fitting the PSF tiles in parallel. Can be an integer, 'half', 'quarter', or 'all'
     """
 
     def process(self, dataset):
@@ -64,10 +66,11 @@ class SourceCatalogStep(RomanStep):
         if self.fit_psf:
             self.ref_file = self.get_reference_file(input_model, "epsf")
             log.info("Using ePSF reference file: %s", self.ref_file)
-            psf_ref_model = datamodels.open(self.ref_file)
-            psf_ref_model.psf = add_jitter(psf_ref_model, input_model)
+            gridded_psf_model = PSF_MODEL_CACHE.get_gridded_psf_model(
+                self.ref_file, input_model
+            )
         else:
-            psf_ref_model = None
+            gridded_psf_model = None
 
         # Define a boolean mask for pixels to be excluded
         mask = (
@@ -199,9 +202,11 @@ class SourceCatalogStep(RomanStep):
             self.kernel_fwhm,
             fit_psf=fit_psf,
             mask=mask,
-            psf_ref_model=psf_ref_model,
+            gridded_psf_model=gridded_psf_model,
             cat_type=cat_type,
             ee_spline=ee_spline,
+            psf_tile_size=self.psf_tile_size,
+            maximum_cores=self.maximum_cores,
         )
         cat = catobj.catalog
 
@@ -218,9 +223,11 @@ class SourceCatalogStep(RomanStep):
                 self.kernel_fwhm,
                 fit_psf=self.fit_psf,
                 mask=mask,
-                psf_ref_model=psf_ref_model,
+                gridded_psf_model=gridded_psf_model,
                 cat_type="forced_full",
                 ee_spline=ee_spline,
+                psf_tile_size=self.psf_tile_size,
+                maximum_cores=self.maximum_cores,
             )
 
             # We have two catalogs, both using the same segmentation
@@ -2,6 +2,8 @@
 Unit tests for the Roman source detection step code
 """
 
+import logging
+import time
 from copy import deepcopy
 
 import crds
@@ -11,23 +13,27 @@ import roman_datamodels as rdm
 from astropy import units as u
 from astropy.convolution import convolve
 from astropy.modeling.models import Gaussian2D
+from astropy.nddata import NDData
 from astropy.stats import mad_std
 from astropy.table import QTable
 from astropy.time import Time
 from photutils.datasets import make_model_image
-from photutils.psf import PSFPhotometry
+from photutils.psf import GriddedPSFModel, PSFPhotometry, SourceGrouper
 from roman_datamodels.datamodels import ImageModel
 
 from romancal.source_catalog import psf
 from romancal.source_catalog.psf import (
     fit_psf_to_image_model,
     get_gridded_psf_model,
+    group_sources,
 )
 
 n_trials = 15
 image_model_shape = (50, 50)
 rng = np.random.default_rng(0)
 
+log = logging.getLogger(__name__)
+
 
 @pytest.fixture(scope="module")
 def setup_inputs(
@@ -323,3 +329,129 @@ def test_central_stamp():
     assert cen.shape[0] == 20
     cen = psf.central_stamp(img, 21)
     assert cen.shape[0] == 22  # needed to make it bigger to be central
+
+
+def make_gaussian_psf_model(shape=(500, 500)):
+    """
+    Gridded PSF model of Gaussians whose width changes across the image.
+    """
+    grid_xypos = [
+        (x, y)
+        for y in (0, shape[0] // 2, shape[0])
+        for x in (0, shape[1] // 2, shape[1])
+    ]
+    yy, xx = np.mgrid[-12:12.01:0.25, -12:12.01:0.25]
+    psfs = []
+    for i in range(len(grid_xypos)):
+        sigma = 1.1 + 0.05 * i
+        stamp = np.exp(-(xx**2 + yy**2) / (2 * sigma**2))
+        psfs.append(stamp / stamp.sum() * 16)
+    return GriddedPSFModel(
+        NDData(np.array(psfs), meta={"grid_xypos": grid_xypos, "oversampling": 4})
+    )
+
+
+def make_crowded_image(psf_model, n_sources, shape=(500, 500), seed=1):
+    """
+    Image of point sources, some in close pairs, and their initial positions.
+    """
+    image_rng = np.random.default_rng(seed)
+    n_pairs = n_sources // 5
+    x = image_rng.uniform(5, shape[1] - 5, n_sources - n_pairs)
+    y = image_rng.uniform(5, shape[0] - 5, n_sources - n_pairs)
+    x = np.concatenate([x, x[:n_pairs] + 3.0])
+    y = np.concatenate([y, y[:n_pairs] + 2.0])
+
+    params_table = QTable()
+    params_table["x_0"] = x
+    params_table["y_0"] = y
+    params_table["flux"] = image_rng.uniform(1_000, 10_000, n_sources)
+    data = make_model_image(shape, psf_model, params_table, model_shape=(19, 19))
+    data += image_rng.normal(0, 1, shape)
+    error = np.ones(shape)
+
+    x_init = x + image_rng.normal(0, 0.2, n_sources)
+    y_init = y + image_rng.normal(0, 0.2, n_sources)
+    return data, error, x_init, y_init
+
+
+def test_group_sources():
+    """The k-d tree groups match those of SourceGrouper."""
+    group_rng = np.random.default_rng(7)
+    x, y = group_rng.uniform(0, 200, (2, 500))
+    grouper = SourceGrouper(min_separation=5)
+    np.testing.assert_array_equal(group_sources(grouper, x, y), grouper(x, y))
+
+
+@pytest.mark.filterwarnings("ignore::astropy.utils.exceptions.AstropyUserWarning")
+@pytest.mark.filterwarnings(
+    "ignore::astropy.utils.exceptions.AstropyDeprecationWarning"
+)
+def test_fit_psf_tiles(monkeypatch):
+    """
+    Fitting in tiles gives the results of fitting the whole image, and
+    fitting the tiles in worker processes gives the same results.
+    """
+    monkeypatch.setattr(psf, "cpu_count", lambda: 2)
+    psf_model = make_gaussian_psf_model()
+    data, error, x_init, y_init = make_crowded_image(psf_model, 60)
+    mask = np.zeros(data.shape, dtype=bool)
+    mask[200:210, 100:300] = True
+    kwargs = dict(
+        data=data,
+        error=error,
+        mask=mask,
+        psf_model=psf_model,
+        x_init=x_init,
+        y_init=y_init,
+    )
+
+    expected, _ = fit_psf_to_image_model(**kwargs)
+    tiled, _ = fit_psf_to_image_model(**kwargs, tile_size=100)
+    parallel, _ = fit_psf_to_image_model(**kwargs, tile_size=100, maximum_cores="2")
+
+    assert tiled.colnames == expected.colnames
+    assert parallel.colnames == expected.colnames
+    for name in expected.colnames:
+        np.testing.assert_array_equal(tiled[name], expected[name])
+        np.testing.assert_array_equal(parallel[name], expected[name])
+
+
+@pytest.mark.filterwarnings("ignore::astropy.utils.exceptions.AstropyUserWarning")
+@pytest.mark.filterwarnings(
+    "ignore::astropy.utils.exceptions.AstropyDeprecationWarning"
+)
+def test_fit_psf_tiles_benchmark():
+    """
+    Fitting the tiles in worker processes gives the same results as
+    fitting them one at a time.
+
+    The timings are only logged, they depend too much on the machine to
+    be compared.
+    """
+    psf_model = make_gaussian_psf_model()
+    data, error, x_init, y_init = make_crowded_image(psf_model, 400)
+    kwargs = dict(
+        data=data,
+        error=error,
+        psf_model=psf_model,
+        x_init=x_init,
+        y_init=y_init,
+        tile_size=128,
+    )
+
+    start = time.perf_counter()
+    expected, _ = fit_psf_to_image_model(**kwargs)
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel, _ = fit_psf_to_image_model(**kwargs, maximum_cores="4")
+    parallel_time = time.perf_counter() - start
+
+    log.info(
+        "PSF fits of 400 sources in tiles: serial %.3f s, 4 processes %.3f s",
+        serial_time,
+        parallel_time,
+    )
+    for name in expected.colnames:
+        np.testing.assert_array_equal(parallel[name], expected[name])
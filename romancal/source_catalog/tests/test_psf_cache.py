@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+import pytest
+import roman_datamodels.datamodels as rdm
+
+from romancal.source_catalog import psf
+from romancal.source_catalog.psf_cache import PSFModelCache
+
+
+@pytest.fixture
+def psf_ref_file(tmp_path):
+    rng = np.random.default_rng(0)
+    model = rdm.EpsfRefModel.create_fake_data(
+        defaults={"psf": rng.random((1, 2, 4, 41, 41)).astype("f4")}
+    )
+    model.meta.pixel_x = [0.0, 4087.0, 0.0, 4087.0]
+    model.meta.pixel_y = [0.0, 0.0, 4087.0, 4087.0]
+    model.meta.oversample = 4
+    model.meta.jitter_major = 8.0
+    model.meta.jitter_minor = 8.0
+    model.meta.jitter_position_angle = 0.0
+    filename = str(tmp_path / "epsf.asdf")
+    model.save(filename)
+    return filename
+
+
+def make_image(jitter_major=10.0):
+    image = rdm.ImageModel.create_fake_data(shape=(8, 8))
+    image.meta.guide_star.jitter_major = jitter_major
+    image.meta.guide_star.jitter_minor = 5.0
+    image.meta.guide_star.jitter_position_angle = 30.0
+    return image
+
+
+def expected_psf_model(psf_ref_file, image, spectral_type=1):
+    psf_ref_model = rdm.open(psf_ref_file)
+    psf_ref_model.psf = psf.add_jitter(psf_ref_model, image)
+    return psf.get_gridded_psf_model(psf_ref_model, spectral_type=spectral_type)
+
+
+def test_disabled(psf_ref_file):
+    cache = PSFModelCache()
+    image = make_image()
+
+    psf_model = cache.get_gridded_psf_model(psf_ref_file, image)
+
+    np.testing.assert_array_equal(
+        psf_model.data, expected_psf_model(psf_ref_file, image).data
+    )
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 0
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_hits_and_misses(psf_ref_file, tmp_path, on_disk):
+    cache = PSFModelCache()
+    directory = str(tmp_path / "psf_cache") if on_disk else None
+    image = make_image()
+    expected = expected_psf_model(psf_ref_file, image)
+
+    with cache.enable(directory=directory):
+        psf_model = cache.get_gridded_psf_model(psf_ref_file, image)
+        np.testing.assert_array_equal(psf_model.data, expected.data)
+        np.testing.assert_array_equal(psf_model.grid_xypos, expected.grid_xypos)
+
+        # the same jitter gives the same model
+        again = cache.get_gridded_psf_model(psf_ref_file, make_image())
+        np.testing.assert_array_equal(again.data, expected.data)
+        assert again is not psf_model
+
+        # other jitter, spectral type, or none at all
+        cache.get_gridded_psf_model(psf_ref_file, make_image(jitter_major=12.0))
+        cache.get_gridded_psf_model(psf_ref_file, image, spectral_type=0)
+        cache.get_gridded_psf_model(psf_ref_file)
+
+        assert cache.stats() == {"hits": 1, "misses": 4, "models": 4}
+
+    assert len(cache) == 0
+    assert not cache.enabled
+    if on_disk:
+        assert len(os.listdir(directory)) == 4
+    else:
+        assert not tmp_path.joinpath("psf_cache").exists()
+
+    # the files are reused by later runs
+    with cache.enable(directory=directory):
+        psf_model = cache.get_gridded_psf_model(psf_ref_file, image)
+        np.testing.assert_array_equal(psf_model.data, expected.data)
+        assert cache.stats()["misses"] == (0 if on_disk else 1)
+
+
+def test_nested_enable(psf_ref_file):
+    cache = PSFModelCache()
+
+    with cache.enable():
+        cache.get_gridded_psf_model(psf_ref_file)
+        with cache.enable():
+            cache.get_gridded_psf_model(psf_ref_file)
+        assert cache.enabled
+        assert cache.stats() == {"hits": 1, "misses": 1, "models": 1}
@@ -6,6 +6,7 @@ import numpy as np
 import pyarrow
 import pytest
 from astropy.modeling.models import Gaussian2D
+from astropy.stats import SigmaClip
 from astropy.table import Table
 from astropy.time import Time
 from numpy.testing import assert_equal
@@ -20,6 +21,7 @@ from roman_datamodels.datamodels import (
     SegmentationMapModel,
 )
 
+from romancal.source_catalog.aperture import _sigma_clipped_stats
 from romancal.source_catalog.source_catalog import RomanSourceCatalog
 from romancal.source_catalog.source_catalog_step import SourceCatalogStep
 
@@ -717,3 +719,33 @@ def test_l2_source_catalog_return_updated_model_attribute(
 
     # assert that we returned the correct object
     assert isinstance(result, expected_result)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.filterwarnings("ignore:Input data contains invalid values")
+def test_sigma_clipped_stats():
+    """
+    Test that the segments clipped together give the same statistics as
+    clipping each one with SigmaClip.
+    """
+    rng = np.random.default_rng(42)
+    segments = []
+    for size in (0, 1, 2, 5, 40, 40, 41, 300, 300, 0):
+        values = rng.normal(rng.uniform(-1, 1), rng.uniform(0.1, 2), size)
+        if size > 2:
+            # outliers, ties, and non-finite values
+            values[rng.integers(0, size, size // 5)] = 50.0
+            values[: size // 3] = np.round(values[: size // 3], 1)
+            values[rng.integers(0, size, size // 10)] = np.nan
+        segments.append(values)
+    segments.append(np.full(10, np.nan))
+
+    offsets = np.concatenate(([0], np.cumsum([len(values) for values in segments])))
+    median, std, nvalues = _sigma_clipped_stats(np.concatenate(segments), offsets)
+
+    sigclip = SigmaClip(sigma=3.0)
+    for i, values in enumerate(segments):
+        clipped = sigclip(values, masked=False)
+        assert nvalues[i] == clipped.size
+        assert_equal(median[i], np.median(clipped))
+        assert_equal(std[i], np.std(clipped))
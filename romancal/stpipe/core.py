@@ -12,6 +12,7 @@ from stpipe import Pipeline, Step, crds_client
 from romancal.datamodels.fileio import open_dataset
 
 from ..lib.suffix import remove_suffix
+from .reference_cache import REFERENCE_CACHE
 
 _LOG_FORMATTER = logging.Formatter(
     "%(asctime)s.%(msecs)03dZ :: %(name)s :: %(levelname)s :: %(message)s",
@@ -36,6 +37,10 @@ class RomanStep(Step):
 
     _log_records_formatter = _LOG_FORMATTER
 
+    # Reference model cache used instead of the process-level cache, for
+    # example to share the references of a few steps across exposures
+    reference_cache = None
+
     @classmethod
     def _datamodels_open(cls, init, **kwargs):
         """
@@ -56,6 +61,33 @@ class RomanStep(Step):
             ]
         return crds_parameters, crds_observatory
 
+    def open_reference_model(self, reference_file_name, **kwargs):
+        """
+        Open a reference file through the reference model cache.
+
+        This is the ``reference_cache`` of the step if set, otherwise the
+        process-level cache. When the cache is disabled (the default) this
+        is the same as `roman_datamodels.datamodels.open`. See
+        `~romancal.stpipe.reference_cache.ReferenceModelCache`.
+
+        Parameters
+        ----------
+        reference_file_name : str
+            Reference file name, as returned by ``get_reference_file``.
+
+        **kwargs
+            Passed to `roman_datamodels.datamodels.open`.
+
+        Returns
+        -------
+        roman_datamodels.datamodels.DataModel
+            The reference model. The arrays of cached models are read-only.
+        """
+        cache = (
+            REFERENCE_CACHE if self.reference_cache is None else self.reference_cache
+        )
+        return cache.open(reference_file_name, **kwargs)
+
     @staticmethod
     def get_stpipe_loggers():
         """
@@ -0,0 +1,147 @@
+"""
+Process-level cache of opened reference models
+"""
+
+import logging
+import os
+from collections import OrderedDict
+
+import numpy as np
+from roman_datamodels import datamodels as rdm
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+__all__ = ["REFERENCE_CACHE", "ReferenceModelCache"]
+
+
+class ReferenceModelCache:
+    """
+    Least recently used cache of reference models, keyed on filename.
+
+    Reference models are opened memory mapped (where the arrays are not
+    compressed) and all their arrays are made read-only, so the same model
+    can be handed to every step that asks for the file. Models are evicted,
+    least recently used first, and closed once the total size of their
+    arrays exceeds ``max_bytes``. A ``max_bytes`` of 0 disables the cache.
+
+    Parameters
+    ----------
+    max_bytes : int
+        The maximum total size, in bytes, of the arrays of the cached models.
+    """
+
+    def __init__(self, max_bytes=0):
+        self.max_bytes = max_bytes
+        self._models = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def open(self, filename, **kwargs):
+        """
+        Open a reference model through the cache.
+
+        Parameters
+        ----------
+        filename : str or roman_datamodels.datamodels.DataModel
+            The reference file name. Models (for example from step
+            overrides) are never cached.
+
+        **kwargs
+            Passed to `roman_datamodels.datamodels.open`. The same file
+            opened with different arguments (for example ``memmap=False``)
+            is cached as a separate model.
+
+        Returns
+        -------
+        model : roman_datamodels.datamodels.DataModel
+            The reference model. When it comes from the cache it is a
+            shallow copy of the cached model, so closing it (for example
+            at the end of a ``with`` block) leaves the cached model open.
+            Models too large for the cache are returned uncached, but
+            still with read-only arrays.
+        """
+        if not self.enabled or not isinstance(filename, str | os.PathLike):
+            return rdm.open(filename, **kwargs)
+
+        key = (os.path.abspath(filename), tuple(sorted(kwargs.items())))
+        if key in self._models:
+            self._models.move_to_end(key)
+            self.hits += 1
+            log.debug("Reference cache hit for %s", filename)
+            return self._models[key][0].copy(deepcopy=False)
+
+        self.misses += 1
+        model = rdm.open(filename, **{"memmap": True, "lazy_load": False, **kwargs})
+        nbytes = 0
+        for _, value in model.items():
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+                nbytes += value.nbytes
+        if nbytes > self.max_bytes:
+            log.debug(
+                "Reference file %s (%d bytes) is larger than the cache",
+                filename,
+                nbytes,
+            )
+            return model
+
+        log.debug("Reference cache miss for %s, caching %d bytes", filename, nbytes)
+        self._models[key] = (model, nbytes)
+        self.nbytes += nbytes
+        while self.nbytes > self.max_bytes:
+            (evicted, _), (evicted_model, evicted_nbytes) = self._models.popitem(
+                last=False
+            )
+            evicted_model.close()
+            self.nbytes -= evicted_nbytes
+            self.evictions += 1
+            log.debug("Evicted %s from the reference cache", evicted)
+
+        return model.copy(deepcopy=False)
+
+    def clear(self):
+        """Close and remove all models from the cache and reset the statistics."""
+        for model, _ in self._models.values():
+            model.close()
+        self._models.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """
+        Cache statistics.
+
+        Returns
+        -------
+        dict
+            The number of hits, misses and evictions along with the number
+            of cached models and their total size in bytes.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "models": len(self._models),
+            "nbytes": self.nbytes,
+        }
+
+    def __contains__(self, filename):
+        filename = os.path.abspath(filename)
+        return any(key[0] == filename for key in self._models)
+
+    def __len__(self):
+        return len(self._models)
+
+
+REFERENCE_CACHE = ReferenceModelCache(
+    int(os.environ.get("ROMANCAL_REFERENCE_CACHE_SIZE", 0))
+)
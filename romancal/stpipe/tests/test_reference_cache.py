@@ -0,0 +1,141 @@
+import asdf
+import numpy as np
+import pytest
+from roman_datamodels.datamodels import FlatRefModel, ImageModel
+
+from romancal.flatfield import FlatFieldStep
+from romancal.stpipe.reference_cache import REFERENCE_CACHE, ReferenceModelCache
+
+SHAPE = (20, 20)
+
+
+@pytest.fixture
+def flat_files(tmp_path):
+    """Three flat reference files of 4800 bytes (data, dq and err) each"""
+    filenames = []
+    for idx in range(3):
+        flat = FlatRefModel.create_fake_data(shape=SHAPE)
+        flat.data = np.full(SHAPE, idx + 1, dtype=np.float32)
+        flat.dq = np.zeros(SHAPE, dtype=np.uint32)
+        flat.err = np.zeros(SHAPE, dtype=np.float32)
+        filename = str(tmp_path / f"flat{idx}.asdf")
+        flat.save(filename)
+        filenames.append(filename)
+    return filenames
+
+
+def test_disabled(flat_files):
+    cache = ReferenceModelCache()
+
+    with cache.open(flat_files[0]) as model:
+        assert isinstance(model, FlatRefModel)
+        assert model.data.flags.writeable
+
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 0
+
+
+def test_hits_and_misses(flat_files):
+    cache = ReferenceModelCache(10_000)
+
+    with cache.open(flat_files[0]) as model:
+        assert isinstance(model, FlatRefModel)
+        assert not model.data.flags.writeable
+        assert not model.dq.flags.writeable
+
+    # closing the returned model leaves the cached model usable
+    with cache.open(flat_files[0]) as model:
+        assert (model.data == 1).all()
+
+    assert flat_files[0] in cache
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "models": 1,
+        "nbytes": 4800,
+    }
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 0
+
+
+def test_lru_eviction(flat_files, monkeypatch):
+    # only the cached models, not the returned copies, close their files
+    closed = set()
+    close = asdf.AsdfFile.close
+    monkeypatch.setattr(
+        asdf.AsdfFile, "close", lambda self: closed.add(id(self)) or close(self)
+    )
+    cache = ReferenceModelCache(10_000)
+
+    cache.open(flat_files[0])
+    cache.open(flat_files[1])
+    # refresh the first file so the second is the least recently used
+    cache.open(flat_files[0])
+    cache.open(flat_files[2])
+
+    assert flat_files[0] in cache
+    assert flat_files[1] not in cache
+    assert flat_files[2] in cache
+    assert cache.stats()["evictions"] == 1
+    assert cache.nbytes == 9600
+
+    # the evicted model is closed, and clearing closes the others
+    assert len(closed) == 1
+    cache.clear()
+    assert len(closed) == 3
+
+
+def test_open_arguments(flat_files):
+    """The same file opened with other arguments is a separate model"""
+    cache = ReferenceModelCache(10_000)
+
+    with cache.open(flat_files[0], memmap=False) as model:
+        assert not model.data.flags.writeable
+    cache.open(flat_files[0], memmap=False)
+    cache.open(flat_files[0])
+
+    assert flat_files[0] in cache
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["models"] == 2
+
+
+def test_too_large(flat_files):
+    cache = ReferenceModelCache(4000)
+
+    with cache.open(flat_files[0]) as model:
+        assert (model.data == 1).all()
+
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 1
+
+
+def test_step_uses_cache(flat_files, monkeypatch):
+    """Steps open their reference files through the process level cache"""
+    monkeypatch.setattr(REFERENCE_CACHE, "max_bytes", 10_000)
+    REFERENCE_CACHE.clear()
+
+    image = ImageModel.create_fake_data(shape=SHAPE)
+    image.meta.cal_step = {}
+    image.meta.cal_logs = []
+    image.data = np.full(SHAPE, 4, dtype=np.float32)
+    image.dq = np.zeros(SHAPE, dtype=np.uint32)
+    image.err = np.ones(SHAPE, dtype=np.float32)
+    image.var_poisson = np.ones(SHAPE, dtype=np.float32)
+    image.var_rnoise = np.ones(SHAPE, dtype=np.float32)
+
+    try:
+        results = [
+            FlatFieldStep.call(image.copy(), override_flat=flat_files[1])
+            for _ in range(2)
+        ]
+        assert REFERENCE_CACHE.stats()["hits"] == 1
+        assert REFERENCE_CACHE.stats()["misses"] == 1
+    finally:
+        REFERENCE_CACHE.clear()
+
+    for result in results:
+        np.testing.assert_array_equal(result.data, 2)
@@ -69,6 +69,19 @@ def test_wfi18_transient(caplog):
     np.testing.assert_equal(result.groupdq, 0)
 
 
+def test_wfi18_transient_rows_per_band():
+    model = create_ramp_model(5)
+    rng = np.random.default_rng(42)
+    model.data[:] = np.arange(5, dtype=np.float32)[:, None, None] + 1.0
+    model.data += rng.normal(0, 0.01, model.data.shape[1:]).astype(np.float32)
+    model.data[0, 4:-4, 4:-4] += transient_glow()[4:-4, 4:-4]
+
+    # Processing in bands of rows gives the same result as all rows at once
+    expected = WFI18TransientStep.call(model.copy(), rows_per_band=4096)
+    result = WFI18TransientStep.call(model, rows_per_band=300)
+    np.testing.assert_array_equal(result.data, expected.data)
+
+
 def test_wfi18_transient_flat_data(caplog):
     model = create_ramp_model(5)
 
@@ -6,7 +6,7 @@ from astropy.stats import sigma_clipped_stats
 from roman_datamodels import dqflags
 from scipy import optimize
 
-from romancal.lib.basic_utils import frame_read_times
+from romancal.lib.basic_utils import FrameReadTimes, row_bands
 
 __all__ = ["correct_anomaly", "mask_affected_rows"]
 
@@ -78,7 +78,61 @@ def _double_exp(t, a, b, tau_a, tau_b):
     return a * np.exp(-t / tau_a) + b * np.exp(-t / tau_b)
 
 
-def correct_anomaly(input_model, mask_rows=False):
+def _row_residuals(data, t_resultant, rows_per_band=None):
+    """
+    Compute the residual of the first read for each row.
+
+    The residual is the difference between the first read and its value
+    extrapolated backward from the 2nd and 3rd resultants, averaged with
+    sigma clipping over the weakly illuminated pixels of each row.
+
+    Parameters
+    ----------
+    data : `~numpy.ndarray`
+        The ramp data, without reference pixels.
+    t_resultant : `~numpy.ndarray`
+        The mean read time of each resultant, in seconds.
+    rows_per_band : int or None, optional
+        Compute the residuals in bands of this many rows, so that the
+        temporary arrays only cover one band.  If None, all rows are
+        computed at once.
+
+    Returns
+    -------
+    `~numpy.ndarray`
+        The sigma clipped mean residual for each row.
+    """
+    nrows = data.shape[1]
+    diff_time = np.diff(t_resultant)
+
+    # Identify weakly illuminated pixels in each row for fitting.
+    # Use a different pair of reads, to minimize bias from covariances.
+    median_diff = np.empty(nrows, dtype=data.dtype)
+    for band in row_bands(nrows, rows_per_band):
+        median_diff[band] = np.median(data[4, band] - data[3, band], axis=1)
+
+    residual_rows = np.empty(nrows)
+    for band in row_bands(nrows, rows_per_band):
+        # Use the 2nd and 3rd resultants to estimate the true value for the
+        # first read, extrapolating backward from the count rate.
+        estimated_rate = (data[2, band] - data[1, band]) / diff_time[1]
+        estimated_first_read = data[1, band] - estimated_rate * diff_time[0]
+
+        # Residual from the estimated value
+        residual = data[0, band] - estimated_first_read
+
+        high_illum_mask = data[4, band] - data[3, band] > median_diff
+
+        # Compute the sigma clipped mean of the residual for each row
+        # from the low illumination pixels
+        residual_rows[band], _, _ = sigma_clipped_stats(
+            residual, mask=high_illum_mask, sigma=3.0, axis=1
+        )
+
+    return residual_rows
+
+
+def correct_anomaly(input_model, mask_rows=False, rows_per_band=None):
     """
     Correct the transient first read anomaly.
 
@@ -94,6 +148,10 @@ def correct_anomaly(input_model, mask_rows=False):
         If True, use the fallback option of just masking the
         most affected rows instead of fitting and removing
         the anomaly.
+    rows_per_band : int or None, optional
+        Process the first read in bands of this many rows, to limit
+        the size of the temporary arrays.  If None, all rows are
+        processed at once.
 
     Returns
     -------
@@ -109,38 +167,16 @@ def correct_anomaly(input_model, mask_rows=False):
     # Get the read times for all pixels and resultants
     frame_time = input_model.meta.exposure.frame_time
     read_pattern = input_model.meta.exposure.read_pattern
-    t_pixel = frame_read_times(frame_time, 18)
     t_resultant = _resultant_read_times(read_pattern, frame_time)
 
     # Input data without reference pixels
     data = input_model.data[:, 4:-4, 4:-4]
-    t_pixel = t_pixel[4:-4, 4:-4]
 
     # Average read time per row
-    t_row = np.mean(t_pixel, axis=1)
-
-    # The anomalous recorded value for the first read
-    first_read = data[0].copy()
+    read_times = FrameReadTimes(frame_time, 18)
+    t_row = read_times.row_times(slice(4, -4))[4:-4]
 
-    # Use the 2nd and 3rd resultants to estimate the true value for the first read,
-    # extrapolating backward from the count rate.
-    diff_time = np.diff(t_resultant)
-    estimated_rate = (data[2] - data[1]) / diff_time[1]
-    estimated_first_read = data[1] - estimated_rate * diff_time[0]
-
-    # Residual from the estimated value
-    residual = first_read - estimated_first_read
-
-    # Identify weakly illuminated pixels in each row for fitting.
-    # Use a different pair of reads, to minimize bias from covariances.
-    diff_data = data[4] - data[3]
-    high_illum_mask = diff_data > np.median(diff_data, axis=1)
-
-    # Compute the sigma clipped mean of the residual for each row
-    # from the low illumination pixels
-    residual_rows, _, _ = sigma_clipped_stats(
-        residual, mask=high_illum_mask, sigma=3.0, axis=1
-    )
+    residual_rows = _row_residuals(data, t_resultant, rows_per_band)
 
     # Fit the sum of two exponential functions to the residual rows
     # Starting guess is here is empirical and may need adjustment.
@@ -160,12 +196,13 @@ def correct_anomaly(input_model, mask_rows=False):
         mask_affected_rows(input_model.groupdq)
         return input_model
 
-    # Calculate the correction by evaluating the model at the pixel readout times.
+    # Calculate the correction by evaluating the model at the pixel readout
+    # times, one band of rows at a time, and subtract it in the array view.
     a, b, tau_a, tau_b = result[0]
     log.debug(f"Fit parameters: a={a}, b={b}, tau_a={tau_a}, tau_b={tau_b}")
-    correction = _double_exp(t_pixel, a, b, tau_a, tau_b)
-
-    # Subtract the correction in the array view
-    data[0] -= correction
+    for band in row_bands(data.shape[1], rows_per_band):
+        start, stop, _ = band.indices(data.shape[1])
+        t_pixel = read_times.to_array(slice(start + 4, stop + 4))[:, 4:-4]
+        data[0, band] -= _double_exp(t_pixel, a, b, tau_a, tau_b)
 
     return input_model
@@ -28,6 +28,7 @@ class WFI18TransientStep(RomanStep):
 
     spec = """
         mask_rows = boolean(default = False) # Mask the affected rows instead of fitting
+        rows_per_band = integer(default=256, min=1) # Process the first read in bands of this many rows to limit memory use
     """
 
     def process(self, dataset):
@@ -45,7 +46,9 @@ class WFI18TransientStep(RomanStep):
             return input_model
 
         log.info("Correcting the first read transient anomaly for WFI18")
-        correct_anomaly(input_model, mask_rows=self.mask_rows)
+        correct_anomaly(
+            input_model, mask_rows=self.mask_rows, rows_per_band=self.rows_per_band
+        )
         input_model.meta.cal_step.wfi18_transient = "COMPLETE"
 
         return input_model